@@ -0,0 +1,14 @@
+"""
+语音识别子系统。包级属性按需导入（PEP 562），识别后端由 registry 在第一次加载模型时导入。
+"""
+from app.utils.plugins import lazy_exports
+
+_EXPORTS = {
+    "Transcriber": "app.asr.base",
+    "ModelRegistry": "app.asr.registry",
+    "model_key": "app.asr.registry",
+    "decode_settings": "app.asr.registry",
+    "prepare_audio": "app.asr.pcm",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
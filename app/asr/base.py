@@ -0,0 +1,95 @@
+import os
+from app.asr.pcm import TARGET_SAMPLE_RATE, prepare_audio
+from app.asr.transcript import make_segment
+
+
+class Transcriber:
+    """
+    语音识别器基类，Whisper / FunASR 等后端实现 _transcribe 与 _transcribe_batch。
+
+    - transcribe: 转录音频文件
+    - transcribe_array: 转录内存中的单段 PCM
+    - transcribe_batch: 一次转录多段 PCM，后端真正批量推理以提高 CPU 吞吐
+    """
+    # 后端名称，与 registry.model_key 中的 provider 对应
+    provider = None
+
+    @classmethod
+    def from_key(cls, model, compute_type, device):
+        """
+        按模型缓存键创建识别器（由 ModelRegistry 调用）。
+        """
+        raise NotImplementedError
+
+    def transcribe(self, audio_path, verbose=True):
+        """
+        转录音频文件。
+
+        :param audio_path: 音频文件路径
+        :param verbose: 是否打印日志
+        :return: 转录后的文本
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"找不到音频文件: {audio_path}")
+        if verbose:
+            print(f"正在转录: {audio_path}...")
+        return self._transcribe(audio_path, verbose)
+
+    def transcribe_array(self, audio, sample_rate=TARGET_SAMPLE_RATE, verbose=False):
+        """
+        直接转录内存中的 PCM 数据，无需落盘。
+
+        :param audio: int16/float32 的 NumPy 数组（或 16-bit PCM bytes）
+        :param sample_rate: 输入采样率，非 16 kHz 时自动重采样
+        :param verbose: 是否打印日志
+        :return: 转录后的文本
+        """
+        audio = prepare_audio(audio, sample_rate)
+        if verbose:
+            print(f"正在转录内存音频 ({len(audio) / TARGET_SAMPLE_RATE:.2f}s)...")
+        return self._transcribe(audio, verbose)
+
+    def transcribe_batch(self, segments, sample_rate=TARGET_SAMPLE_RATE, verbose=False):
+        """
+        批量转录多段 PCM，返回与输入一一对应的文本列表。
+
+        :param segments: PCM 数组列表（格式同 transcribe_array）
+        :param sample_rate: 输入采样率
+        """
+        audios = [prepare_audio(audio, sample_rate) for audio in segments]
+        results = [""] * len(audios)
+        # 空语音段不送入模型
+        indices = [i for i, audio in enumerate(audios) if len(audio)]
+        if not indices:
+            return results
+        if verbose:
+            total = sum(len(audios[i]) for i in indices) / TARGET_SAMPLE_RATE
+            print(f"正在批量转录 {len(indices)} 段音频 ({total:.2f}s)...")
+        if len(indices) == 1:
+            texts = [self._transcribe(audios[indices[0]], verbose)]
+        else:
+            texts = self._transcribe_batch([audios[i] for i in indices])
+        for i, text in zip(indices, texts):
+            results[i] = text
+        return results
+
+    def transcribe_segments(self, audio, verbose=False, word_timestamps=None):
+        """
+        转录一段 16 kHz float32 音频，返回结构化分段（格式见 app/asr/transcript.py，时间相对于音频起点）。
+        默认整段作为一个分段；能给出分段时间戳的后端应覆盖此方法。
+
+        :param word_timestamps: 是否需要词级时间戳，缺省取 ASR_WORD_TIMESTAMPS
+        """
+        text = self._transcribe(audio, verbose).strip()
+        if not text:
+            return []
+        return [make_segment(0.0, len(audio) / TARGET_SAMPLE_RATE, text)]
+
+    def _transcribe(self, audio, verbose):
+        raise NotImplementedError
+
+    def _transcribe_batch(self, audios):
+        """
+        默认逐段识别；支持批量推理的后端应覆盖此方法。
+        """
+        return [self._transcribe(audio, False) for audio in audios]
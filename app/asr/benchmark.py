@@ -0,0 +1,142 @@
+"""
+Whisper 性能档位基准：对同一段本地音频逐个档位测量实时率 (RTF)、峰值内存 (RSS)
+以及相对参考文本的字错误率 (CER) / 词错误率 (WER)。
+
+每个档位在独立子进程中运行，峰值内存互不干扰。
+
+用法:
+    python -m app.asr.benchmark data/sample.wav --reference data/sample.txt
+    python -m app.asr.benchmark data/sample.wav --profiles fast balanced --model small
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+
+
+def edit_distance(ref, hyp):
+    """
+    序列的 Levenshtein 距离（滚动数组，内存 O(len(hyp))）。
+    """
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1]
+
+
+def _normalize(text):
+    # 去掉标点与空白后比较，标点差异不计入错误
+    return re.sub(r"[^\w]+", "", text.lower())
+
+
+def error_rates(reference, hypothesis):
+    """
+    返回 (CER, WER)。CER 按字符计算（适合中文）；WER 按空白分词（适合英文）。
+    """
+    ref_chars, hyp_chars = _normalize(reference), _normalize(hypothesis)
+    cer = edit_distance(ref_chars, hyp_chars) / max(1, len(ref_chars))
+    ref_words = [_normalize(w) for w in reference.split() if _normalize(w)]
+    hyp_words = [_normalize(w) for w in hypothesis.split() if _normalize(w)]
+    wer = edit_distance(ref_words, hyp_words) / max(1, len(ref_words))
+    return cer, wer
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_profile(audio_path, profile, model_size, device):
+    """
+    在当前进程中加载模型并转录一次，返回测量结果（由子进程调用）。
+    """
+    from faster_whisper import decode_audio
+    from app.asr.whisper_client import AudioTranscriber
+    from app.asr.pcm import TARGET_SAMPLE_RATE
+
+    audio = decode_audio(audio_path, sampling_rate=TARGET_SAMPLE_RATE)
+    started = time.perf_counter()
+    transcriber = AudioTranscriber(model_size=model_size, device=device, profile=profile)
+    loaded = time.perf_counter()
+    text = transcriber.transcribe_array(audio, verbose=False)
+    finished = time.perf_counter()
+    duration = len(audio) / TARGET_SAMPLE_RATE
+    return {
+        "profile": profile,
+        "compute_type": transcriber.profile["compute_type"],
+        "beam_size": transcriber.profile["beam_size"],
+        "audio_seconds": duration,
+        "load_seconds": loaded - started,
+        "asr_seconds": finished - loaded,
+        "rtf": (finished - loaded) / duration if duration else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "text": text,
+    }
+
+
+def main():
+    from app.asr.profiles import WHISPER_PROFILES
+    import app.utils.config as config
+
+    parser = argparse.ArgumentParser(description="Whisper 性能档位基准")
+    parser.add_argument("audio", help="本地音频文件")
+    parser.add_argument("--reference", help="参考文本文件（用于计算 CER / WER）")
+    parser.add_argument("--profiles", nargs="+", default=list(WHISPER_PROFILES), help="要测试的档位")
+    parser.add_argument("--model", default=config.WHISPER_MODEL_SIZE, help="模型大小 (默认 WHISPER_MODEL_SIZE)")
+    parser.add_argument("--device", default=config.ASR_DEVICE, help="推理设备")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_profile(args.audio, args.worker, args.model, args.device), ensure_ascii=False))
+        return
+
+    reference = None
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference = f.read()
+
+    results = []
+    for profile in args.profiles:
+        print(f"⏱️ 测试档位: {profile}", file=sys.stderr)
+        proc = subprocess.run(
+            [sys.executable, "-m", "app.asr.benchmark", args.audio, "--worker", profile,
+             "--model", args.model, "--device", args.device],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()
+            results.append({"profile": profile, "error": error[-1] if error else f"exit {proc.returncode}"})
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if reference is not None:
+            result["cer"], result["wer"] = error_rates(reference, result["text"])
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'档位':<10}{'精度':<14}{'beam':>5}{'RTF':>8}{'加载(s)':>9}{'峰值内存(MB)':>14}{'CER':>8}{'WER':>8}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['profile']:<10}❌ {result['error']}")
+            continue
+        cer = f"{result['cer']:.1%}" if "cer" in result else "-"
+        wer = f"{result['wer']:.1%}" if "wer" in result else "-"
+        print(
+            f"{result['profile']:<10}{result['compute_type']:<14}{result['beam_size']:>5}"
+            f"{result['rtf']:>8.3f}{result['load_seconds']:>9.1f}{result['peak_rss_mb']:>14.0f}{cer:>8}{wer:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,77 @@
-import os
 from funasr import AutoModel
+import app.utils.config as config
+from app.asr.base import Transcriber
+from app.asr.transcript import align_funasr_tokens, make_segment
 
-class AudioTranscriber:
+class AudioTranscriber(Transcriber):
     """
     使用 FunASR Paraformer 的中文语音识别器，支持 VAD 与标点恢复。
+    VAD 切分后的语音片段按 batch_size_s（每批音频总秒数）动态组批推理。
     """
-    def __init__(self, model="paraformer-zh", vad_model="fsmn-vad", punctuation_model="ct-punc-zh"):
+    provider = "funasr"
+
+    def __init__(self, model="paraformer-zh", vad_model="fsmn-vad", punctuation_model="ct-punc-zh", device="cpu", batch_size_s=None):
         """
         初始化 FunASR 组件。
         
         :param model: 主 ASR 模型（中文），默认 paraformer-zh
         :param vad_model: 端点检测模型（VAD），默认 fsmn-vad
         :param punctuation_model: 标点恢复模型，默认 ct-punc-zh
+        :param device: 推理设备 (cpu, cuda)
+        :param batch_size_s: 每批音频的总时长（秒）
         """
         try:
             self.model = AutoModel(
                 model=model,
                 vad_model=vad_model,
-                punctuation_model=punctuation_model
+                punctuation_model=punctuation_model,
+                device=device
             )
         except Exception as e:
             raise RuntimeError(f"FunASR 初始化失败或未安装: {e}")
+        self.batch_size_s = batch_size_s or config.FUNASR_BATCH_SIZE_S
 
-    def transcribe(self, audio_path, verbose=True):
-        """
-        使用 FunASR 转录音频文件。
-        
-        :param audio_path: 音频文件路径
-        :param verbose: 是否打印日志
-        :return: 转录后的中文文本
-        """
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"找不到音频文件: {audio_path}")
-        if verbose:
-            print(f"正在转录: {audio_path}...")
-        result = self.model.generate(input=audio_path, batch_size=1)
+    @classmethod
+    def from_key(cls, model, compute_type, device):
+        return cls(
+            model=model,
+            vad_model=config.ASR_FUNASR_VAD,
+            punctuation_model=config.ASR_FUNASR_PUNC,
+            device=device
+        )
+
+    def _transcribe(self, audio, verbose=False):
+        result = self.model.generate(input=audio, batch_size_s=self.batch_size_s)
         if not result:
             return ""
         text = result[0].get("text", "")
         return text.strip()
+
+    def transcribe_segments(self, audio, verbose=False, word_timestamps=None):
+        """
+        返回结构化分段。Paraformer 本身就输出字级时间戳，直接保留为 words，不需要额外计算。
+        """
+        # sentence_timestamp=True 时结果带有按句切分的 sentence_info（时间单位为毫秒）
+        result = self.model.generate(input=audio, batch_size_s=self.batch_size_s, sentence_timestamp=True)
+        if not result:
+            return []
+        sentences = result[0].get("sentence_info")
+        if not sentences:
+            return super().transcribe_segments(audio, verbose)
+        return [
+            make_segment(
+                item["start"] / 1000,
+                item["end"] / 1000,
+                item.get("text", ""),
+                words=align_funasr_tokens(item.get("text", ""), item.get("timestamp"))
+            )
+            for item in sentences
+        ]
+
+    def _transcribe_batch(self, audios):
+        # 一次 generate 传入多段音频，结果按输入顺序返回
+        result = self.model.generate(input=list(audios), batch_size_s=self.batch_size_s)
+        texts = [item.get("text", "").strip() for item in (result or [])]
+        if len(texts) != len(audios):
+            return super()._transcribe_batch(audios)
+        return texts
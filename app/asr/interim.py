@@ -0,0 +1,185 @@
+"""
+实时模式的中间识别结果（interim）：说话过程中按固定间隔对当前语音段给出临时识别结果，
+端点到来后由正式识别结果定稿。
+
+- SlidingWindowDecoder: 通用后端，每次对语音段最近 window_seconds 的音频整体重新识别
+- FunASRStreamingDecoder: paraformer-zh-streaming，按 600ms chunk 增量解码，每次只处理新增音频
+- InterimTranscriber: 独立线程运行解码器，只处理最新快照（解码跟不上时跳过中间快照），
+  并对相邻两次假设取公共前缀作为已稳定部分
+"""
+import importlib.util
+import threading
+import app.utils.config as config
+from app.asr.pcm import TARGET_SAMPLE_RATE, to_float32
+
+
+def common_prefix(a, b):
+    """
+    两个字符串的最长公共前缀。
+    """
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return a[:i]
+
+
+def transcript_event(seq, text, stable="", final=False):
+    """
+    逐字稿事件：seq 为语音段序号（与定稿结果一致），stable 为不会再变化的前缀，
+    final 为 True 时 text 是定稿文本（为空表示该语音段被丢弃，订阅方应清除其临时结果）。
+    """
+    return {"seq": seq, "text": text, "stable": text if final else stable, "final": final}
+
+
+class SlidingWindowDecoder:
+    """
+    用现有识别器对语音段最近 window_seconds 的音频重新识别。
+    语音段长度受 AUDIO_MAX_SEGMENT_SECONDS 限制，窗口缺省与之相同，即每次覆盖整段。
+    """
+    def __init__(self, transcriber, window_seconds=None):
+        self.transcriber = transcriber
+        self.window = int((window_seconds or config.AUDIO_MAX_SEGMENT_SECONDS) * TARGET_SAMPLE_RATE)
+
+    def reset(self):
+        pass
+
+    def decode(self, audio):
+        return self.transcriber.transcribe_array(audio[-self.window:]).strip()
+
+
+class FunASRStreamingDecoder:
+    """
+    FunASR 流式 Paraformer：编码器 / 解码器状态保存在 cache 中，每个 chunk 只计算新增音频，
+    单次解码耗时与语音段长度无关。
+    """
+    # [0, 10, 5]: 每个 chunk 600ms，向后看 300ms
+    CHUNK_SIZE = [0, 10, 5]
+
+    def __init__(self, model=None, device=None):
+        from funasr import AutoModel
+
+        self.model = AutoModel(model=model or config.ASR_INTERIM_FUNASR_MODEL, device=device or config.ASR_DEVICE)
+        self.chunk_stride = self.CHUNK_SIZE[1] * 960
+        self.reset()
+
+    def reset(self):
+        self._cache = {}
+        self._fed = 0
+        self._text = ""
+
+    def decode(self, audio):
+        audio = to_float32(audio)
+        while len(audio) - self._fed >= self.chunk_stride:
+            chunk = audio[self._fed:self._fed + self.chunk_stride]
+            self._fed += self.chunk_stride
+            result = self.model.generate(
+                input=chunk,
+                cache=self._cache,
+                is_final=False,
+                chunk_size=self.CHUNK_SIZE,
+                encoder_chunk_look_back=4,
+                decoder_chunk_look_back=1
+            )
+            if result:
+                self._text += result[0].get("text", "")
+        return self._text
+
+
+def create_interim_decoder(transcriber):
+    """
+    FunASR 后端且已安装 funasr 时优先使用流式 Paraformer，否则退回滑动窗口重识别。
+    """
+    if (
+        getattr(transcriber, "provider", None) == "funasr"
+        and config.ASR_INTERIM_FUNASR_MODEL
+        and importlib.util.find_spec("funasr") is not None
+    ):
+        try:
+            decoder = FunASRStreamingDecoder()
+            print(f"⚡ 中间结果使用流式模型: {config.ASR_INTERIM_FUNASR_MODEL}")
+            return decoder
+        except Exception as e:
+            print(f"⚠️ 流式模型加载失败，改用滑动窗口重识别: {e}")
+    return SlidingWindowDecoder(transcriber)
+
+
+class InterimTranscriber:
+    """
+    后台生成中间识别结果。采集线程调用 submit 提交当前语音段的快照、end 结束语音段；
+    结果通过 emit(event) 回调交出（在本对象的线程中调用）。
+    """
+    def __init__(self, decoder, emit):
+        self.decoder = decoder
+        self.emit = emit
+        self._cond = threading.Condition()
+        self._pending = None        # (seq, audio)，只保留最新快照
+        self._active_seq = None     # 仍在说话的语音段，结束后其迟到的中间结果丢弃
+        self._decoder_seq = None
+        self._hypothesis = ""
+        self._stable = ""
+        self._stopped = False
+        self._thread = None
+        self.decoded = 0
+        self.skipped = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="asr-interim", daemon=True)
+        self._thread.start()
+
+    def submit(self, seq, audio):
+        """
+        提交语音段 seq 到目前为止的音频（调用方传入副本，识别期间缓冲区可能被复用）。
+        """
+        with self._cond:
+            if self._pending is not None:
+                self.skipped += 1
+            self._active_seq = seq
+            self._pending = (seq, audio)
+            self._cond.notify()
+
+    def end(self, seq):
+        with self._cond:
+            if self._active_seq == seq:
+                self._active_seq = None
+            if self._pending is not None and self._pending[0] == seq:
+                self._pending = None
+
+    def stop(self):
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                seq, audio = self._pending
+                self._pending = None
+            if seq != self._decoder_seq:
+                self.decoder.reset()
+                self._decoder_seq = seq
+                self._hypothesis = self._stable = ""
+            try:
+                text = self.decoder.decode(audio)
+            except Exception as e:
+                print(f"⚠️ 中间结果识别出错: {e}")
+                continue
+            self.decoded += 1
+            # 相邻两次假设一致的前缀视为已稳定；已稳定部分只增不减（除非新假设推翻了它）
+            agreed = common_prefix(self._hypothesis, text)
+            if len(agreed) > len(self._stable) or not text.startswith(self._stable):
+                self._stable = agreed
+            self._hypothesis = text
+            with self._cond:
+                if self._active_seq != seq:
+                    continue
+            if text:
+                self.emit(transcript_event(seq, text, self._stable))
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Whisper / Paraformer 模型均以 16 kHz 单声道 float32 作为输入
+TARGET_SAMPLE_RATE = 16000
+
+
+def to_float32(audio):
+    """
+    将 PCM 数据转换为 [-1, 1] 区间的一维 float32 数组。
+
+    :param audio: int16/float32 的 NumPy 数组，或 16-bit PCM 的 bytes/memoryview
+    :return: 一维 float32 数组（输入已是 float32 时不复制）
+    """
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        audio = np.frombuffer(audio, dtype=np.int16)
+    audio = np.asarray(audio)
+    # 先按原始类型归一化，再混音（均值会变成浮点，之后就无法判断是否需要缩放）
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+    elif audio.dtype != np.float32:
+        audio = audio.astype(np.float32)
+    if audio.ndim > 1:
+        # 多声道取均值混为单声道
+        audio = audio.mean(axis=1, dtype=np.float32) if audio.shape[1] > 1 else audio[:, 0]
+    return audio
+
+
+def resample_linear(audio, src_rate, dst_rate=TARGET_SAMPLE_RATE):
+    """
+    线性插值重采样（用于整段音频，语音识别场景下精度足够）。
+    """
+    if src_rate == dst_rate or len(audio) == 0:
+        return audio
+    duration = len(audio) / src_rate
+    dst_len = int(round(duration * dst_rate))
+    src_pos = np.arange(dst_len, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(src_pos, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def prepare_audio(audio, sample_rate=TARGET_SAMPLE_RATE):
+    """
+    统一转换为模型输入格式：16 kHz 单声道 float32。
+    """
+    return resample_linear(to_float32(audio), sample_rate, TARGET_SAMPLE_RATE)
@@ -0,0 +1,35 @@
+import app.utils.config as config
+
+# Whisper 性能档位：精度 / 速度 / 内存的取舍
+# - accurate: float32 + beam search，最慢、内存占用最大（默认，与引入档位之前的配置一致）
+# - balanced: int8 权重 + float32 激活，beam 3，CPU 上通常快 2~3 倍（需显式开启）
+# - fast:     全 int8 + 贪心解码，速度优先（需显式开启）
+WHISPER_PROFILES = {
+    "accurate": {"compute_type": "float32", "beam_size": 5, "best_of": 5},
+    "balanced": {"compute_type": "int8_float32", "beam_size": 3, "best_of": 3},
+    "fast": {"compute_type": "int8", "beam_size": 1, "best_of": 1},
+}
+
+
+def resolve_whisper_profile(name=None):
+    """
+    返回档位参数 {compute_type, beam_size, best_of, cpu_threads, num_workers}。
+    WHISPER_COMPUTE_TYPE / WHISPER_BEAM_SIZE / WHISPER_BEST_OF 显式设置时覆盖档位默认值。
+
+    :param name: 档位名，缺省取 WHISPER_PROFILE
+    """
+    name = (name or config.WHISPER_PROFILE).lower()
+    if name not in WHISPER_PROFILES:
+        print(f"⚠️ 未知的 Whisper 档位 {name}，使用 accurate (可选: {', '.join(WHISPER_PROFILES)})")
+        name = "accurate"
+    profile = dict(WHISPER_PROFILES[name], name=name)
+    if config.WHISPER_COMPUTE_TYPE:
+        profile["compute_type"] = config.WHISPER_COMPUTE_TYPE
+    if config.WHISPER_BEAM_SIZE:
+        profile["beam_size"] = config.WHISPER_BEAM_SIZE
+    if config.WHISPER_BEST_OF:
+        profile["best_of"] = config.WHISPER_BEST_OF
+    # cpu_threads=0 时由 CTranslate2 决定（读取 OMP_NUM_THREADS，批处理流水线会按进程数设置）
+    profile["cpu_threads"] = config.WHISPER_CPU_THREADS
+    profile["num_workers"] = config.WHISPER_NUM_WORKERS
+    return profile
@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import app.utils.config as config
+from app.utils.plugins import PluginRegistry
+from app.asr.profiles import resolve_whisper_profile
+
+# ASR 后端按需导入：funasr / faster_whisper 只在第一次加载对应模型时导入
+ASR_BACKENDS = PluginRegistry("ASR")
+ASR_BACKENDS.register("funasr", "app.asr.funasr_client:AudioTranscriber", requires=("funasr",))
+ASR_BACKENDS.register("whisper", "app.asr.whisper_client:AudioTranscriber", requires=("faster_whisper",))
+
+# 各后端的默认 (模型, 计算精度)，计算缓存键时不需要导入后端
+ASR_DEFAULTS = {
+    "funasr": lambda: (config.ASR_FUNASR_MODEL, "float32"),
+    "whisper": lambda: (config.WHISPER_MODEL_SIZE, resolve_whisper_profile()["compute_type"]),
+}
+
+
+def model_key(provider=None, model=None, compute_type=None, device=None):
+    """
+    生成模型缓存键 (provider, model, compute_type, device)，缺省值取自配置。
+    未知的提供商按 whisper 处理。
+    """
+    provider = (provider or config.ASR_PROVIDER).lower()
+    if provider not in ASR_DEFAULTS:
+        provider = "whisper"
+    default_model, default_compute_type = ASR_DEFAULTS[provider]()
+    model = model or default_model
+    compute_type = compute_type or default_compute_type
+    device = device or config.ASR_DEVICE
+    return (provider, model, compute_type, device)
+
+
+def decode_settings(provider=None, streaming=False):
+    """
+    影响识别结果、但不属于模型实例的解码设置，与 model_key 一起组成转录缓存键。
+
+    :param streaming: 是否按窗口流式转录（窗口长度与预切分 VAD 只在流式模式下生效）
+    """
+    provider = (provider or config.ASR_PROVIDER).lower()
+    if provider == "funasr":
+        settings = {"vad": config.ASR_FUNASR_VAD, "punc": config.ASR_FUNASR_PUNC}
+    else:
+        profile = resolve_whisper_profile()
+        settings = {
+            "beam_size": profile["beam_size"],
+            "best_of": profile["best_of"],
+            "batch_size": config.ASR_BATCH_SIZE,
+        }
+    settings["streaming"] = bool(streaming)
+    if streaming:
+        settings["pre_vad"] = config.ASR_PRE_VAD
+        settings["window_seconds"] = config.ASR_STREAM_WINDOW_SECONDS
+    return settings
+
+
+def _load_transcriber(key):
+    """
+    按需导入并初始化识别器（只在第一次使用某个模型时执行）。
+    """
+    provider, model, compute_type, device = key
+    return ASR_BACKENDS.load(provider).from_key(model, compute_type, device)
+
+
+class _Entry:
+    def __init__(self):
+        self.transcriber = None
+        self.refs = 0
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    进程级 ASR 模型注册表：
+    - 懒加载：第一次 acquire 时才加载权重
+    - 引用计数：多个 Streamlit 会话 / 线程共享同一个模型实例
+    - LRU 淘汰：缓存的模型数超过上限时，卸载最久未使用且无人引用的模型
+    """
+    def __init__(self, max_models=None):
+        self.max_models = max_models or config.ASR_MODEL_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def acquire(self, provider=None, model=None, compute_type=None, device=None):
+        """
+        获取（必要时加载）识别器，引用计数 +1。使用完毕后需调用 release。
+        """
+        key = model_key(provider, model, compute_type, device)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry()
+                self._entries[key] = entry
+            entry.refs += 1
+            self._entries.move_to_end(key)
+
+        # 加载在全局锁之外进行，同一模型由 load_lock 保证只加载一次
+        try:
+            with entry.load_lock:
+                if entry.transcriber is None:
+                    print(f"🔄 加载 ASR 模型: {key}")
+                    entry.transcriber = _load_transcriber(key)
+        except Exception:
+            with self._lock:
+                entry.refs -= 1
+                if entry.transcriber is None and entry.refs == 0:
+                    self._entries.pop(key, None)
+            raise
+
+        self._evict()
+        return entry.transcriber
+
+    def release(self, transcriber):
+        """
+        归还识别器，引用计数 -1（模型仍保留在缓存中，直到被 LRU 淘汰）。
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.transcriber is transcriber:
+                    entry.refs = max(0, entry.refs - 1)
+                    break
+        self._evict()
+
+    @contextmanager
+    def use(self, provider=None, model=None, compute_type=None, device=None):
+        """
+        with registry.use() as transcriber: ... 形式的便捷用法。
+        """
+        transcriber = self.acquire(provider, model, compute_type, device)
+        try:
+            yield transcriber
+        finally:
+            self.release(transcriber)
+
+    def warmup(self, provider=None, model=None, compute_type=None, device=None):
+        """
+        预加载模型并用一段静音跑一次推理，避免首个请求承担初始化开销。
+        """
+        with self.use(provider, model, compute_type, device) as transcriber:
+            try:
+                import numpy as np
+                transcriber.transcribe_array(np.zeros(16000, dtype=np.float32), verbose=False)
+            except Exception as e:
+                print(f"⚠️ ASR 预热推理失败 (模型已加载): {e}")
+        print("✅ ASR 模型预热完成")
+
+    def stats(self):
+        with self._lock:
+            return [
+                {"key": key, "loaded": entry.transcriber is not None, "refs": entry.refs}
+                for key, entry in self._entries.items()
+            ]
+
+    def _evict(self):
+        with self._lock:
+            loaded = [key for key, entry in self._entries.items() if entry.transcriber is not None]
+            overflow = len(loaded) - self.max_models
+            for key in loaded:
+                if overflow <= 0:
+                    break
+                entry = self._entries[key]
+                if entry.refs == 0:
+                    print(f"♻️ 卸载最久未使用的 ASR 模型: {key}")
+                    del self._entries[key]
+                    overflow -= 1
+
+
+# 进程内共享的默认注册表
+registry = ModelRegistry()
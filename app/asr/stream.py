@@ -0,0 +1,226 @@
+"""
+长音频的流式分窗转录：按窗口解码（PyAV）→ 识别 → 逐段写盘，并记录断点以便中断后续跑。
+内存占用只与窗口长度有关，与录音总时长无关。
+"""
+import json
+import os
+import numpy as np
+import app.utils.config as config
+from app.asr.pcm import TARGET_SAMPLE_RATE
+from app.asr.transcript import make_segment, segment_line, shift_segment, sidecar_path
+
+# 在窗口末尾的这段范围内寻找最安静的位置切分，避免把一句话切成两半
+CUT_SEARCH_SECONDS = 5.0
+CUT_FRAME_SECONDS = 0.1
+
+
+def find_quiet_cut(audio, search_seconds=CUT_SEARCH_SECONDS, sample_rate=TARGET_SAMPLE_RATE):
+    """
+    在音频末尾 search_seconds 内找到能量最低的 100ms 帧，返回其中点作为切分位置。
+    """
+    frame = int(CUT_FRAME_SECONDS * sample_rate)
+    search = min(len(audio), int(search_seconds * sample_rate)) // frame * frame
+    if search < frame:
+        return len(audio)
+    region = audio[len(audio) - search:].reshape(-1, frame)
+    quietest = int(np.argmin(np.einsum("ij,ij->i", region, region)))
+    return len(audio) - search + quietest * frame + frame // 2
+
+
+def iter_audio_windows(audio_path, window_seconds=None, start_seconds=0.0, sample_rate=TARGET_SAMPLE_RATE):
+    """
+    逐窗口解码音频文件，生成 (窗口起始秒数, float32 单声道数组)。
+
+    :param window_seconds: 窗口长度，缺省取 ASR_STREAM_WINDOW_SECONDS
+    :param start_seconds: 从该时间点开始解码（断点续跑）
+    """
+    import av
+
+    window = int((window_seconds or config.ASR_STREAM_WINDOW_SECONDS) * sample_rate)
+    start_sample = int(start_seconds * sample_rate)
+    container = av.open(audio_path)
+    try:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+        if start_sample:
+            # 定位到起点之前最近的关键帧，多解出来的样本下面丢弃
+            container.seek(int(start_seconds * av.time_base), backward=True)
+
+        pending = []
+        pending_samples = 0
+        cursor = None           # 下一个输出样本的绝对位置
+        window_start = start_sample
+
+        def resampled(frames):
+            for frame in frames:
+                yield frame.to_ndarray().reshape(-1)
+
+        def decoded():
+            nonlocal cursor
+            for frame in container.decode(stream):
+                if cursor is None:
+                    cursor = int(round((frame.time or 0.0) * sample_rate))
+                yield from resampled(resampler.resample(frame))
+            yield from resampled(resampler.resample(None))
+
+        for chunk in decoded():
+            if cursor + len(chunk) <= start_sample:
+                cursor += len(chunk)
+                continue
+            if cursor < start_sample:
+                chunk = chunk[start_sample - cursor:]
+                cursor = start_sample
+            cursor += len(chunk)
+            pending.append(chunk)
+            pending_samples += len(chunk)
+            if pending_samples < window:
+                continue
+            audio = np.concatenate(pending)
+            cut = find_quiet_cut(audio[:window], sample_rate=sample_rate)
+            yield window_start / sample_rate, audio[:cut]
+            window_start += cut
+            pending = [audio[cut:]]
+            pending_samples = len(audio) - cut
+
+        if pending_samples:
+            yield window_start / sample_rate, np.concatenate(pending)
+    finally:
+        container.close()
+
+
+class TranscriptionCheckpoint:
+    """
+    流式转录的断点：已处理到的音频时间，以及逐字稿 / 结构化逐字稿已写入的字节数。
+    只有音频文件（大小 + 修改时间）与模型都一致时才会续跑。
+    """
+    def __init__(self, path, audio_path, model_key):
+        self.path = path
+        stat = os.stat(audio_path)
+        self.identity = {"size": stat.st_size, "mtime": int(stat.st_mtime), "model": list(model_key or [])}
+        self.offset = 0.0
+        self.transcript_bytes = 0
+        self.segments_bytes = 0
+
+    def load(self):
+        """
+        读取断点，返回是否可以续跑。
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get("identity") != self.identity:
+            return False
+        self.offset = state["offset"]
+        self.transcript_bytes = state["transcript_bytes"]
+        self.segments_bytes = state.get("segments_bytes", 0)
+        return True
+
+    def save(self, offset, transcript_bytes, segments_bytes):
+        self.offset = offset
+        self.transcript_bytes = transcript_bytes
+        self.segments_bytes = segments_bytes
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "identity": self.identity,
+                "offset": offset,
+                "transcript_bytes": transcript_bytes,
+                "segments_bytes": segments_bytes
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _open_output(path, resumed, size):
+    if resumed and os.path.exists(path):
+        f = open(path, "r+b")
+        # 丢弃断点之后写了一半的内容
+        f.truncate(size)
+        f.seek(size)
+        return f
+    return open(path, "wb")
+
+
+def transcribe_window(transcriber, audio, segmenter=None, word_timestamps=None):
+    """
+    转录一个窗口，返回时间相对于窗口起点的结构化分段。
+
+    传入 segmenter（VADSegmenter）时先做批量 VAD 预切分：静音不送入模型，
+    各语音段走后端的批量推理；需要词级时间戳时逐段调用 transcribe_segments。
+    """
+    if segmenter is None:
+        return transcriber.transcribe_segments(audio, word_timestamps=word_timestamps)
+    spans = segmenter.segment(audio)
+    if not spans:
+        return []
+    if word_timestamps is None:
+        word_timestamps = config.ASR_WORD_TIMESTAMPS
+    segments = []
+    if word_timestamps:
+        for start, end in spans:
+            offset = start / TARGET_SAMPLE_RATE
+            segments.extend(
+                shift_segment(segment, offset)
+                for segment in transcriber.transcribe_segments(audio[start:end], word_timestamps=True)
+            )
+        return segments
+    texts = transcriber.transcribe_batch([audio[start:end] for start, end in spans])
+    for (start, end), text in zip(spans, texts):
+        text = text.strip()
+        if text:
+            segments.append(make_segment(start / TARGET_SAMPLE_RATE, end / TARGET_SAMPLE_RATE, text))
+    return segments
+
+
+def stream_transcribe(transcriber, audio_path, transcript_path, model_key=None, window_seconds=None,
+                      verbose=True, word_timestamps=None, pre_vad=None):
+    """
+    流式转录音频文件：逐窗口识别，生成带绝对时间戳的结构化分段。
+    pre_vad（缺省取 ASR_PRE_VAD）为真时每个窗口先经批量 VAD 切分再识别。
+    每段以一行文本追加写入 transcript_path，同时以一行 JSON 写入结构化逐字稿（*_transcript.jsonl）。
+    每个窗口写完后更新断点（transcript_path + ".ckpt"），中断后再次调用会从断点继续。
+    """
+    segmenter = None
+    if config.ASR_PRE_VAD if pre_vad is None else pre_vad:
+        from app.audio.vad import VADSegmenter
+        segmenter = VADSegmenter(TARGET_SAMPLE_RATE)
+    checkpoint = TranscriptionCheckpoint(transcript_path + ".ckpt", audio_path, model_key)
+    resumed = checkpoint.load() and os.path.exists(transcript_path)
+    start = checkpoint.offset if resumed else 0.0
+    if resumed and verbose:
+        print(f"⏩ 从断点续跑: {os.path.basename(audio_path)} @ {start:.0f}s")
+    with _open_output(transcript_path, resumed, checkpoint.transcript_bytes) as text_file, \
+            _open_output(sidecar_path(transcript_path), resumed, checkpoint.segments_bytes) as segment_file:
+        for window_start, audio in iter_audio_windows(audio_path, window_seconds, start):
+            segments = transcribe_window(transcriber, audio, segmenter, word_timestamps)
+            for segment in segments:
+                segment = shift_segment(segment, window_start)
+                if segment["text"]:
+                    text_file.write((segment["text"] + "\n").encode("utf-8"))
+                    segment_file.write(segment_line(segment).encode("utf-8"))
+                yield segment
+            for f in (text_file, segment_file):
+                f.flush()
+                os.fsync(f.fileno())
+            window_end = window_start + len(audio) / TARGET_SAMPLE_RATE
+            checkpoint.save(window_end, text_file.tell(), segment_file.tell())
+            if verbose:
+                print(f"   {os.path.basename(audio_path)}: 已转录至 {window_end / 60:.1f} 分钟")
+    checkpoint.clear()
+
+
+def transcribe_to_file(transcriber, audio_path, transcript_path, model_key=None, window_seconds=None, verbose=True):
+    """
+    消费 stream_transcribe 并返回完整逐字稿文本（从文件读取，包含续跑前已写入的部分）。
+    """
+    for _ in stream_transcribe(transcriber, audio_path, transcript_path, model_key, window_seconds, verbose):
+        pass
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,96 @@
+"""
+结构化逐字稿：每个分段一行 JSON，保存在 output/*_transcript.txt 旁的 *_transcript.jsonl 中。
+
+分段格式（时间单位为秒，可选字段缺省时不写入）:
+    {"start": 12.34, "end": 15.6, "text": "...", "confidence": 0.91,
+     "words": [{"start": 12.34, "end": 12.8, "word": "今天", "probability": 0.98}, ...]}
+
+下游的逐字稿分块、片段回放与增量摘要直接读取该文件，无需重新识别。
+"""
+import json
+import os
+import re
+
+# FunASR 的 timestamp 按 token 给出：中文一个字一个 token，英文 / 数字一个词一个 token
+_TOKEN_PATTERN = re.compile(r"[一-鿿]|[A-Za-z0-9']+")
+
+
+def sidecar_path(transcript_path):
+    """
+    output/x_transcript.txt -> output/x_transcript.jsonl
+    """
+    return os.path.splitext(transcript_path)[0] + ".jsonl"
+
+
+def make_segment(start, end, text, confidence=None, words=None):
+    segment = {"start": round(float(start), 3), "end": round(float(end), 3), "text": text.strip()}
+    if confidence is not None:
+        segment["confidence"] = round(float(confidence), 4)
+    if words:
+        segment["words"] = words
+    return segment
+
+
+def make_word(start, end, word, probability=None):
+    item = {"start": round(float(start), 3), "end": round(float(end), 3), "word": word}
+    if probability is not None:
+        item["probability"] = round(float(probability), 4)
+    return item
+
+
+def align_funasr_tokens(text, timestamps, offset=0.0):
+    """
+    将 FunASR 的 token 级时间戳（毫秒）对齐到文本中的字 / 词，数量对不上时返回 None。
+    """
+    tokens = _TOKEN_PATTERN.findall(text)
+    if not timestamps or len(tokens) != len(timestamps):
+        return None
+    return [
+        make_word(offset + start / 1000, offset + end / 1000, token)
+        for token, (start, end) in zip(tokens, timestamps)
+    ]
+
+
+def shift_segment(segment, offset):
+    """
+    将分段（及其词）的时间整体平移 offset 秒（窗口内相对时间 -> 全文绝对时间）。
+    """
+    shifted = dict(segment, start=round(segment["start"] + offset, 3), end=round(segment["end"] + offset, 3))
+    if segment.get("words"):
+        shifted["words"] = [
+            dict(word, start=round(word["start"] + offset, 3), end=round(word["end"] + offset, 3))
+            for word in segment["words"]
+        ]
+    return shifted
+
+
+def segment_line(segment):
+    return json.dumps(segment, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def read_segments(path):
+    """
+    逐行读取结构化逐字稿（生成器，忽略写了一半的末行）。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def write_segments(path, segments):
+    """
+    整体写出结构化逐字稿（先写临时文件再原子替换）。
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for segment in segments:
+            f.write(segment_line(segment))
+    os.replace(tmp_path, path)
+
+
+def segments_to_text(segments):
+    return "".join(segment["text"] + "\n" for segment in segments if segment["text"])
@@ -1,46 +1,156 @@
-import os
 from faster_whisper import WhisperModel
+import math
+import app.utils.config as config
+from app.asr.base import Transcriber
+from app.asr.pcm import TARGET_SAMPLE_RATE
+from app.asr.profiles import resolve_whisper_profile
+from app.asr.transcript import make_segment, make_word
 
-class AudioTranscriber:
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:  # faster-whisper < 1.1
+    BatchedInferencePipeline = None
+
+# 批量推理的单段上限（Whisper 的窗口长度）
+MAX_CLIP_SECONDS = 30
+
+
+class AudioTranscriber(Transcriber):
     """
     使用 faster-whisper 的本地语音识别器。
+    安装了 faster-whisper >= 1.1 时，文件与多段识别走 BatchedInferencePipeline 批量推理。
     """
-    def __init__(self, model_size="base"):
+    provider = "whisper"
+
+    def __init__(self, model_size="base", device="cpu", compute_type=None, batch_size=None, profile=None):
         """
         初始化 Whisper 模型。
         
         :param model_size: 模型大小 (tiny, base, small, medium, large-v2, large-v3)
+        :param device: 推理设备 (cpu, cuda)
+        :param compute_type: 计算精度 (float32, int8, int8_float32 ...)，缺省取档位设置
+        :param batch_size: 批量推理的批大小，<= 1 时关闭批量推理
+        :param profile: 性能档位名 (accurate / balanced / fast)，缺省取 WHISPER_PROFILE
         """
+        self.profile = resolve_whisper_profile(profile)
+        if compute_type:
+            self.profile["compute_type"] = compute_type
         try:
-            self.model = WhisperModel(model_size, device="cpu", compute_type="float32")
+            self.model = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=self.profile["compute_type"],
+                cpu_threads=self.profile["cpu_threads"],
+                num_workers=self.profile["num_workers"]
+            )
         except Exception as e:
             raise RuntimeError(f"Whisper 初始化失败或未安装: {e}")
+        self.batch_size = batch_size or config.ASR_BATCH_SIZE
+        self.batched = None
+        if BatchedInferencePipeline is not None and self.batch_size > 1:
+            self.batched = BatchedInferencePipeline(model=self.model)
 
-    def transcribe(self, audio_path, verbose=True):
+    @classmethod
+    def from_key(cls, model, compute_type, device):
+        return cls(model_size=model, device=device, compute_type=compute_type)
+
+    def _transcribe(self, audio, verbose):
+        segments = self._decode(audio, verbose)
+        transcript_parts = [seg.text for seg in segments]
+        return "".join(transcript_parts)
+
+    def transcribe_segments(self, audio, verbose=False, word_timestamps=None):
         """
-        使用 Whisper 转录音频文件。
-        
-        :param audio_path: 音频文件路径
-        :param verbose: 是否打印日志
-        :return: 转录后的文本
+        返回结构化分段；置信度取 exp(平均对数概率)。
+        词级时间戳需要额外的对齐计算，只在 word_timestamps（缺省取 ASR_WORD_TIMESTAMPS）为真时计算。
         """
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"找不到音频文件: {audio_path}")
-        
-        if verbose:
-            print(f"正在转录: {audio_path}...")
-        
-        segments, info = self.model.transcribe(
-            audio_path, 
-            beam_size=5,
-            language="zh",
-            vad_filter=True,
-            vad_parameters=dict(min_silence_duration_ms=500),
-            condition_on_previous_text=False,
-            word_timestamps=True
-        )
+        if word_timestamps is None:
+            word_timestamps = config.ASR_WORD_TIMESTAMPS
+        return [
+            make_segment(
+                seg.start,
+                seg.end,
+                seg.text,
+                confidence=math.exp(seg.avg_logprob),
+                words=[make_word(w.start, w.end, w.word.strip(), w.probability) for w in (seg.words or [])]
+            )
+            for seg in self._decode(audio, verbose, word_timestamps)
+        ]
+
+    def _decode(self, audio, verbose, word_timestamps=False):
+        """
+        执行识别，返回 faster-whisper 的 Segment 迭代器。
+        """
+        if self.batched is not None:
+            # 文件 / 长语音段内部由 VAD 切分后按批推理
+            segments, info = self.batched.transcribe(
+                audio,
+                batch_size=self.batch_size,
+                beam_size=self.profile["beam_size"],
+                best_of=self.profile["best_of"],
+                language="zh",
+                vad_filter=True,
+                vad_parameters=dict(min_silence_duration_ms=500),
+                condition_on_previous_text=False,
+                word_timestamps=word_timestamps
+            )
+        else:
+            segments, info = self.model.transcribe(
+                audio, 
+                beam_size=self.profile["beam_size"],
+                best_of=self.profile["best_of"],
+                language="zh",
+                vad_filter=True,
+                vad_parameters=dict(min_silence_duration_ms=500),
+                condition_on_previous_text=False,
+                word_timestamps=word_timestamps
+            )
         if verbose:
             print(f"检测到语言: {info.language} (置信度: {info.language_probability:.2f})")
             print(f"音频时长: {info.duration:.2f}s")
-        transcript_parts = [seg.text for seg in segments]
-        return "".join(transcript_parts)
+        return segments
+
+    def _transcribe_batch(self, audios):
+        """
+        多段语音拼接为一条音频，以 clip_timestamps 指定各段边界，一次批量推理后按时间戳拆回各段。
+        超过 30 秒的语音段单独识别。
+        """
+        if self.batched is None:
+            return super()._transcribe_batch(audios)
+
+        import numpy as np
+        results = [""] * len(audios)
+        short = []
+        for i, audio in enumerate(audios):
+            if len(audio) > MAX_CLIP_SECONDS * TARGET_SAMPLE_RATE:
+                results[i] = self._transcribe(audio, False)
+            else:
+                short.append(i)
+        if not short:
+            return results
+
+        # clip_timestamps 以样本下标切片拼接后的音频，必须是整数样本偏移
+        clips = []
+        offset = 0
+        for i in short:
+            clips.append({"start": offset, "end": offset + len(audios[i])})
+            offset += len(audios[i])
+        segments, _ = self.batched.transcribe(
+            np.concatenate([audios[i] for i in short]),
+            batch_size=self.batch_size,
+            beam_size=self.profile["beam_size"],
+            best_of=self.profile["best_of"],
+            language="zh",
+            vad_filter=False,
+            clip_timestamps=clips,
+            condition_on_previous_text=False
+        )
+        starts = [clip["start"] / TARGET_SAMPLE_RATE for clip in clips]
+        parts = {i: [] for i in short}
+        for seg in segments:
+            # 结果时间戳是拼接音频上的绝对时间（秒），按所属片段归位
+            clip = max(0, np.searchsorted(starts, seg.start + 1e-3, side="right") - 1)
+            parts[short[clip]].append(seg.text)
+        for i in short:
+            results[i] = "".join(parts[i])
+        return results
@@ -0,0 +1,11 @@
+"""
+音频采集子系统。包级属性按需导入（PEP 562），sounddevice / webrtcvad 只在实时模式下加载。
+"""
+from app.utils.plugins import lazy_exports
+
+_EXPORTS = {
+    "RealtimeAssistant": "app.audio.recorder",
+    "DebugAudioSink": "app.audio.debug_sink",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,51 @@
+"""
+实时采集前端的微基准：测量重采样器处理每秒音频所需的 CPU 时间。
+
+用法:
+    python -m app.audio.benchmark
+    python -m app.audio.benchmark --rates 44100 48000 --seconds 60 --taps 32
+"""
+import argparse
+import time
+import numpy as np
+from app.audio.resampler import StreamingResampler, to_int16
+
+BLOCK_MS = 30
+
+
+def bench_resampler(src_rate, seconds=30, taps=None, dst_rate=16000):
+    """
+    以 30ms 块流式重采样 seconds 秒白噪声，返回每秒音频的 CPU 毫秒数与实时倍率。
+    """
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(int(src_rate * seconds)) * 3000).astype(np.int16)
+    block = int(src_rate * BLOCK_MS / 1000)
+    resampler = StreamingResampler(src_rate, dst_rate, taps) if taps else StreamingResampler(src_rate, dst_rate)
+    started = time.process_time()
+    produced = 0
+    for i in range(0, len(audio), block):
+        produced += len(to_int16(resampler.process(audio[i:i + block])))
+    cpu = time.process_time() - started
+    return {
+        "src_rate": src_rate,
+        "cpu_ms_per_second": cpu / seconds * 1000,
+        "realtime_factor": seconds / cpu if cpu else float("inf"),
+        "output_samples": produced,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重采样前端 CPU 开销微基准")
+    parser.add_argument("--rates", type=int, nargs="+", default=[8000, 22050, 32000, 44100, 48000], help="输入采样率")
+    parser.add_argument("--seconds", type=int, default=30, help="每个采样率处理的音频秒数")
+    parser.add_argument("--taps", type=int, default=None, help="每相位抽头数 (默认 16)")
+    args = parser.parse_args()
+
+    print(f"{'采样率':>8}{'CPU(ms)/秒音频':>16}{'实时倍率':>10}")
+    for rate in args.rates:
+        result = bench_resampler(rate, args.seconds, args.taps)
+        print(f"{rate:>8}{result['cpu_ms_per_second']:>16.2f}{result['realtime_factor']:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
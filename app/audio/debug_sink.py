@@ -0,0 +1,57 @@
+import os
+import queue
+import threading
+import time
+import wave
+import numpy as np
+
+
+class DebugAudioSink:
+    """
+    异步保存语音段到 debug 目录，便于排查 VAD / 识别问题。
+    写盘在独立线程中完成，不占用采集与识别线程。
+    """
+    def __init__(self, output_dir="debug", max_pending=64):
+        self.output_dir = output_dir
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self.dropped = 0
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="debug-audio-sink", daemon=True)
+        self._thread.start()
+
+    def submit(self, name, audio, sample_rate):
+        """
+        提交一个语音段（int16 数组）。队列已满时直接丢弃，保证调用方不被阻塞。
+        """
+        if self._thread is None:
+            return
+        try:
+            self._queue.put_nowait((name, audio, sample_rate))
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            name, audio, sample_rate = item
+            path = os.path.join(self.output_dir, f"{name}_{time.strftime('%H%M%S')}.wav")
+            try:
+                with wave.open(path, 'wb') as wf:
+                    wf.setnchannels(1)
+                    wf.setsampwidth(2)  # 16-bit
+                    wf.setframerate(sample_rate)
+                    wf.writeframes(np.asarray(audio, dtype=np.int16).tobytes())
+            except Exception as e:
+                print(f"⚠️ 调试音频保存失败: {e}")
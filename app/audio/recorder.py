@@ -1,50 +1,100 @@
-import sounddevice as sd
-import webrtcvad
-import collections
 import queue
 import sys
 import wave
 import os
 import time
 import threading
+import uuid
 import numpy as np
 import app.utils.config as config
-if config.ASR_PROVIDER == "funasr":
-    from app.asr.funasr_client import AudioTranscriber
-else:
-    from app.asr.whisper_client import AudioTranscriber
-from app.llm.summarizer import MeetingSummarizer
-from app.utils.notifier import EmailNotifier
+from app.asr.registry import registry
+from app.utils.cache import cached_summarize_stream
+from app.llm.streaming import TimedStream, write_stream
+from app.llm.rolling import RollingSummarizer
+from app.audio.debug_sink import DebugAudioSink
+from app.audio.resampler import FrameAssembler, StreamingResampler, to_int16
+from app.audio.ring_buffer import RingBuffer, SegmentBuilder, SegmentPool
+from app.audio.vad import VADSegmenter
+from app.asr.interim import InterimTranscriber, create_interim_decoder, transcript_event
 
 class RealtimeAssistant:
     def __init__(self, transcriber, summarizer, notifier, knowledge_base=None):
-        self.transcriber = transcriber
+        # 未传入识别器时从进程级模型注册表获取，避免重复加载权重
+        self.transcriber = transcriber or registry.acquire()
         self.summarizer = summarizer
         self.notifier = notifier
         self.knowledge_base = knowledge_base
         
         # VAD 设置
         # sounddevice 读取的是 float32 或 int16，我们需要 int16 给 webrtcvad
+        # 音频相关依赖只在实时模式下导入
+        import webrtcvad
         self.vad = webrtcvad.Vad(3)
+        # VAD 与 ASR 统一使用 16 kHz；采集使用设备原生采样率（见 run）
         self.sample_rate = 16000 
+        self.capture_rate = self.sample_rate
         self.frame_duration = 30  # ms
         self.frame_size = int(self.sample_rate * self.frame_duration / 1000) # samples per frame
+        # 批量能量 VAD：整批帧一次算能量，明显静音的帧不再调用 webrtcvad；识别前裁掉语音段首尾静音
+        self.vad_gate = VADSegmenter(self.sample_rate, self.frame_duration)
+        self.trim_silence = config.ASR_PRE_VAD
         
-        # 队列
-        self.audio_queue = queue.Queue()
+        # 采集缓冲区在 run() 中按设备采样率创建；语音段使用预分配的缓冲池
+        self.capture_buffer = None
+        self.segment_pool = SegmentPool(
+            config.AUDIO_SEGMENT_POOL,
+            int(self.sample_rate * config.AUDIO_MAX_SEGMENT_SECONDS)
+        )
         self.is_running = False
         
         # 状态
         self.full_transcript = []
-        self.temp_filename = "temp_recording.wav"
+        # 调试用：异步保存语音段到 debug/（默认关闭）
+        self.debug_sink = DebugAudioSink("debug") if config.DEBUG_AUDIO_DUMP else None
+
+        # 后台识别：采集循环只负责切分语音段并入队，识别由工作线程完成
+        self.asr_workers = config.ASR_WORKERS
+        self.batch_max_segments = config.ASR_BATCH_MAX_SEGMENTS
+        self.segment_queue = queue.Queue()
+        self._workers = []
+        self._next_seq = 0      # 下一个待分配的语音段序号
+        self._emit_seq = 0      # 下一个按序写入 full_transcript 的序号
+        self._pending_results = {}
+        self._result_lock = threading.Lock()
+        self.segment_metrics = []
+
+        # 逐字稿事件订阅（CLI / Web）：中间结果与定稿结果都以 transcript_event 的形式回调
+        self._listeners = []
+        self.interim_enabled = config.ASR_INTERIM
+        self.interim_interval_frames = max(1, config.ASR_INTERIM_INTERVAL_MS // self.frame_duration)
+        self.interim = None
+        self._interim_text = ""
+
+        # 逐字稿边识别边分块入库，会议中途即可检索
+        self.meeting_id = uuid.uuid4().hex
+        self.meeting_started_at = time.time()
+        self.meeting_started = time.strftime("%Y-%m-%d-%H-%M-%S", time.localtime(self.meeting_started_at))
+        self._transcript_indexer = None
+        if self.knowledge_base and hasattr(self.knowledge_base, "open_transcript_indexer"):
+            self._transcript_indexer = self.knowledge_base.open_transcript_indexer(
+                self.meeting_id,
+                {"source": "realtime_recording", "source_type": "realtime", "timestamp": int(self.meeting_started_at)}
+            )
+        # 滚动摘要：会议进行中在后台折叠逐字稿，结束时只做合并；检查点写入 output/
+        self.rolling = None
+        if config.ROLLING_SUMMARY and self.summarizer:
+            self.rolling = RollingSummarizer(
+                self.summarizer,
+                os.path.join("output", f"realtime_{self.meeting_started}_summary.ckpt.json")
+            )
 
     def audio_callback(self, indata, frames, time, status):
         """
-        sounddevice 的回调函数，实时获取音频数据
+        sounddevice 的回调函数，实时获取音频数据（直接写入预分配的环形缓冲区）
         """
         if status:
             print(status, file=sys.stderr)
-        self.audio_queue.put(bytes(indata))
+        self.capture_buffer.write(indata[:, 0])
 
     def stop(self):
         """
@@ -56,6 +106,7 @@ class RealtimeAssistant:
     def run(self):
         print("\n🎙️  实时会议助手已启动")
         print("按 Ctrl+C 结束会议并生成纪要...\n")
+        import sounddevice as sd
         
         # --- 设备诊断与选择 ---
         print("--- 音频设备列表 ---")
@@ -98,39 +149,35 @@ class RealtimeAssistant:
             hw_rate = int(hw_rate)
             print(f"   设备原生采样率: {hw_rate} Hz")
             
-            # 4. 自动适配采样率
-            # VAD 支持 8000, 16000, 32000, 48000
-            if hw_rate in [8000, 16000, 32000, 48000]:
-                self.sample_rate = hw_rate
-                print(f"✅ 完美适配: 使用设备原生采样率 {self.sample_rate} Hz")
+            # 4. 以设备原生采样率采集，在进程内重采样到 16 kHz 再交给 VAD / ASR
+            # （不再依赖系统重采样，44100 Hz 等 VAD 不支持的采样率也能正常工作）
+            self.capture_rate = hw_rate
+            if hw_rate == self.sample_rate:
+                print(f"✅ 完美适配: 使用设备原生采样率 {hw_rate} Hz")
             else:
-                # 如果设备是 44100，VAD 不支持。
-                # 这种情况下，我们必须用设备原生的 44100 录音，然后在内存里重采样到 16000 给 VAD 用。
-                # 但为了代码简单，我们先尝试强制请求 16000，看设备是否支持重采样。
-                print(f"⚠️ 设备采样率 {hw_rate} Hz 不被 VAD 直接支持。")
-                print("🔄 尝试请求 16000 Hz (依赖系统重采样)...")
-                self.sample_rate = 16000
-                
-            # 更新帧大小
-            self.frame_size = int(self.sample_rate * self.frame_duration / 1000)
+                print(f"🔄 以 {hw_rate} Hz 采集，进程内重采样到 {self.sample_rate} Hz")
             
         except Exception as e:
             print(f"⚠️ 设备查询/适配失败: {e}")
             target_device_index = None # 回退到 None (让 sounddevice 自己决定)
+            self.capture_rate = self.sample_rate
         print("--------------------\n")
 
         self.is_running = True
         
-        # 语音缓冲
-        speech_buffer = collections.deque(maxlen=50)
+        # 语音缓冲：预分配的语音段缓冲池 + 预录环（约 1.5s，保留触发前的语音开头）
+        segments = SegmentBuilder(self.segment_pool, self.frame_size, preroll_frames=50)
         triggered = False
-        speech_frames = []
         
         silence_threshold = 20 # ~600ms
         silence_counter = 0
         min_speech_frames = 10 # 至少 ~300ms
 
         print(">>> 正在监听...")
+        if self.interim_enabled:
+            self.add_listener(self._print_interim)
+        self._start_workers()
+        last_interim_frames = 0
 
         # 模拟模式检查
         simulate_mic = os.getenv("SIMULATE_MIC", "false").lower() == "true"
@@ -141,21 +188,26 @@ class RealtimeAssistant:
             print("⚠️  使用模拟模式: 读取 data/test.wav 代替麦克风")
             if not os.path.exists("data/test.wav"):
                 print("❌ 文件 data/test.wav 不存在，请放入一个音频文件用于模拟。")
+                self._stop_workers()
                 return
-            
+            # 模拟文件可以是任意采样率，同样经过重采样前端
+            with wave.open("data/test.wav", 'rb') as wf:
+                self.capture_rate = wf.getframerate()
+
+        # 采集环形缓冲区：回调只做一次内存复制，不分配对象；写满时丢帧并计数
+        capture_block = int(self.capture_rate * self.frame_duration / 1000)
+        self.capture_buffer = RingBuffer(int(self.capture_rate * config.AUDIO_RING_SECONDS))
+
+        if simulate_mic:
             def simulate_input():
                 try:
                     with wave.open("data/test.wav", 'rb') as wf:
-                        if wf.getframerate() != self.sample_rate:
-                            print(f"❌ 模拟文件采样率必须是 {self.sample_rate}Hz")
-                            return
-                        
                         while self.is_running:
-                            data = wf.readframes(self.frame_size)
+                            data = wf.readframes(capture_block)
                             if len(data) == 0:
                                 time.sleep(1) # 播放结束
                                 break
-                            self.audio_queue.put(data)
+                            self.capture_buffer.write(np.frombuffer(data, dtype=np.int16))
                             time.sleep(self.frame_duration / 1000)
                 except Exception as e:
                     print(f"模拟线程出错: {e}")
@@ -166,8 +218,8 @@ class RealtimeAssistant:
         else:
             # 真实麦克风模式
             try:
-                stream = sd.InputStream(samplerate=self.sample_rate, 
-                                    blocksize=self.frame_size,
+                stream = sd.InputStream(samplerate=self.capture_rate, 
+                                    blocksize=capture_block,
                                     device=target_device_index, # 使用选定的设备索引
                                     channels=1, 
                                     dtype='int16',
@@ -178,20 +230,46 @@ class RealtimeAssistant:
                 print("💡 提示: 请尝试在外部终端运行 (source venv/bin/activate && python3 main.py)")
                 print("💡 或者: 在 .env 设置 SIMULATE_MIC=true 使用文件模拟")
                 self.is_running = False
+                self._stop_workers()
                 return
 
+        # 重采样前端：设备原生采样率 -> 16 kHz，再切成 30ms 整帧
+        resampler = StreamingResampler(self.capture_rate, self.sample_rate)
+        assembler = FrameAssembler(self.frame_size)
+        reported_overflows = 0
+
         # 主循环
         try:
             while self.is_running:
-                try:
-                    # 从队列获取音频块
-                    chunk = self.audio_queue.get(timeout=1)
-                    
-                    # VAD 检测
-                    is_speech = self.vad.is_speech(chunk, self.sample_rate)
+                # 取出环形缓冲区中的全部可读数据（视图，不复制）
+                views = self.capture_buffer.peek()
+                if not views:
+                    time.sleep(self.frame_duration / 1000 / 2)
+                    continue
+                # 设备已是 16 kHz 时（含模拟模式）不重采样，帧仍是环形缓冲区的视图
+                blocks = [block if resampler.bypass else to_int16(resampler.process(block)) for block in views]
+                frames = [frame for block in blocks for frame in assembler.push(block)]
+
+                if self.capture_buffer.overflows != reported_overflows:
+                    reported_overflows = self.capture_buffer.overflows
+                    print(f"\n⚠️ 采集缓冲区已满，累计丢弃 {self.capture_buffer.dropped / self.capture_rate:.2f}s 音频")
+
+                silent = self.vad_gate.silent_frames(np.stack(frames)) if frames else []
+                for frame, is_silent in zip(frames, silent):
+                    # VAD 检测：能量门限判为静音的帧跳过 webrtcvad
+                    is_speech = not is_silent and self.vad.is_speech(frame.tobytes(), self.sample_rate)
 
                     if triggered:
-                        speech_frames.append(chunk)
+                        if not segments.append(frame):
+                            # 达到语音段长度上限：先提交已有部分，再从当前帧继续
+                            self._submit_speech(*self._end_segment(segments))
+                            segments.start(with_preroll=False)
+                            segments.append(frame)
+                            last_interim_frames = 0
+                        if self.interim and segments.frames - last_interim_frames >= self.interim_interval_frames:
+                            # 快照交给中间结果线程（复制：缓冲区在语音段结束后会被复用）
+                            self.interim.submit(self._next_seq, segments.view().copy())
+                            last_interim_frames = segments.frames
                         if not is_speech:
                             silence_counter += 1
                         else:
@@ -200,26 +278,25 @@ class RealtimeAssistant:
                         if silence_counter > silence_threshold:
                             triggered = False
                             # 只有当语音长度足够时才处理
-                            if len(speech_frames) > min_speech_frames:
-                                self._process_speech(speech_frames)
+                            if segments.frames > min_speech_frames:
+                                self._submit_speech(*self._end_segment(segments))
                             else:
+                                self._end_segment(segments, discard=True)
                                 print("(忽略过短的噪音)", end="\r")
                                 
-                            speech_frames = []
                             silence_counter = 0
                             print(">>> 正在监听...", end="\r")
                     else:
-                        speech_buffer.append(chunk)
+                        segments.add_preroll(frame)
                         if is_speech:
                             triggered = True
-                            speech_frames.extend(speech_buffer)
-                            speech_buffer.clear()
+                            segments.start()
+                            last_interim_frames = 0
                             print("🎤  正在说话...", end="\r")
-                            
-                except queue.Empty:
-                    if not self.is_running:
-                        break
-                    continue
+
+                # 帧已复制进预录环 / 语音段缓冲区（不足一帧的尾部由 FrameAssembler 自行复制），
+                # 此时才释放空间，避免生产者覆盖仍在使用的视图
+                self.capture_buffer.consume(sum(len(view) for view in views))
 
         except KeyboardInterrupt:
             print("\n\n🛑 会议结束。")
@@ -238,46 +315,255 @@ class RealtimeAssistant:
             
             if sim_thread and sim_thread.is_alive():
                 sim_thread.join(timeout=1)
-            
-            if os.path.exists(self.temp_filename):
-                try:
-                    os.remove(self.temp_filename)
-                except: pass
+
+            # 结束时仍在说话：提交最后一段，避免丢失结尾
+            if segments.active:
+                if segments.frames > min_speech_frames:
+                    self._submit_speech(*self._end_segment(segments))
+                else:
+                    self._end_segment(segments, discard=True)
+
+            # 等待队列中剩余的语音段识别完成
+            self._stop_workers()
+            self._print_metrics()
             
             self._finish_meeting()
 
-    def _process_speech(self, frames):
-        if not frames:
+    def _start_workers(self):
+        """
+        启动后台 ASR 工作线程。
+        """
+        if self.debug_sink:
+            self.debug_sink.start()
+        if self.interim_enabled and self.interim is None:
+            self.interim = InterimTranscriber(create_interim_decoder(self.transcriber), self._emit_transcript)
+            self.interim.start()
+        self._workers = []
+        for i in range(self.asr_workers):
+            worker = threading.Thread(target=self._asr_worker, name=f"asr-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _stop_workers(self):
+        """
+        投递结束标记并等待所有工作线程处理完队列中的语音段。
+        """
+        if self.interim:
+            self.interim.stop()
+            self.interim = None
+        if not self._workers:
             return
-            
-        # 保存为临时 WAV 文件
-        # 为了调试，我们保存一份带时间戳的文件到 debug 目录
-        timestamp = time.strftime("%H%M%S")
-        debug_filename = f"debug/speech_{timestamp}.wav"
-        
-        with wave.open(self.temp_filename, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2) # 16-bit
-            wf.setframerate(self.sample_rate)
-            wf.writeframes(b''.join(frames))
-            
-        # 复制一份到 debug
-        with open(self.temp_filename, 'rb') as f_src:
-            with open(debug_filename, 'wb') as f_dst:
-                f_dst.write(f_src.read())
-            
-        # 识别
+        pending = self.segment_queue.qsize()
+        if pending:
+            print(f"\n⏳ 等待剩余 {pending} 个语音段识别完成...")
+        for _ in self._workers:
+            self.segment_queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        if self.debug_sink:
+            self.debug_sink.stop()
+
+    def add_listener(self, callback):
+        """
+        订阅逐字稿事件 callback(event)，event 格式见 app.asr.interim.transcript_event。
+        回调在中间结果线程 / ASR 工作线程中执行，应尽快返回。
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get_live_transcript(self):
+        """
+        返回已定稿的逐字稿与当前语音段的中间结果，供轮询式界面展示。
+        """
+        with self._result_lock:
+            return {"final": list(self.full_transcript), "interim": self._interim_text}
+
+    def _emit_transcript(self, event):
+        if not event["final"]:
+            with self._result_lock:
+                # 定稿之后迟到的中间结果直接丢弃
+                if event["seq"] < self._emit_seq:
+                    return
+                self._interim_text = event["text"]
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"⚠️ 逐字稿事件回调出错: {e}")
+
+    def _print_interim(self, event):
+        if not event["final"] and event["text"]:
+            # 只显示末尾一行，定稿结果由 _commit_result 打印
+            print(f"💬 {event['text'][-40:]}", end="\r")
+
+    def _end_segment(self, segments, discard=False):
+        """
+        结束当前语音段（采集线程调用）：停止其中间结果，返回 finish() 的结果；
+        discard 为 True 时丢弃语音段并通知订阅方清除其中间结果。
+        """
+        seq = self._next_seq
+        if self.interim:
+            self.interim.end(seq)
+        if not discard:
+            return segments.finish()
+        segments.discard()
+        if self.interim:
+            self._emit_transcript(transcript_event(seq, ""))
+        return None
+
+    def _submit_speech(self, audio, buffer=None):
+        """
+        将语音段放入识别队列（采集线程调用，不阻塞）。
+
+        :param audio: 语音段的 int16 视图
+        :param buffer: 视图所在的池缓冲区，识别完成后归还
+        """
+        if not len(audio):
+            self.segment_pool.release(buffer)
+            return
+        seq = self._next_seq
+        self._next_seq += 1
+        depth = self.segment_queue.qsize()
+        self.segment_queue.put((seq, audio, time.time(), depth, buffer))
+
+    def _asr_worker(self):
+        """
+        工作线程：从队列取语音段识别，结果交由 _commit_result 按序汇总。
+        识别积压时把已排队的多个语音段合并为一批，走后端的批量推理。
+        """
+        while True:
+            item = self.segment_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_max_segments:
+                try:
+                    item = self.segment_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            started_at = time.time()
+            texts = self._process_batch(batch)
+            finished_at = time.time()
+            for (seq, audio, enqueued_at, depth, buffer), text in zip(batch, texts):
+                self.segment_pool.release(buffer)
+                self._commit_result(seq, text, {
+                    "seq": seq,
+                    "audio_seconds": len(audio) / self.sample_rate,
+                    "queue_depth": depth,
+                    "queue_wait": started_at - enqueued_at,
+                    "asr_seconds": (finished_at - started_at) / len(batch),
+                    "batch_size": len(batch),
+                    "lag": finished_at - enqueued_at,
+                })
+            if stop:
+                break
+
+    def _commit_result(self, seq, text, metrics):
+        """
+        保存识别结果，并按语音段顺序写入 full_transcript。
+        """
+        emitted = []
+        events = []
+        with self._result_lock:
+            self.segment_metrics.append(metrics)
+            self._pending_results[seq] = text
+            while self._emit_seq in self._pending_results:
+                text = self._pending_results.pop(self._emit_seq)
+                events.append(transcript_event(self._emit_seq, text, final=True))
+                self._emit_seq += 1
+                self._interim_text = ""
+                if text:
+                    print(f"📝 {text}")
+                    self.full_transcript.append(text)
+                    emitted.append(text)
+        for event in events:
+            self._emit_transcript(event)
+        # 入库涉及向量化，放在结果锁之外，避免阻塞其他工作线程提交结果
+        if emitted and self._transcript_indexer:
+            try:
+                self._transcript_indexer.feed("\n".join(emitted) + "\n")
+            except Exception as e:
+                print(f"⚠️ 逐字稿增量入库失败: {e}")
+        if emitted and self.rolling:
+            self.rolling.feed("\n".join(emitted))
+
+    def get_metrics(self):
+        """
+        返回识别队列的实时指标，供 CLI / Web 展示。
+        """
+        with self._result_lock:
+            done = list(self.segment_metrics)
+        lags = [m["lag"] for m in done]
+        audio = sum(m["audio_seconds"] for m in done)
+        asr = sum(m["asr_seconds"] for m in done)
+        return {
+            "workers": self.asr_workers,
+            "queue_depth": self.segment_queue.qsize(),
+            "submitted": self._next_seq,
+            "completed": len(done),
+            "avg_lag": sum(lags) / len(lags) if lags else 0.0,
+            "max_lag": max(lags) if lags else 0.0,
+            "rtf": asr / audio if audio else 0.0,
+            "capture": self.capture_buffer.stats() if self.capture_buffer else None,
+            "segment_pool": self.segment_pool.stats(),
+            "segments": done,
+        }
+
+    def _print_metrics(self):
+        metrics = self.get_metrics()
+        if not metrics["completed"]:
+            return
+        print(
+            f"📊 识别统计: {metrics['completed']} 段, 工作线程 {metrics['workers']}, "
+            f"平均延迟 {metrics['avg_lag']:.2f}s, 最大延迟 {metrics['max_lag']:.2f}s, RTF {metrics['rtf']:.2f}"
+        )
+        capture = metrics["capture"]
+        if capture:
+            print(
+                f"📊 采集缓冲: 峰值占用 {capture['peak_fill_ratio']:.0%}, "
+                f"溢出 {capture['overflows']} 次, 丢弃 {capture['dropped'] / self.capture_rate:.2f}s 音频, "
+                f"语音段缓冲池临时分配 {metrics['segment_pool']['misses']} 次"
+            )
+
+    def _process_batch(self, batch):
+        """
+        批量识别 [(seq, audio, ...), ...]，返回与输入对应的文本列表（失败时为空字符串）。
+        音频直接以 NumPy 数组交给识别器，不再经过临时 WAV 文件。
+        """
+        audios = []
+        for seq, audio, *_ in batch:
+            if self.trim_silence:
+                # 裁掉首尾静音（视图，不复制）；整段静音时为空，不送入模型
+                audio = self.vad_gate.trim(audio)
+            if self.debug_sink and len(audio):
+                # 缓冲区识别后会被复用，调试落盘需要独立的副本
+                self.debug_sink.submit(f"speech_{seq}", audio.copy(), self.sample_rate)
+            audios.append(audio)
+
         try:
-            print(f"🎤 正在识别 (音频已保存至 {debug_filename})...")
-            text = self.transcriber.transcribe(self.temp_filename, verbose=False)
-            text = text.strip()
-            if text:
-                print(f"📝 {text}")
-                self.full_transcript.append(text)
+            texts = self.transcriber.transcribe_batch(audios, sample_rate=self.sample_rate, verbose=False)
+            return [text.strip() for text in texts]
         except Exception as e:
             print(f"识别出错: {e}")
+            return [""] * len(batch)
 
     def _finish_meeting(self):
+        if self._transcript_indexer:
+            try:
+                self._transcript_indexer.close()
+            except Exception as e:
+                print(f"⚠️ 逐字稿增量入库失败: {e}")
+
         if not self.full_transcript:
             print("未检测到有效语音，无需生成纪要。")
             return
@@ -294,11 +580,16 @@ class RealtimeAssistant:
 
         print("🧠 正在生成会议纪要...")
         try:
-            summary = self.summarizer.summarize(full_text)
             summary_path = os.path.join("output", f"realtime_{timestamp}_summary.md")
-            with open(summary_path, "w", encoding="utf-8") as f:
-                f.write(summary)
-            print(f"✅ 会议纪要已生成: {summary_path}")
+            if self.rolling:
+                # 会议中已折叠的部分无需重算，只合并尾部
+                stream = TimedStream(self.rolling.summarize_stream())
+            else:
+                stream = TimedStream(cached_summarize_stream(self.summarizer, full_text))
+            summary = write_stream(summary_path, stream)
+            print(f"✅ 会议纪要已生成 ({stream.report()}): {summary_path}")
+            if self.rolling:
+                self.rolling.clear()
             
             # 存入知识库
             if self.knowledge_base:
@@ -306,7 +597,14 @@ class RealtimeAssistant:
                     self.knowledge_base.add_meeting(
                         summary=summary,
                         transcript=full_text,
-                        metadata={"source": "realtime_recording", "date": timestamp}
+                        metadata={
+                            "source": "realtime_recording",
+                            "source_type": "realtime",
+                            "timestamp": int(self.meeting_started_at),
+                            "duration": time.time() - self.meeting_started_at,
+                            "meeting_id": self.meeting_id,
+                        },
+                        index_transcript=self._transcript_indexer is None
                     )
                 except Exception as e:
                     print(f"⚠️ 存入知识库失败: {e}")
@@ -319,3 +617,5 @@ class RealtimeAssistant:
                 )
         except Exception as e:
             print(f"❌ 摘要生成失败: {e}")
+            if self.rolling and self.rolling.checkpoint_path and os.path.exists(self.rolling.checkpoint_path):
+                print(f"💡 可稍后运行 python -m app.llm.rolling {self.rolling.checkpoint_path} 重新生成纪要")
@@ -0,0 +1,104 @@
+from math import gcd
+import numpy as np
+
+# 每个相位的滤波器抽头数：越大阻带衰减越好，CPU 开销线性增加
+DEFAULT_TAPS = 16
+KAISER_BETA = 8.0
+
+
+def design_polyphase_filter(up, down, taps=DEFAULT_TAPS, beta=KAISER_BETA):
+    """
+    设计有理数重采样 (up/down) 的低通原型滤波器，并拆分为 up 个相位的滤波器组。
+
+    :return: 形状为 (up, taps) 的系数矩阵，bank[p, k] = h[p + k * up]
+    """
+    length = up * taps
+    # 截止频率取上 / 下采样后两者 Nyquist 的较小值，并留 10% 过渡带
+    cutoff = 0.5 / max(up, down) * 0.9
+    n = np.arange(length) - (length - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta)
+    # 插零上采样会把能量分散到 up 个相位，乘 up 恢复增益
+    h *= up / h.sum() if h.sum() else up
+    return h.reshape(taps, up).T.astype(np.float32)
+
+
+class StreamingResampler:
+    """
+    流式多相 (polyphase) 重采样器：逐块输入任意长度的 PCM，输出目标采样率的 float32。
+    块与块之间保留滤波器历史与相位，拼接处不会产生爆音。
+    """
+    def __init__(self, src_rate, dst_rate=16000, taps=DEFAULT_TAPS):
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        g = gcd(self.src_rate, self.dst_rate)
+        self.up = self.dst_rate // g
+        self.down = self.src_rate // g
+        self.taps = taps
+        self.bypass = self.up == self.down
+        if self.bypass:
+            return
+        self.bank = design_polyphase_filter(self.up, self.down, taps)
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        # 下一个输出样本在上采样域中的位置（相对于 [历史 + 当前块] 的起点）
+        self._next = (taps - 1) * self.up
+        self._offsets = np.arange(taps)
+
+    def reset(self):
+        if not self.bypass:
+            self._history[:] = 0
+            self._next = (self.taps - 1) * self.up
+
+    def process(self, block):
+        """
+        :param block: 一维 int16 / float32 数组（int16 会归一化到 [-1, 1]）
+        :return: 目标采样率的 float32 数组
+        """
+        block = np.asarray(block)
+        if block.dtype == np.int16:
+            block = block.astype(np.float32) / 32768.0
+        else:
+            block = block.astype(np.float32, copy=False)
+        if self.bypass:
+            return block
+
+        x = np.concatenate((self._history, block))
+        limit = len(x) * self.up
+        count = max(0, -(-(limit - self._next) // self.down))
+        positions = self._next + self.down * np.arange(count)
+        base = positions // self.up
+        phase = positions % self.up
+        # 每个输出样本取 taps 个输入样本与对应相位的系数做点积
+        windows = x[base[:, None] - self._offsets[None, :]]
+        out = np.einsum("ij,ij->i", windows, self.bank[phase])
+
+        consumed = len(block)
+        self._history = x[len(x) - (self.taps - 1):].copy()
+        self._next = self._next + self.down * count - consumed * self.up
+        return out
+
+
+def to_int16(audio):
+    """
+    float32 [-1, 1] -> int16（截断溢出）。
+    """
+    return (np.clip(audio, -1.0, 32767 / 32768) * 32768).astype(np.int16)
+
+
+class FrameAssembler:
+    """
+    把长度不定的重采样输出切成固定长度的帧（webrtcvad 要求 10/20/30 ms 的整帧）。
+    """
+    def __init__(self, frame_size):
+        self.frame_size = frame_size
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def push(self, samples):
+        """
+        :param samples: int16 数组
+        :return: 完整帧列表（每帧为 int16 数组，可能是 samples 的视图）
+        """
+        data = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        full = len(data) // self.frame_size * self.frame_size
+        # 输入可能是环形缓冲区的视图，跨调用保留的尾部需要独立的副本
+        self._pending = data[full:].copy()
+        return [data[i:i + self.frame_size] for i in range(0, full, self.frame_size)]
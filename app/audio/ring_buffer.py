@@ -0,0 +1,183 @@
+from collections import deque
+import numpy as np
+
+
+class RingBuffer:
+    """
+    预分配的单生产者 / 单消费者 int16 环形缓冲区（采集回调写、主循环读）。
+
+    - 无锁：写指针只由生产者推进、读指针只由消费者推进（两者都是单调递增的整数，
+      CPython 下整数赋值是原子的）；消费者在 consume 之前读到的区域不会被覆盖
+    - 写满时丢弃新到的样本而不是阻塞音频回调，并记录丢弃数量
+    - peek 返回底层数组的视图，不复制数据
+    """
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._write = 0
+        self._read = 0
+        self.written = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.peak_fill = 0
+
+    def write(self, samples):
+        """
+        写入样本（生产者调用），返回实际写入的样本数。
+        """
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        n = len(samples)
+        free = self.capacity - (self._write - self._read)
+        if n > free:
+            self.dropped += n - free
+            self.overflows += 1
+            samples = samples[:free]
+            n = free
+        if n == 0:
+            return 0
+        start = self._write % self.capacity
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        if n > first:
+            self._buffer[:n - first] = samples[first:]
+        # 数据写完之后再推进写指针，消费者不会读到未写完的区域
+        self._write += n
+        self.written += n
+        fill = self._write - self._read
+        if fill > self.peak_fill:
+            self.peak_fill = fill
+        return n
+
+    def readable(self):
+        return self._write - self._read
+
+    def peek(self, max_samples=None):
+        """
+        返回可读数据的视图列表（跨越末尾时为两段），调用 consume 之前视图一直有效。
+        """
+        available = self._write - self._read
+        if max_samples is not None:
+            available = min(available, max_samples)
+        if available <= 0:
+            return []
+        start = self._read % self.capacity
+        first = min(available, self.capacity - start)
+        views = [self._buffer[start:start + first]]
+        if available > first:
+            views.append(self._buffer[:available - first])
+        return views
+
+    def consume(self, n):
+        """
+        标记 n 个样本已读（消费者调用），释放对应空间给生产者。
+        """
+        self._read += min(n, self._write - self._read)
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "fill": self.readable(),
+            "fill_ratio": self.readable() / self.capacity,
+            "peak_fill_ratio": self.peak_fill / self.capacity,
+            "written": self.written,
+            "dropped": self.dropped,
+            "overflows": self.overflows,
+        }
+
+
+class SegmentPool:
+    """
+    预分配的语音段缓冲池：采集线程取出缓冲区写入语音，识别线程用完后归还。
+    池空时（识别严重积压）临时分配新缓冲区，不丢数据，并计入 misses。
+    """
+    def __init__(self, count, max_samples):
+        self.count = count
+        self.max_samples = int(max_samples)
+        # deque 的 append / pop 在 CPython 下是线程安全的
+        self._free = deque(np.zeros(self.max_samples, dtype=np.int16) for _ in range(count))
+        self.misses = 0
+
+    def acquire(self):
+        try:
+            return self._free.pop()
+        except IndexError:
+            self.misses += 1
+            return np.zeros(self.max_samples, dtype=np.int16)
+
+    def release(self, buffer):
+        if buffer is not None and len(buffer) == self.max_samples and len(self._free) < self.count:
+            self._free.append(buffer)
+
+    def stats(self):
+        return {"size": self.count, "free": len(self._free), "misses": self.misses}
+
+
+class SegmentBuilder:
+    """
+    在预分配缓冲区中拼接语音段：未触发时把最近的帧保存在预录环中，
+    触发后把预录帧和后续帧依次复制进池中的缓冲区，结束时以切片视图交出，不再 b''.join。
+    """
+    def __init__(self, pool, frame_size, preroll_frames):
+        self.pool = pool
+        self.frame_size = frame_size
+        self._preroll = np.zeros((preroll_frames, frame_size), dtype=np.int16)
+        self._preroll_count = 0
+        self._preroll_next = 0
+        self._buffer = None
+        self._length = 0
+
+    @property
+    def active(self):
+        return self._buffer is not None
+
+    @property
+    def frames(self):
+        return self._length // self.frame_size
+
+    def view(self):
+        """
+        当前语音段已写入部分的视图（缓冲区结束后会被复用，跨线程使用需复制）。
+        """
+        return self._buffer[:self._length]
+
+    def add_preroll(self, frame):
+        self._preroll[self._preroll_next] = frame
+        self._preroll_next = (self._preroll_next + 1) % len(self._preroll)
+        self._preroll_count = min(self._preroll_count + 1, len(self._preroll))
+
+    def start(self, with_preroll=True):
+        """
+        开始新的语音段，并把预录环中的帧按时间顺序放在开头。
+        """
+        self._buffer = self.pool.acquire()
+        self._length = 0
+        if with_preroll and self._preroll_count:
+            first = (self._preroll_next - self._preroll_count) % len(self._preroll)
+            order = (first + np.arange(self._preroll_count)) % len(self._preroll)
+            count = self._preroll_count * self.frame_size
+            self._buffer[:count] = self._preroll[order].reshape(-1)
+            self._length = count
+        self._preroll_count = 0
+
+    def append(self, frame):
+        """
+        追加一帧，缓冲区已满时返回 False（调用方应先结束当前语音段）。
+        """
+        end = self._length + len(frame)
+        if end > len(self._buffer):
+            return False
+        self._buffer[self._length:end] = frame
+        self._length = end
+        return True
+
+    def finish(self):
+        """
+        结束语音段，返回 (音频视图, 底层缓冲区)；识别完成后需将缓冲区归还 pool。
+        """
+        buffer, length = self._buffer, self._length
+        self._buffer, self._length = None, 0
+        return buffer[:length], buffer
+
+    def discard(self):
+        self.pool.release(self._buffer)
+        self._buffer, self._length = None, 0
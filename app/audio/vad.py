@@ -0,0 +1,137 @@
+"""
+批量能量 VAD：对整段 NumPy 音频一次性计算帧能量与语音判决，再做拖尾合并、边界补偿，
+输出语音段。文件模式在送入 ASR 之前预切分（长静音不进入模型、各段可批量并行识别），
+实时模式用它裁掉语音段首尾的静音并在调用 webrtcvad 之前过滤明显的静音帧。
+"""
+import numpy as np
+import app.utils.config as config
+
+
+def frame_energy_db(frames):
+    """
+    逐帧 RMS 能量 (dBFS)。
+
+    :param frames: 形状为 (帧数, 帧长) 的 int16 / float32 数组
+    """
+    frames = np.asarray(frames)
+    scale = 32768.0 if frames.dtype == np.int16 else 1.0
+    frames = frames.astype(np.float32, copy=False)
+    power = np.einsum("ij,ij->i", frames, frames) / max(1, frames.shape[1]) / (scale * scale)
+    return 10 * np.log10(power + 1e-12)
+
+
+def _runs(flags):
+    """
+    返回布尔序列中连续 True 段的 (起点数组, 终点数组)，终点为开区间。
+    """
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _merge_gaps(starts, ends, min_gap):
+    """
+    合并间隔小于 min_gap 帧的相邻段。
+    """
+    if len(starts) <= 1:
+        return starts, ends
+    keep = (starts[1:] - ends[:-1]) >= min_gap
+    return starts[np.concatenate(([True], keep))], ends[np.concatenate((keep, [True]))]
+
+
+class VADSegmenter:
+    """
+    基于能量的批量语音分段器。
+
+    - 判决阈值 = max(绝对下限, 噪声底 + margin)，噪声底取帧能量的第 10 百分位，适应不同录音电平
+    - 拖尾：间隔短于 min_silence 的静音并入前后语音
+    - 补偿：每段前后各扩展 padding，避免切掉字头字尾
+    - 超过 max_segment 的语音段在末尾附近最安静的帧处切开
+    """
+    def __init__(self, sample_rate=16000, frame_ms=30, margin_db=None, floor_db=None, min_speech_ms=None,
+                 min_silence_ms=None, padding_ms=None, max_segment_seconds=None):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db if margin_db is not None else config.VAD_MARGIN_DB
+        self.floor_db = floor_db if floor_db is not None else config.VAD_FLOOR_DB
+        self.min_speech = self._frames(min_speech_ms if min_speech_ms is not None else config.VAD_MIN_SPEECH_MS, frame_ms)
+        self.min_silence = self._frames(min_silence_ms if min_silence_ms is not None else config.VAD_MIN_SILENCE_MS, frame_ms)
+        self.padding = self._frames(padding_ms if padding_ms is not None else config.VAD_PADDING_MS, frame_ms)
+        max_segment_seconds = max_segment_seconds or config.AUDIO_MAX_SEGMENT_SECONDS
+        self.max_segment = max(1, int(max_segment_seconds * 1000 / frame_ms))
+
+    @staticmethod
+    def _frames(ms, frame_ms):
+        return max(0, int(round(ms / frame_ms)))
+
+    def frames(self, audio):
+        """
+        将一维音频切成 (帧数, 帧长) 的视图（末尾不足一帧的部分不参与判决）。
+        """
+        count = len(audio) // self.frame_size
+        return np.asarray(audio)[:count * self.frame_size].reshape(count, self.frame_size)
+
+    def speech_flags(self, audio):
+        """
+        逐帧语音判决，返回 (布尔数组, 帧能量 dB)。
+        """
+        energy = frame_energy_db(self.frames(audio))
+        if not len(energy):
+            return np.zeros(0, dtype=bool), energy
+        noise, loud = np.percentile(energy, [10, 90])
+        # 几乎没有停顿的录音噪声底会被语音抬高，阈值不超过响度参考值以下 25 dB
+        threshold = max(self.floor_db, min(float(noise) + self.margin_db, float(loud) - 25.0))
+        return energy > threshold, energy
+
+    def silent_frames(self, frames):
+        """
+        实时模式的快速门限：能量低于绝对下限的帧直接判为静音（不再调用 webrtcvad）。
+        """
+        return frame_energy_db(frames) <= self.floor_db
+
+    def segment(self, audio):
+        """
+        对整段音频分段，返回 [(起始样本, 结束样本), ...]。
+        """
+        flags, energy = self.speech_flags(audio)
+        starts, ends = _runs(flags)
+        if not len(starts):
+            return []
+        starts, ends = _merge_gaps(starts, ends, self.min_silence)
+        long_enough = (ends - starts) >= self.min_speech
+        starts, ends = starts[long_enough], ends[long_enough]
+        if not len(starts):
+            return []
+        starts = np.maximum(starts - self.padding, 0)
+        ends = np.minimum(ends + self.padding, len(flags))
+        # 补偿后相互重叠 / 相接的段合并
+        starts, ends = _merge_gaps(starts, ends, 1)
+
+        spans = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            spans.extend(self._split_long(start, end, energy))
+        total = len(audio)
+        return [
+            (start * self.frame_size, total if end == len(flags) else min(total, end * self.frame_size))
+            for start, end in spans
+        ]
+
+    def _split_long(self, start, end, energy):
+        spans = []
+        search = max(1, self.max_segment // 5)
+        while end - start > self.max_segment:
+            limit = start + self.max_segment
+            window = energy[limit - search:limit]
+            cut = limit - search + int(np.argmin(window))
+            spans.append((start, cut))
+            start = cut
+        spans.append((start, end))
+        return spans
+
+    def trim(self, audio):
+        """
+        裁掉首尾静音（返回视图，不复制）；整段都是静音时返回空数组。
+        """
+        spans = self.segment(audio)
+        if not spans:
+            return audio[:0]
+        return audio[spans[0][0]:spans[-1][1]]
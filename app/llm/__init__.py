@@ -0,0 +1,13 @@
+"""
+LLM 子系统。包级属性按需导入（PEP 562），只有用到时才加载 LangChain 与提供商 SDK。
+"""
+from app.utils.plugins import lazy_exports
+
+_EXPORTS = {
+    "MeetingSummarizer": "app.llm.summarizer",
+    "TimedStream": "app.llm.streaming",
+    "write_stream": "app.llm.streaming",
+    "split_by_tokens": "app.llm.text_splitter",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
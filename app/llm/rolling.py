@@ -0,0 +1,188 @@
+"""
+实时会议的滚动摘要：会议进行中在后台把新增逐字稿折叠进摘要状态（分段要点），
+结束时只需对尚未折叠的尾部做一次 map，再做一次 reduce，耗时不随会议时长增长。
+状态随时写入检查点，进程意外退出后可以从检查点直接生成纪要。
+
+用法:
+    python -m app.llm.rolling output/realtime_2024-01-01-10-00-00_summary.ckpt.json
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import app.utils.config as config
+from app.llm.text_splitter import estimate_tokens, split_by_tokens
+
+
+class RollingSummarizer:
+    """
+    增量摘要状态：partials 为已折叠段落的要点（map 结果），pending 为尚未折叠的逐字稿，
+    folding 为正在后台折叠、尚未得到要点的逐字稿。状态在每次追加 / 折叠后写入检查点。
+
+    - 新增文本累积到 ROLLING_SUMMARY_TOKENS，或距上次折叠超过 ROLLING_SUMMARY_INTERVAL_MINUTES 时，
+      在后台线程中用 map 提示词生成该段要点
+    - 要点总长超出 SUMMARY_CHUNK_TOKENS 时先用 reduce 提示词压缩为一条，保证最终合并的输入有界
+    """
+    def __init__(self, summarizer, checkpoint_path=None, interval_minutes=None, max_tokens=None):
+        self.summarizer = summarizer
+        self.checkpoint_path = checkpoint_path
+        self.interval = (interval_minutes if interval_minutes is not None else config.ROLLING_SUMMARY_INTERVAL_MINUTES) * 60
+        self.max_tokens = max_tokens or config.ROLLING_SUMMARY_TOKENS
+        # 按时间触发时，待折叠文本至少要有这么多 token，避免零碎的 LLM 调用
+        self.min_tokens = max(1, self.max_tokens // 10)
+        self.partials = []
+        self.pending = []
+        self.folding = []
+        self.folds = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._worker = None
+        self._last_fold = time.time()
+
+    @classmethod
+    def load(cls, summarizer, checkpoint_path):
+        """
+        从检查点恢复状态。
+        """
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        rolling = cls(summarizer, checkpoint_path)
+        rolling.partials = state.get("partials", [])
+        # 检查点写入时正在折叠的文本尚未得到要点，恢复后与未折叠文本一起重新折叠
+        rolling.pending = [state[key] for key in ("folding", "pending") if state.get(key)]
+        rolling.folds = state.get("folds", 0)
+        return rolling
+
+    def feed(self, text):
+        """
+        追加新的逐字稿（识别线程调用，不阻塞），满足条件时在后台折叠。
+        """
+        if not text:
+            return
+        with self._lock:
+            self.pending.append(text)
+            tokens = estimate_tokens("\n".join(self.pending))
+            due = tokens >= self.max_tokens or (
+                tokens >= self.min_tokens and time.time() - self._last_fold >= self.interval
+            )
+            if due and not (self._worker and self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._fold, name="rolling-summary", daemon=True)
+                self._worker.start()
+                return
+        # 未折叠的文本也写入检查点，进程退出时不丢失
+        self.save()
+
+    def _fold(self):
+        with self._lock:
+            pending, self.pending = self.pending, []
+            # 折叠完成前这部分文本仍需写入检查点，否则此时崩溃会丢失
+            self.folding = pending
+            index = len(self.partials) + 1
+        text = "\n".join(pending)
+        try:
+            print(f"\n🧠 滚动摘要: 折叠第 {index} 段 ({estimate_tokens(text)} tokens)...")
+            partials = self.partials + self._map(text, index)
+            if len(partials) > 1 and estimate_tokens("\n\n".join(partials)) > self.summarizer.chunk_tokens:
+                partials = [self._reduce(partials)]
+        except Exception as e:
+            print(f"⚠️ 滚动摘要失败，将在下次折叠时重试: {e}")
+            with self._lock:
+                self.pending = pending + self.pending
+                self.folding = []
+            return
+        with self._lock:
+            self.partials = partials
+            self.folding = []
+            self.folds += 1
+            self._last_fold = time.time()
+        self.save()
+
+    def _map(self, text, index):
+        """
+        生成一段或多段（文本超出 SUMMARY_CHUNK_TOKENS 时先分块）要点，返回要点列表。
+        """
+        chunks = [text]
+        if estimate_tokens(text) > self.summarizer.chunk_tokens:
+            chunks = split_by_tokens(text, self.summarizer.chunk_tokens, self.summarizer.chunk_overlap)
+        # 会议仍在进行，总段数未知，以当前段号作为总数
+        prompts = [
+            self.summarizer.map_prompt.format(text=chunk, index=index + i, total=index + i)
+            for i, chunk in enumerate(chunks)
+        ]
+        responses = self.summarizer.llm.batch(prompts, config={"max_concurrency": self.summarizer.max_concurrency})
+        return [response.content for response in responses]
+
+    def _reduce(self, partials):
+        prompt = self.summarizer.reduce_prompt.format(text=self.summarizer._join_partials(partials))
+        return self.summarizer.llm.invoke(prompt).content
+
+    def wait(self):
+        """
+        等待正在进行的后台折叠完成。
+        """
+        worker = self._worker
+        if worker:
+            worker.join()
+
+    def save(self):
+        if not self.checkpoint_path:
+            return
+        with self._lock:
+            state = {
+                "partials": list(self.partials),
+                "folding": "\n".join(self.folding),
+                "pending": "\n".join(self.pending),
+                "folds": self.folds,
+                "updated_at": int(time.time()),
+            }
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        # 多个识别线程可能同时保存，临时文件的写入与替换需要串行
+        with self._save_lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.checkpoint_path)
+
+    def clear(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def summarize_stream(self):
+        """
+        流式生成最终纪要：尾部未折叠的文本做一次 map，再与已有要点一起 reduce。
+        从未折叠过（短会议）时与普通摘要相同。
+        """
+        self.wait()
+        with self._lock:
+            partials = list(self.partials)
+            tail = "\n".join(self.pending)
+        if not partials:
+            yield from self.summarizer.summarize_stream(tail)
+            return
+        if tail.strip():
+            partials.extend(self._map(tail, len(partials) + 1))
+        print(f"正在合并 {len(partials)} 段滚动摘要...")
+        for chunk in self.summarizer.llm.stream(self.summarizer.reduce_prompt_for(partials)):
+            if chunk.content:
+                yield chunk.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从滚动摘要检查点生成会议纪要")
+    parser.add_argument("checkpoint", help="*_summary.ckpt.json 检查点路径")
+    parser.add_argument("--output", default=None, help="纪要输出路径 (默认与检查点同名的 .md)")
+    args = parser.parse_args()
+
+    from app.llm.summarizer import MeetingSummarizer
+    from app.llm.streaming import TimedStream, write_stream
+
+    rolling = RollingSummarizer.load(MeetingSummarizer(), args.checkpoint)
+    output = args.output or args.checkpoint.replace(".ckpt.json", ".md")
+    stream = TimedStream(rolling.summarize_stream())
+    write_stream(output, stream)
+    print(f"✅ 会议纪要已生成 ({stream.report()}): {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import time
+
+
+class TimedStream:
+    """
+    包装 LLM 的 token 流，记录首 token 延迟 (TTFT) 与总耗时，并累积完整文本。
+
+    用法：
+        stream = TimedStream(summarizer.summarize_stream(text))
+        for piece in stream: ...
+        print(stream.ttft, stream.total, stream.text)
+    """
+    def __init__(self, iterable):
+        self._iterable = iterable
+        self.ttft = None
+        self.total = None
+        self._parts = []
+
+    def __iter__(self):
+        started = time.time()
+        for piece in self._iterable:
+            if not piece:
+                continue
+            if self.ttft is None:
+                self.ttft = time.time() - started
+            self._parts.append(piece)
+            yield piece
+        self.total = time.time() - started
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def report(self):
+        if self.ttft is None:
+            return "未收到输出"
+        return f"首 token {self.ttft:.2f}s，总耗时 {self.total or 0:.2f}s"
+
+
+def write_stream(path, stream):
+    """
+    将 token 流边生成边写入文件：先写入 path.partial 并逐块 flush，
+    完成后原子替换为正式文件；中途失败时保留 .partial 以便查看已生成的内容。
+
+    :return: 完整文本
+    """
+    partial_path = f"{path}.partial"
+    parts = []
+    with open(partial_path, "w", encoding="utf-8") as f:
+        for piece in stream:
+            if not piece:
+                continue
+            f.write(piece)
+            f.flush()
+            parts.append(piece)
+    os.replace(partial_path, path)
+    return "".join(parts)
@@ -1,8 +1,14 @@
-from langchain_openai import ChatOpenAI
-from langchain_community.chat_models import ChatTongyi, ChatZhipuAI
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate
 import app.utils.config as config
+from app.llm.text_splitter import estimate_tokens, split_by_tokens
+from app.utils.plugins import PluginRegistry
+
+# LLM 后端按需导入：只加载当前提供商的 SDK
+LLM_BACKENDS = PluginRegistry("LLM")
+LLM_BACKENDS.register("openai", "langchain_openai:ChatOpenAI")
+LLM_BACKENDS.register("tongyi", "langchain_community.chat_models:ChatTongyi", requires=("dashscope",))
+LLM_BACKENDS.register("glm", "langchain_community.chat_models:ChatZhipuAI")
+LLM_BACKENDS.register("ollama", "langchain_ollama:ChatOllama")
 
 class MeetingSummarizer:
     """
@@ -14,6 +20,8 @@ class MeetingSummarizer:
         
         :param provider: LLM 提供商 (openai, tongyi, glm, ollama)
         """
+        self.provider = provider
+        self.model_name = self._get_model_name(provider)
         self.llm = self._get_llm(provider)
         self.prompt = PromptTemplate(
             input_variables=["text"],
@@ -32,7 +40,60 @@ class MeetingSummarizer:
             会议纪要:
             """
         )
+        # 长会议分块摘要 (map-reduce)
+        self.mode = config.SUMMARY_MODE
+        self.chunk_tokens = config.SUMMARY_CHUNK_TOKENS
+        self.chunk_overlap = config.SUMMARY_CHUNK_OVERLAP
+        self.max_concurrency = config.SUMMARY_MAX_CONCURRENCY
+        self.map_prompt = PromptTemplate(
+            input_variables=["text", "index", "total"],
+            template="""
+            你是一位专业的会议助手。以下是一场长会议记录的第 {index}/{total} 段。
+            请只根据本段内容提取要点，不要编造其他段落的信息。
+
+            请输出：
+            1. 本段讨论的议题
+            2. 关键点 (项目符号列表)
+            3. 待办事项 (谁需要做什么)
+            4. 达成的决议
+
+            会议记录片段:
+            {text}
+
+            本段要点:
+            """
+        )
+        self.reduce_prompt = PromptTemplate(
+            input_variables=["text"],
+            template="""
+            你是一位专业的会议助手。以下是同一场会议按时间顺序各段的要点。
+            请合并去重，整理成一份完整的结构化纪要。
+
+            纪要应包含：
+            1. 会议主题
+            2. 关键点 (项目符号列表)
+            3. 待办事项 (谁需要做什么)
+            4. 达成的决议
+
+            各段要点:
+            {text}
+
+            会议纪要:
+            """
+        )
         
+    def _get_model_name(self, provider):
+        """
+        返回提供商对应的模型名（用于缓存键与日志）。
+        """
+        if provider == "tongyi":
+            return "qwen-turbo"  # ChatTongyi 默认模型
+        if provider == "glm":
+            return "glm-4"
+        if provider == "ollama":
+            return config.OLLAMA_MODEL
+        return "gpt-3.5-turbo"
+
     def _get_llm(self, provider):
         """
         根据配置获取 LLM 实例。
@@ -40,34 +101,131 @@ class MeetingSummarizer:
         print(f"🔄 初始化 LLM: provider={provider}")
 
         if provider == "tongyi":
+            ChatTongyi = LLM_BACKENDS.load("tongyi")
             return ChatTongyi(api_key=config.DASHSCOPE_API_KEY)
         elif provider == "glm":
+            ChatZhipuAI = LLM_BACKENDS.load("glm")
             return ChatZhipuAI(
                 api_key=config.ZHIPUAI_API_KEY,
-                model="glm-4"
+                model=self.model_name
             )
         elif provider == "ollama":
-            model_name = config.OLLAMA_MODEL 
+            model_name = self.model_name
             base_url = config.OLLAMA_BASE_URL
             print(f"🔄 初始化 ChatOllama: model={model_name}, base_url={base_url}")
+            ChatOllama = LLM_BACKENDS.load("ollama")
             return ChatOllama(model=model_name, base_url=base_url)
         else:
             # 默认为 OpenAI 或 兼容 API
+            ChatOpenAI = LLM_BACKENDS.load("openai")
             return ChatOpenAI(
                 api_key=config.OPENAI_API_KEY,
                 base_url=config.OPENAI_BASE_URL,
-                model="gpt-3.5-turbo", 
+                model=self.model_name, 
                 temperature=0.3
             )
 
+    def signature(self):
+        """
+        影响摘要结果的全部参数（提示词、模型、分块策略），用作缓存键的一部分。
+        """
+        return {
+            "provider": self.provider,
+            "model": self.model_name,
+            "prompt": self.prompt.template,
+            "mode": self.mode,
+            "map_prompt": self.map_prompt.template,
+            "reduce_prompt": self.reduce_prompt.template,
+            "chunk_tokens": self.chunk_tokens,
+            "chunk_overlap": self.chunk_overlap,
+        }
+
     def summarize(self, text):
         """
         生成摘要。
+        短会议一次性生成；超出 SUMMARY_CHUNK_TOKENS 的长会议走 map-reduce，
+        各段摘要并发生成（并发上限 SUMMARY_MAX_CONCURRENCY）后再合并。
         """
         print("正在生成会议纪要...")
-        final_prompt = self.prompt.format(text=text)
-        response = self.llm.invoke(final_prompt)
-        return response.content
+        chunks = self.split(text)
+        if len(chunks) <= 1:
+            final_prompt = self.prompt.format(text=text)
+            response = self.llm.invoke(final_prompt)
+            return response.content
+        partials = self.map_chunks(chunks)
+        return self.llm.invoke(self.reduce_prompt_for(partials)).content
+
+    def summarize_stream(self, text):
+        """
+        流式生成摘要，逐块返回文本。
+        长会议的 map 阶段仍并发执行，仅最终合并阶段以流式输出。
+        """
+        print("正在生成会议纪要 (流式)...")
+        chunks = self.split(text)
+        if len(chunks) <= 1:
+            final_prompt = self.prompt.format(text=text)
+        else:
+            final_prompt = self.reduce_prompt_for(self.map_chunks(chunks))
+        for chunk in self.llm.stream(final_prompt):
+            if chunk.content:
+                yield chunk.content
+
+    def split(self, text):
+        """
+        按配置的模式决定是否分块，返回文本块列表（不分块时只有一个元素）。
+        """
+        if self.mode == "stuff":
+            return [text]
+        if self.mode == "auto" and estimate_tokens(text) <= self.chunk_tokens:
+            return [text]
+        return split_by_tokens(text, self.chunk_tokens, self.chunk_overlap)
+
+    def map_chunks(self, chunks):
+        """
+        并发生成各分块的要点 (map 阶段)。
+        """
+        total = len(chunks)
+        print(f"📚 会议记录较长，分 {total} 段并行摘要 (并发 {self.max_concurrency})...")
+        prompts = [
+            self.map_prompt.format(text=chunk, index=i + 1, total=total)
+            for i, chunk in enumerate(chunks)
+        ]
+        responses = self.llm.batch(prompts, config={"max_concurrency": self.max_concurrency})
+        return [response.content for response in responses]
+
+    def reduce_prompt_for(self, partials):
+        """
+        构造合并阶段 (reduce) 的提示词。
+        分段要点合起来仍超出上下文预算时，先分组折叠，直到可以一次合并。
+        """
+        while len(partials) > 1 and estimate_tokens("\n\n".join(partials)) > self.chunk_tokens:
+            groups = self._group_partials(partials)
+            print(f"🔁 分段要点过长，折叠为 {len(groups)} 组后再合并...")
+            prompts = [self.reduce_prompt.format(text=self._join_partials(group)) for group in groups]
+            responses = self.llm.batch(prompts, config={"max_concurrency": self.max_concurrency})
+            partials = [response.content for response in responses]
+        return self.reduce_prompt.format(text=self._join_partials(partials))
+
+    def _group_partials(self, partials):
+        # 按 token 预算分组，每组至少两项，保证每轮折叠都能减少条目数
+        groups, current, size = [], [], 0
+        for partial in partials:
+            tokens = estimate_tokens(partial)
+            if len(current) >= 2 and size + tokens > self.chunk_tokens:
+                groups.append(current)
+                current, size = [], 0
+            current.append(partial)
+            size += tokens
+        if current:
+            if len(current) == 1 and groups:
+                groups[-1].extend(current)
+            else:
+                groups.append(current)
+        return groups
+
+    @staticmethod
+    def _join_partials(partials):
+        return "\n\n".join(f"【第 {i + 1} 段】\n{partial}" for i, partial in enumerate(partials))
 
 
     
@@ -0,0 +1,69 @@
+import re
+
+# 中文句末标点 + 英文句末标点 + 换行
+_SENTENCE_END = re.compile(r'(?<=[。！？；!?;…\n])')
+_CJK = re.compile(r'[㐀-鿿豈-﫿　-〿＀-￯]')
+
+
+def estimate_tokens(text):
+    """
+    粗略估算 token 数：中日韩字符/全角标点约 1 token/字，其余约 4 字符/token。
+    不依赖具体 tokenizer，足以用于分块预算。
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def split_sentences(text):
+    """
+    按句末标点与换行切分句子，保留标点，丢弃空白句。
+    """
+    return [s for s in (part.strip() for part in _SENTENCE_END.split(text)) if s]
+
+
+def hard_split(sentence, max_tokens):
+    # 单句超长（例如没有标点的 ASR 输出）时按字符硬切，逐字累计 token 预算
+    pieces, start, budget = [], 0, 0.0
+    for i, ch in enumerate(sentence):
+        cost = 1.0 if _CJK.match(ch) else 0.25
+        if i > start and budget + cost > max_tokens:
+            pieces.append(sentence[start:i])
+            start, budget = i, 0.0
+        budget += cost
+    pieces.append(sentence[start:])
+    return pieces
+
+
+def split_by_tokens(text, max_tokens, overlap_tokens=0):
+    """
+    句子感知的分块：尽量在句子边界切分，每块不超过 max_tokens，
+    相邻块之间保留约 overlap_tokens 的重叠句子以保持上下文连贯。
+    """
+    sentences = []
+    for sentence in split_sentences(text):
+        if estimate_tokens(sentence) > max_tokens:
+            sentences.extend(hard_split(sentence, max_tokens))
+        else:
+            sentences.append(sentence)
+
+    chunks, current, current_tokens = [], [], 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("".join(current))
+            # 从上一块末尾回退若干句作为重叠
+            overlap, overlap_size = [], 0
+            for prev in reversed(current):
+                size = estimate_tokens(prev)
+                if overlap_size + size > overlap_tokens:
+                    break
+                overlap.insert(0, prev)
+                overlap_size += size
+            current, current_tokens = overlap, overlap_size
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
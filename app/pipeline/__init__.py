@@ -0,0 +1,10 @@
+"""
+批处理流水线。包级属性按需导入（PEP 562）。
+"""
+from app.utils.plugins import lazy_exports
+
+_EXPORTS = {
+    "BatchPipeline": "app.pipeline.batch",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
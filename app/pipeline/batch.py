@@ -0,0 +1,254 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import app.utils.config as config
+from app.asr.registry import model_key
+from app.llm.streaming import TimedStream, write_stream
+from app.utils.cache import cached_summarize_stream, cached_transcribe
+from app.asr.transcript import read_segments, sidecar_path
+
+# 结束标记
+_STOP = object()
+
+
+def _init_asr_process(threads_per_process):
+    """
+    ASR 子进程初始化：限制每个进程的计算线程数，避免多进程时 CPU 超额订阅。
+    """
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads_per_process))
+
+
+def _transcribe_in_process(audio_path):
+    """
+    在子进程中执行转录。模型由子进程内的注册表加载，进程存活期间复用。
+    """
+    from app.asr.registry import registry
+    transcriber = registry.acquire()
+    try:
+        return transcriber.transcribe(audio_path, verbose=False)
+    finally:
+        registry.release(transcriber)
+
+
+def _stream_transcribe_in_process(audio_path, transcript_path, key):
+    """
+    在子进程中流式转录：逐窗口识别并追加写入逐字稿，支持断点续跑。
+    缺少 PyAV 时退回整文件转录。
+    """
+    from app.asr.registry import registry
+    from app.asr.stream import transcribe_to_file
+    transcriber = registry.acquire()
+    try:
+        try:
+            return transcribe_to_file(transcriber, audio_path, transcript_path, key)
+        except ImportError as e:
+            print(f"⚠️ 流式转录不可用 ({e})，改为整文件转录")
+            return transcriber.transcribe(audio_path, verbose=False)
+    finally:
+        registry.release(transcriber)
+
+
+class _Stage:
+    """
+    流水线的一个阶段：若干工作线程从 inbox 取任务，处理后放入 outbox（有界队列提供背压）。
+    """
+    def __init__(self, name, fn, workers, inbox, outbox=None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self):
+        """
+        所有上游任务投递完毕后调用，等待本阶段处理完成。
+        """
+        for _ in self._threads:
+            self.inbox.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self.inbox.get()
+            if item is _STOP:
+                break
+            started = time.time()
+            try:
+                result = self.fn(item)
+                ok = True
+            except Exception as e:
+                print(f"❌ [{self.name}] {item['file']} 处理失败: {e}")
+                result, ok = None, False
+            elapsed = time.time() - started
+            item["timings"][self.name] = elapsed
+            with self._lock:
+                self.busy_seconds += elapsed
+                if ok:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+            if ok and result is not None and self.outbox is not None:
+                self.outbox.put(result)
+
+
+class BatchPipeline:
+    """
+    文件模式的分阶段并行流水线：
+    ASR (进程池) -> 摘要 (线程池) -> 入库/通知 (线程池)。
+    各阶段之间使用有界队列，LLM 网络等待与本地 ASR 计算可以重叠进行。
+    """
+    def __init__(self, summarizer, knowledge_base, notifier, output_dir):
+        self.summarizer = summarizer
+        self.knowledge_base = knowledge_base
+        self.notifier = notifier
+        self.output_dir = output_dir
+
+        cores = os.cpu_count() or 1
+        self.asr_processes = config.PIPELINE_ASR_PROCESSES or cores
+        self.summary_workers = config.PIPELINE_SUMMARY_WORKERS
+        self.index_workers = config.PIPELINE_INDEX_WORKERS
+        self.queue_size = config.PIPELINE_QUEUE_SIZE
+        self._threads_per_process = max(1, cores // self.asr_processes)
+        self._executor = None
+
+    def run(self, audio_paths):
+        """
+        处理一批音频文件，结束后打印吞吐量报告。
+        """
+        if not audio_paths:
+            return
+        asr_processes = min(self.asr_processes, len(audio_paths))
+        print(
+            f"\n🚚 启动批处理流水线: {len(audio_paths)} 个文件, ASR 进程 {asr_processes}, "
+            f"摘要并发 {self.summary_workers}, 入库并发 {self.index_workers}"
+        )
+
+        asr_queue = queue.Queue(maxsize=self.queue_size)
+        summary_queue = queue.Queue(maxsize=self.queue_size)
+        index_queue = queue.Queue(maxsize=self.queue_size)
+        stages = [
+            _Stage("asr", self._asr_step, asr_processes, asr_queue, summary_queue),
+            _Stage("summary", self._summary_step, self.summary_workers, summary_queue, index_queue),
+            _Stage("index", self._index_step, self.index_workers, index_queue),
+        ]
+
+        started = time.time()
+        # 使用 spawn 启动子进程，避免 fork 继承已初始化的 OpenMP / 模型线程状态
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=asr_processes,
+            mp_context=ctx,
+            initializer=_init_asr_process,
+            initargs=(self._threads_per_process,)
+        ) as executor:
+            self._executor = executor
+            for stage in stages:
+                stage.start()
+            for audio_path in audio_paths:
+                audio_file = os.path.basename(audio_path)
+                asr_queue.put({
+                    "file": audio_file,
+                    "audio_path": audio_path,
+                    "base_name": os.path.splitext(audio_file)[0],
+                    "timings": {},
+                })
+            for stage in stages:
+                stage.close()
+            self._executor = None
+
+        self._report(stages, len(audio_paths), time.time() - started)
+
+    def _asr_step(self, item):
+        output_transcript_path = os.path.join(self.output_dir, f"{item['base_name']}_transcript.txt")
+        # 按音频内容 + 模型配置查缓存，改名或重复上传的文件不会重新识别
+        print(f">>> 开始转录: {item['file']}")
+        key = model_key()
+        if config.ASR_STREAMING:
+            # 长录音按窗口识别，逐段写入逐字稿文件，中断后重跑会从断点继续
+            transcribe_fn = lambda path: self._executor.submit(
+                _stream_transcribe_in_process, path, output_transcript_path, key
+            ).result()
+        else:
+            transcribe_fn = lambda path: self._executor.submit(_transcribe_in_process, path).result()
+        transcript = cached_transcribe(None, item["audio_path"], key, transcribe_fn=transcribe_fn,
+                                       streaming=config.ASR_STREAMING)
+        with open(output_transcript_path, "w", encoding="utf-8") as f:
+            f.write(transcript)
+        print(f"转录完成，已保存至 {output_transcript_path}")
+        # 流式转录同时写出的结构化逐字稿（带时间戳），入库分块时复用
+        segments_path = sidecar_path(output_transcript_path)
+        if os.path.exists(segments_path):
+            item["segments_path"] = segments_path
+
+        if not transcript.strip():
+            print(f"{item['file']} 转录内容为空，跳过摘要生成。")
+            return None
+        item["transcript"] = transcript
+        return item
+
+    def _summary_step(self, item):
+        output_summary_path = os.path.join(self.output_dir, f"{item['base_name']}_summary.md")
+        # 边生成边写盘，中途失败也能在 .partial 文件中看到已生成的部分
+        stream = TimedStream(cached_summarize_stream(self.summarizer, item["transcript"]))
+        summary = write_stream(output_summary_path, stream)
+        print(f"会议纪要生成成功 ({stream.report()})，已保存至 {output_summary_path}")
+        item["summary"] = summary
+        item["summary_path"] = output_summary_path
+        return item
+
+    def _index_step(self, item):
+        # 存入知识库
+        try:
+            segments = list(read_segments(item["segments_path"])) if item.get("segments_path") else None
+            self.knowledge_base.add_meeting(
+                summary=item["summary"],
+                transcript=item["transcript"],
+                segments=segments,
+                metadata={
+                    "source": item["file"],
+                    "source_type": "file",
+                    # 以录音文件的修改时间作为会议时间
+                    "timestamp": int(os.path.getmtime(item["audio_path"])),
+                }
+            )
+        except Exception as e:
+            print(f"⚠️ 存入知识库失败: {e}")
+
+        # 发送邮件通知
+        if config.ENABLE_EMAIL_NOTIFICATION:
+            self.notifier.send_summary(
+                subject=f"会议纪要: {item['base_name']}",
+                summary_content=item["summary"],
+                attachment_path=item["summary_path"]
+            )
+        return item
+
+    def _report(self, stages, total, wall_seconds):
+        done = stages[-1].processed
+        failed = sum(stage.failed for stage in stages)
+        print("\n📊 批处理吞吐量报告")
+        print(f"   文件总数: {total}, 完成: {done}, 失败: {failed}")
+        print(f"   总耗时: {wall_seconds:.1f}s, 吞吐量: {done / wall_seconds * 60:.2f} 个文件/分钟")
+        for stage in stages:
+            handled = stage.processed + stage.failed
+            avg = stage.busy_seconds / handled if handled else 0.0
+            utilization = stage.busy_seconds / (wall_seconds * stage.workers) if wall_seconds else 0.0
+            print(
+                f"   - {stage.name:<8} 并发 {stage.workers:<3} 处理 {handled:<4} "
+                f"平均 {avg:.1f}s/个  利用率 {utilization:.0%}"
+            )
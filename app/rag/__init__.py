@@ -0,0 +1,17 @@
+"""
+知识库子系统。包级属性按需导入（PEP 562），import app.rag 不会加载向量库与向量模型。
+"""
+from app.utils.plugins import lazy_exports
+
+_EXPORTS = {
+    "MeetingKnowledgeBase": "app.rag.vector_store",
+    "FaissWALStore": "app.rag.faiss_store",
+    "BM25Index": "app.rag.bm25",
+    "TranscriptChunker": "app.rag.chunker",
+    "TranscriptIndexer": "app.rag.chunker",
+    "CachedEmbeddings": "app.rag.embedding_cache",
+    "RetrievalResult": "app.rag.retrieval",
+    "SemanticAnswerCache": "app.rag.answer_cache",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
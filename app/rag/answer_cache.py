@@ -0,0 +1,149 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import app.utils.config as config
+from app.rag.bm25 import doc_key
+
+
+def docs_fingerprint(docs):
+    """
+    检索文档集合的指纹：文档 ID 按检索顺序拼接后取哈希。
+    新会议入库后检索结果发生变化，指纹随之改变，旧答案不再命中。
+    """
+    return hashlib.sha1("\n".join(doc_key(doc) for doc in docs).encode("utf-8")).hexdigest()
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class SemanticAnswerCache:
+    """
+    RAG 问答的语义缓存：问题向量与历史问题的余弦相似度超过阈值、
+    且本次检索到的文档集合与当时一致时，直接返回缓存的答案，跳过 LLM 调用。
+
+    - 作用域：(LLM 模型, 过滤条件) 不同的问题互不命中
+    - 淘汰：TTL 过期 + 按最近使用的 LRU
+    - 持久化：JSON 文件（向量以 base64 float32 保存），写入时原子替换
+    """
+    def __init__(self, path=None, threshold=None, ttl=None, max_entries=None):
+        self.path = path or os.path.join(config.CACHE_DIR, "answers.json")
+        self.threshold = threshold if threshold is not None else config.RAG_ANSWER_CACHE_THRESHOLD
+        self.ttl = ttl if ttl is not None else config.RAG_ANSWER_CACHE_TTL
+        self.max_entries = max_entries or config.RAG_ANSWER_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # id -> entry，按最近使用排序
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def make_scope(llm, filters):
+        model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+        return json.dumps([str(model), filters or {}], ensure_ascii=False, sort_keys=True)
+
+    def lookup(self, query_vector, scope, fingerprint):
+        """
+        查找语义相近且文档集合一致的缓存答案，未命中返回 None。
+        """
+        query_vector = _normalize(query_vector)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            best_id, best_score = None, self.threshold
+            for entry_id, entry in self._entries.items():
+                if entry["scope"] != scope or entry["fingerprint"] != fingerprint:
+                    continue
+                score = float(np.dot(entry["vector"], query_vector))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None:
+                self.misses += 1
+                return None
+            entry = self._entries[best_id]
+            entry["last_used"] = now
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return entry["answer"]
+
+    def put(self, question, query_vector, scope, fingerprint, answer):
+        """
+        写入答案。同一作用域下语义相同但文档集合已过时的旧条目一并替换。
+        """
+        query_vector = _normalize(query_vector)
+        now = time.time()
+        with self._lock:
+            stale = [
+                entry_id for entry_id, entry in self._entries.items()
+                if entry["scope"] == scope and float(np.dot(entry["vector"], query_vector)) >= self.threshold
+            ]
+            for entry_id in stale:
+                del self._entries[entry_id]
+            entry_id = hashlib.sha1(f"{scope}\n{question}\n{now}".encode("utf-8")).hexdigest()
+            self._entries[entry_id] = {
+                "question": question,
+                "vector": query_vector,
+                "scope": scope,
+                "fingerprint": fingerprint,
+                "answer": answer,
+                "created_at": now,
+                "last_used": now
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def _expire(self, now):
+        expired = [entry_id for entry_id, entry in self._entries.items() if now - entry["created_at"] > self.ttl]
+        for entry_id in expired:
+            del self._entries[entry_id]
+
+    # ---------- 持久化 ----------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 问答缓存读取失败，已忽略: {e}")
+            return
+        now = time.time()
+        for record in sorted(records, key=lambda r: r["last_used"]):
+            if now - record["created_at"] > self.ttl:
+                continue
+            record["vector"] = np.frombuffer(base64.b64decode(record["vector"]), dtype=np.float32)
+            self._entries[record.pop("id")] = record
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        records = [
+            dict(entry, id=entry_id, vector=base64.b64encode(entry["vector"].tobytes()).decode("ascii"))
+            for entry_id, entry in self._entries.items()
+        ]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 问答缓存写入失败: {e}")
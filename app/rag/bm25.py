@@ -0,0 +1,163 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from langchain_core.documents import Document
+
+# 中文分词：优先 jieba，未安装时退化为字符二元组
+try:
+    import jieba
+    jieba.setLogLevel(60)
+    HAS_JIEBA = True
+except ImportError:
+    HAS_JIEBA = False
+
+# 项目编号、版本号、英文名等需要整体匹配的词
+_ASCII_TERM = re.compile(r'[A-Za-z0-9][A-Za-z0-9._\-]*')
+_CJK_RUN = re.compile(r'[㐀-鿿豈-﫿]+')
+
+
+def tokenize(text):
+    """
+    中英混合分词：英文/数字整体成词（小写），中文用 jieba 搜索模式或字符二元组。
+    """
+    tokens = [t.lower().rstrip("._-") for t in _ASCII_TERM.findall(text)]
+    for run in _CJK_RUN.findall(text):
+        if HAS_JIEBA:
+            tokens.extend(w for w in jieba.lcut_for_search(run) if w.strip())
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return [t for t in tokens if t]
+
+
+def doc_key(doc):
+    """
+    文档的融合键：优先使用入库时写入的 doc_id，旧数据退化为内容哈希。
+    """
+    return doc.metadata.get("doc_id") or hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(result_lists, k=60, limit=None, with_scores=False):
+    """
+    倒数排名融合 (RRF)：score = Σ 1 / (k + rank)。
+    各检索器的分数量纲不同，只使用排名进行融合。
+
+    :param with_scores: 为 True 时返回 [(doc, score), ...]
+    """
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            key = doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    if limit is not None:
+        ranked = ranked[:limit]
+    if with_scores:
+        return [(docs[key], scores[key]) for key in ranked]
+    return [docs[key] for key in ranked]
+
+
+class BM25Index:
+    """
+    持久化的 BM25 倒排索引，与向量库并行维护。
+    新文档以追加方式写入 JSONL（含预先计算的词频），启动时加载重建倒排表。
+    """
+    def __init__(self, path, k1=1.5, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs = {}         # doc_id -> (text, metadata, length)
+        self._postings = {}     # term -> {doc_id: tf}
+        self._total_len = 0
+        self._load()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                self._index(record["id"], record["text"], record["metadata"], record["tf"])
+        if valid_bytes < os.path.getsize(self.path):
+            # 截掉崩溃时写了一半的尾部，避免后续追加的记录与残行拼在一起
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def _index(self, doc_id, text, metadata, tf):
+        if doc_id in self._docs:
+            return
+        length = sum(tf.values())
+        self._docs[doc_id] = (text, metadata, length)
+        self._total_len += length
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+
+    def add(self, doc_ids, texts, metadatas):
+        """
+        增量添加文档并追加写盘。
+        """
+        records = []
+        with self._lock:
+            for doc_id, text, metadata in zip(doc_ids, texts, metadatas):
+                if doc_id in self._docs:
+                    continue
+                tf = dict(Counter(tokenize(text)))
+                self._index(doc_id, text, metadata, tf)
+                records.append(json.dumps(
+                    {"id": doc_id, "text": text, "metadata": metadata, "tf": tf},
+                    ensure_ascii=False
+                ))
+            if records:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(records) + "\n")
+
+    def search(self, query, k=4, filter_fn=None):
+        """
+        BM25 检索，返回按得分排序的 Document 列表。
+
+        :param filter_fn: 可选，(metadata) -> bool，只在满足条件的文档中检索
+        """
+        with self._lock:
+            n = len(self._docs)
+            if not n:
+                return []
+            avg_len = self._total_len / n
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    length = self._docs[doc_id][2]
+                    denom = tf + self.k1 * (1 - self.b + self.b * length / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / denom
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            results = []
+            for doc_id in ranked:
+                text, metadata, _ = self._docs[doc_id]
+                if filter_fn and not filter_fn(metadata):
+                    continue
+                results.append(Document(page_content=text, metadata=metadata))
+                if len(results) >= k:
+                    break
+            return results
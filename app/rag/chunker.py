@@ -0,0 +1,125 @@
+import threading
+from app.llm.text_splitter import hard_split, estimate_tokens, split_sentences
+import app.utils.config as config
+
+
+class TranscriptChunker:
+    """
+    增量式逐字稿分块器：按句子（标点 / 换行 / ASR 分段）累积，
+    达到 token 预算时输出一个分块，相邻分块保留若干句重叠。
+
+    既可一次性处理完整逐字稿，也可在实时会议中边识别边喂入。
+    """
+    def __init__(self, chunk_tokens=None, overlap_tokens=None):
+        self.chunk_tokens = chunk_tokens or config.TRANSCRIPT_CHUNK_TOKENS
+        self.overlap_tokens = overlap_tokens if overlap_tokens is not None else config.TRANSCRIPT_CHUNK_OVERLAP
+        self._units = []      # 当前分块中的句子: (text, start, end)
+        self._tokens = 0
+        self._tail = ""       # 尚未遇到句末标点的残句
+        self._index = 0
+
+    def feed(self, text):
+        """
+        喂入一段文本，返回新完成的分块列表。末尾不完整的句子留待下次。
+        """
+        text = self._tail + text
+        sentences = split_sentences(text)
+        self._tail = ""
+        if sentences and not text.rstrip(" \t").endswith(("。", "！", "？", "；", "!", "?", ";", "…", "\n")):
+            self._tail = sentences.pop()
+        chunks = []
+        for sentence in sentences:
+            chunks.extend(self._add_unit(sentence, None, None))
+        # 没有标点的超长残句（常见于无标点的 ASR 输出）不能无限累积
+        if estimate_tokens(self._tail) > self.chunk_tokens:
+            pieces = hard_split(self._tail, self.chunk_tokens)
+            self._tail = pieces.pop()
+            for piece in pieces:
+                chunks.extend(self._add_unit(piece, None, None))
+        return chunks
+
+    def feed_segments(self, segments):
+        """
+        喂入带时间戳的 ASR 分段（每段视为一个句子单元），返回新完成的分块列表。
+
+        :param segments: 可迭代对象，元素为含 text / start / end 的 dict 或对象
+        """
+        chunks = []
+        for seg in segments:
+            get = seg.get if isinstance(seg, dict) else lambda key, default=None: getattr(seg, key, default)
+            text = (get("text") or "").strip()
+            if text:
+                chunks.extend(self._add_unit(text, get("start"), get("end")))
+        return chunks
+
+    def flush(self):
+        """
+        输出剩余内容（会议结束时调用）。
+        """
+        chunks = []
+        if self._tail.strip():
+            chunks.extend(self._add_unit(self._tail.strip(), None, None))
+            self._tail = ""
+        if self._units:
+            chunks.append(self._emit())
+            self._units, self._tokens = [], 0
+        return chunks
+
+    def chunk(self, text):
+        """
+        一次性处理完整文本。
+        """
+        return self.feed(text) + self.flush()
+
+    def _add_unit(self, text, start, end):
+        chunks = []
+        tokens = estimate_tokens(text)
+        if self._units and self._tokens + tokens > self.chunk_tokens:
+            chunks.append(self._emit())
+            overlap, size = [], 0
+            for unit in reversed(self._units):
+                unit_tokens = estimate_tokens(unit[0])
+                if size + unit_tokens > self.overlap_tokens:
+                    break
+                overlap.insert(0, unit)
+                size += unit_tokens
+            self._units, self._tokens = overlap, size
+        self._units.append((text, start, end))
+        self._tokens += tokens
+        return chunks
+
+    def _emit(self):
+        starts = [u[1] for u in self._units if u[1] is not None]
+        ends = [u[2] for u in self._units if u[2] is not None]
+        chunk = {
+            "text": "".join(u[0] for u in self._units),
+            "index": self._index,
+            "start": min(starts) if starts else None,
+            "end": max(ends) if ends else None,
+        }
+        self._index += 1
+        return chunk
+
+
+class TranscriptIndexer:
+    """
+    实时会议的逐字稿增量入库：分块完成即写入知识库的逐字稿集合。
+    """
+    def __init__(self, knowledge_base, meeting_id, metadata=None):
+        self.knowledge_base = knowledge_base
+        self.meeting_id = meeting_id
+        self.metadata = metadata or {}
+        self.chunker = TranscriptChunker()
+        self._lock = threading.Lock()
+
+    def feed(self, text):
+        with self._lock:
+            chunks = self.chunker.feed(text)
+            if chunks:
+                self.knowledge_base.add_transcript_chunks(self.meeting_id, chunks, self.metadata)
+
+    def close(self):
+        with self._lock:
+            chunks = self.chunker.flush()
+            if chunks:
+                self.knowledge_base.add_transcript_chunks(self.meeting_id, chunks, self.metadata)
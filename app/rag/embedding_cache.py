@@ -0,0 +1,182 @@
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+import app.utils.config as config
+
+
+def normalize_text(text):
+    """
+    缓存键使用的文本规范化：NFKC + 折叠空白。
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    带缓存的向量化包装器，Chroma 与 FAISS 共用。
+
+    - 键：(模型名, 文档/查询, 规范化文本的哈希)
+    - 内存：LRU，保存最近使用的向量
+    - 磁盘：float32 向量按行追加到 vectors.f32（内存映射读取），keys.txt 记录对应的键
+    """
+    def __init__(self, inner, model_name, cache_dir=None, memory_size=None):
+        self.inner = inner
+        self.model_name = model_name
+        self.memory_size = memory_size or config.EMBED_CACHE_MEMORY
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+        self.cache_dir = os.path.join(cache_dir or config.EMBED_CACHE_DIR, safe_name)
+        self._vectors_path = os.path.join(self.cache_dir, "vectors.f32")
+        self._keys_path = os.path.join(self.cache_dir, "keys.txt")
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._rows = {}          # key -> 磁盘行号
+        self._dim = None
+        self._mmap = None
+        self._mmap_rows = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._load()
+
+    # ---------- 磁盘 ----------
+
+    def _load(self):
+        if not os.path.exists(self._keys_path):
+            return
+        with open(self._keys_path, "r", encoding="ascii") as f:
+            lines = f.readlines()
+        keys = [line.strip() for line in lines if line.endswith("\n")]
+        # 最后一行没有换行符说明写了一半，需要截掉，否则后续追加的键会与残行拼在一起
+        torn = len(keys) != len(lines)
+        dim_path = os.path.join(self.cache_dir, "dim")
+        if not keys or not os.path.exists(self._vectors_path) or not os.path.exists(dim_path):
+            # 没有完整的行：丢弃残留文件从头开始，避免新向量的行号与键错位
+            for path in (self._keys_path, self._vectors_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+        with open(dim_path, "r", encoding="ascii") as f:
+            self._dim = int(f.read().strip())
+        rows = min(len(keys), os.path.getsize(self._vectors_path) // (self._dim * 4))
+        # 键与向量按行对齐，以两者中较短的为准（崩溃时可能只写了一半）
+        self._truncate(rows, keys, torn)
+        for row, key in enumerate(keys[:rows]):
+            self._rows[key] = row
+
+    def _truncate(self, rows, keys, torn=False):
+        if os.path.getsize(self._vectors_path) != rows * self._dim * 4:
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(rows * self._dim * 4)
+        if torn or len(keys) != rows:
+            with open(self._keys_path, "w", encoding="ascii") as f:
+                f.write("".join(f"{key}\n" for key in keys[:rows]))
+
+    def _read_row(self, row):
+        if self._mmap is None or row >= self._mmap_rows:
+            count = len(self._rows)
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self._dim))
+            self._mmap_rows = count
+        return np.array(self._mmap[row])
+
+    def _append(self, items):
+        if not items:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if self._dim is None:
+            self._dim = len(items[0][1])
+            with open(os.path.join(self.cache_dir, "dim"), "w", encoding="ascii") as f:
+                f.write(str(self._dim))
+        items = [(key, vector) for key, vector in items if key not in self._rows and len(vector) == self._dim]
+        if not items:
+            return
+        block = np.asarray([vector for _, vector in items], dtype=np.float32)
+        # 先写向量再写键，崩溃时只会多出无键的向量，加载时截断
+        with open(self._vectors_path, "ab") as f:
+            f.write(block.tobytes())
+        with open(self._keys_path, "a", encoding="ascii") as f:
+            f.write("".join(f"{key}\n" for key, _ in items))
+        start = len(self._rows)
+        for i, (key, _) in enumerate(items):
+            self._rows[key] = start + i
+
+    # ---------- 缓存 ----------
+
+    def _key(self, kind, text):
+        raw = f"{self.model_name}\x00{kind}\x00{normalize_text(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key):
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+        row = self._rows.get(key)
+        if row is not None:
+            vector = self._read_row(row).tolist()
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector
+        return None
+
+    def embed_documents(self, texts):
+        keys = [self._key("doc", text) for text in texts]
+        results = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lookup(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    results[i] = vector
+            self.misses += len(missing)
+        if missing:
+            # 只对未命中的去重文本调用底层模型（锁外执行，允许并发向量化）
+            miss_keys = list(missing)
+            vectors = self.inner.embed_documents([texts[missing[key][0]] for key in miss_keys])
+            vectors = [list(map(float, vector)) for vector in vectors]
+            with self._lock:
+                for key, vector in zip(miss_keys, vectors):
+                    self._remember(key, vector)
+                    for i in missing[key]:
+                        results[i] = vector
+                self._append(list(zip(miss_keys, vectors)))
+        return results
+
+    def embed_query(self, text):
+        key = self._key("query", text)
+        with self._lock:
+            vector = self._lookup(key)
+            if vector is not None:
+                return vector
+            self.misses += 1
+        vector = list(map(float, self.inner.embed_query(text)))
+        with self._lock:
+            self._remember(key, vector)
+            self._append([(key, vector)])
+        return vector
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "model": self.model_name,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._rows),
+        }
@@ -0,0 +1,318 @@
+import base64
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+import numpy as np
+from langchain_community.vectorstores import FAISS
+import app.utils.config as config
+from app.rag.metadata import MetadataIndex, metadata_matches
+
+_CURRENT = "CURRENT"
+_WAL = "wal.jsonl"
+_SNAPSHOT_PREFIX = "snapshot-"
+
+
+def _encode_vector(vector):
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _decode_vector(data):
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).tolist()
+
+
+def _fsync_dir(path):
+    # 目录项的持久化（Windows 不支持对目录 fsync，忽略即可）
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class FaissWALStore:
+    """
+    FAISS 索引的增量持久化：
+    - 新增向量追加写入 WAL (wal.jsonl)，每次写入只有 O(新增条数) 的磁盘开销
+    - WAL 条数或时间达到阈值时做一次压缩：全量 save_local 到新的快照目录，
+      再原子替换 CURRENT 指针，最后清空 WAL
+    - 启动时加载 CURRENT 指向的快照并重放快照之后的 WAL 记录
+
+    任何时刻崩溃，磁盘上都至少有一个完整快照 + 可重放的 WAL。
+    目录布局:
+        faiss/CURRENT              -> 当前快照目录名
+        faiss/snapshot-<seq>/      -> index.faiss, index.pkl, meta.json
+        faiss/wal.jsonl            -> 快照之后的新增记录
+    """
+    def __init__(self, directory, embedding_fn, compact_every=None, compact_interval=None):
+        self.directory = directory
+        self.embedding_fn = embedding_fn
+        self.compact_every = compact_every or config.FAISS_COMPACT_EVERY
+        self.compact_interval = compact_interval if compact_interval is not None else config.FAISS_COMPACT_INTERVAL
+        self.store = None
+        # 预过滤 ID 索引：位置 -> 可过滤的元数据字段
+        self.metadata_index = MetadataIndex()
+        self._ids = set()
+        self._lock = threading.RLock()
+        self._seq = 0              # 已写入的最大序号
+        self._snapshot_seq = 0     # 当前快照包含的最大序号
+        self._wal_entries = 0
+        self._last_compact = time.time()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def wal_path(self):
+        return os.path.join(self.directory, _WAL)
+
+    def __len__(self):
+        return 0 if self.store is None else self.store.index.ntotal
+
+    def __contains__(self, doc_id):
+        return doc_id in self._ids
+
+    # ---------- 加载 ----------
+
+    def _load(self):
+        snapshot_dir = self._current_snapshot_dir()
+        if snapshot_dir:
+            self.store = FAISS.load_local(
+                snapshot_dir,
+                self.embedding_fn,
+                allow_dangerous_deserialization=True
+            )
+            meta_path = os.path.join(snapshot_dir, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    self._snapshot_seq = json.load(f).get("seq", 0)
+            self.metadata_index.add([
+                self.store.docstore.search(self.store.index_to_docstore_id[i]).metadata
+                for i in range(len(self))
+            ])
+            self._ids.update(self.store.index_to_docstore_id.values())
+            print(f"🗄️  加载 FAISS 快照: {snapshot_dir} ({len(self)} 条)")
+        self._seq = self._snapshot_seq
+        replayed = self._replay_wal()
+        if replayed:
+            print(f"🔁 重放 FAISS WAL: {replayed} 条")
+
+    def _current_snapshot_dir(self):
+        current_path = os.path.join(self.directory, _CURRENT)
+        if os.path.exists(current_path):
+            with open(current_path, "r", encoding="utf-8") as f:
+                name = f.read().strip()
+            path = os.path.join(self.directory, name)
+            if os.path.exists(os.path.join(path, "index.faiss")):
+                return path
+        # 兼容旧版本：索引直接 save_local 在 faiss/ 目录下
+        if os.path.exists(os.path.join(self.directory, "index.faiss")):
+            return self.directory
+        return None
+
+    def _replay_wal(self):
+        if not os.path.exists(self.wal_path):
+            return 0
+        texts, vectors, metadatas, ids = [], [], [], []
+        valid_bytes = 0
+        with open(self.wal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 崩溃时可能留下写了一半的最后一行
+                    break
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                self._wal_entries += 1
+                self._seq = max(self._seq, record["seq"])
+                if record["seq"] <= self._snapshot_seq:
+                    continue
+                texts.append(record["text"])
+                vectors.append(_decode_vector(record["vector"]))
+                metadatas.append(record["metadata"])
+                ids.append(record["id"])
+        if valid_bytes < os.path.getsize(self.wal_path):
+            # 截掉损坏的尾部，避免后续追加的记录与残行拼在一起
+            with open(self.wal_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        if texts:
+            self._apply(texts, vectors, metadatas, ids)
+        return len(texts)
+
+    # ---------- 写入 ----------
+
+    def _apply(self, texts, vectors, metadatas, ids):
+        pairs = list(zip(texts, vectors))
+        if self.store is None:
+            self.store = FAISS.from_embeddings(pairs, self.embedding_fn, metadatas=metadatas, ids=ids)
+        else:
+            self.store.add_embeddings(pairs, metadatas=metadatas, ids=ids)
+        self.metadata_index.add(metadatas)
+        self._ids.update(ids)
+
+    def add_documents(self, documents, ids=None):
+        """
+        向量化并追加文档，返回文档 id 列表。
+        """
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding_fn.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, [dict(doc.metadata) for doc in documents], ids)
+
+    def add_embeddings(self, texts, vectors, metadatas=None, ids=None):
+        """
+        追加已计算好的向量：先写 WAL 并 fsync，再更新内存索引。
+        """
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        with self._lock:
+            lines = []
+            for text, vector, metadata, doc_id in zip(texts, vectors, metadatas, ids):
+                self._seq += 1
+                lines.append(json.dumps({
+                    "seq": self._seq,
+                    "id": doc_id,
+                    "text": text,
+                    "metadata": metadata,
+                    "vector": _encode_vector(vector),
+                }, ensure_ascii=False))
+            with open(self.wal_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._wal_entries += len(lines)
+            self._apply(texts, vectors, metadatas, ids)
+            if self._should_compact():
+                self.compact()
+        return ids
+
+    def _should_compact(self):
+        if self._wal_entries >= self.compact_every:
+            return True
+        return self.compact_interval > 0 and self._wal_entries > 0 and \
+            time.time() - self._last_compact >= self.compact_interval
+
+    def compact(self):
+        """
+        全量保存快照并原子切换，随后清空 WAL。
+        """
+        with self._lock:
+            if self.store is None or self._seq == self._snapshot_seq:
+                return
+            started = time.time()
+            name = f"{_SNAPSHOT_PREFIX}{self._seq:012d}"
+            final_dir = os.path.join(self.directory, name)
+            tmp_dir = final_dir + ".tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            self.store.save_local(tmp_dir)
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"seq": self._seq, "count": len(self), "created": time.time()}, f)
+            shutil.rmtree(final_dir, ignore_errors=True)
+            os.replace(tmp_dir, final_dir)
+
+            # 原子切换 CURRENT 指针
+            current_tmp = os.path.join(self.directory, _CURRENT + ".tmp")
+            with open(current_tmp, "w", encoding="utf-8") as f:
+                f.write(name)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(current_tmp, os.path.join(self.directory, _CURRENT))
+            _fsync_dir(self.directory)
+
+            # 快照已包含全部记录，WAL 可以清空（即使此处崩溃，重放时也会按 seq 跳过）
+            with open(self.wal_path, "w", encoding="utf-8"):
+                pass
+            self._snapshot_seq = self._seq
+            self._wal_entries = 0
+            self._last_compact = time.time()
+            self._remove_stale_snapshots(name)
+            print(f"🗜️  FAISS 快照压缩完成: {len(self)} 条, 耗时 {time.time() - started:.2f}s")
+
+    def _remove_stale_snapshots(self, keep):
+        for entry in os.listdir(self.directory):
+            if entry.startswith(_SNAPSHOT_PREFIX) and entry != keep:
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+        # 旧版本的顶层索引文件已迁移进快照
+        for legacy in ("index.faiss", "index.pkl"):
+            path = os.path.join(self.directory, legacy)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def iter_documents(self, batch_size=1000):
+        """
+        按索引顺序分批遍历全部文档（用于从向量库重建 BM25 等派生索引）。
+        """
+        for start in range(0, len(self), batch_size):
+            with self._lock:
+                ids = [self.store.index_to_docstore_id[i] for i in range(start, min(start + batch_size, len(self)))]
+                docs = [self.store.docstore.search(doc_id) for doc_id in ids]
+            yield from docs
+
+    # ---------- 检索 ----------
+
+    def similarity_search(self, query, k=4, **kwargs):
+        with self._lock:
+            if self.store is None:
+                return []
+            return self.store.similarity_search(query, k=k, **kwargs)
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        with self._lock:
+            if self.store is None:
+                return []
+            return self.store.similarity_search_with_score(query, k=k, **kwargs)
+
+    def similarity_search_filtered(self, query, k=4, filters=None):
+        """
+        带元数据过滤的检索，代价与过滤后的子集大小成正比：
+        先用预过滤 ID 索引算出候选位置；候选较少时直接取出这些向量做精确计算，
+        候选较多时退回 FAISS 检索并按比例放大 fetch_k 后过滤。
+        """
+        return [doc for doc, _ in self.similarity_search_filtered_with_score(query, k, filters)]
+
+    def similarity_search_filtered_with_score(self, query, k=4, filters=None):
+        if not filters:
+            return self.similarity_search_with_score(query, k=k)
+        query_vector = np.asarray(self.embedding_fn.embed_query(query), dtype=np.float32)
+        with self._lock:
+            if self.store is None:
+                return []
+            positions = self.metadata_index.select(filters)
+            if len(positions) == 0:
+                return []
+            if len(positions) <= config.FAISS_PREFILTER_MAX:
+                return self._search_subset(query_vector, positions, k)
+            # 子集很大时，过滤后的命中率约为 len(positions) / total
+            ratio = len(self) / len(positions)
+            return self.store.similarity_search_with_score_by_vector(
+                query_vector.tolist(),
+                k=k,
+                filter=lambda metadata: metadata_matches(metadata, filters),
+                fetch_k=int(k * ratio * 2) + k
+            )
+
+    def _search_subset(self, query_vector, positions, k):
+        index = self.store.index
+        try:
+            vectors = index.reconstruct_batch(positions.astype(np.int64))
+        except (AttributeError, RuntimeError):
+            vectors = np.vstack([index.reconstruct(int(p)) for p in positions])
+        if getattr(self.store, "_normalize_L2", False):
+            query_vector = query_vector / (np.linalg.norm(query_vector) or 1.0)
+        # 与 FAISS 默认的 IndexFlatL2 一致：平方欧氏距离，越小越相似
+        distances = ((vectors - query_vector) ** 2).sum(axis=1)
+        top = np.argsort(distances)[:k]
+        results = []
+        for i in top:
+            doc_id = self.store.index_to_docstore_id[int(positions[i])]
+            results.append((self.store.docstore.search(doc_id), float(distances[i])))
+        return results
@@ -0,0 +1,275 @@
+import re
+import time
+from datetime import datetime, timedelta
+import numpy as np
+
+# 来源类型
+SOURCE_FILE = "file"
+SOURCE_REALTIME = "realtime"
+SOURCE_WEB_RECORDING = "web_recording"
+SOURCE_WEB_UPLOAD = "web_upload"
+
+_DATE_FORMATS = (
+    "%Y-%m-%d-%H-%M-%S",
+    "%Y%m%d_%H%M%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d",
+)
+
+
+def parse_timestamp(value):
+    """
+    将各种日期写法（时间戳 / 常见字符串格式）解析为秒级时间戳，无法解析时返回 None。
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    for fmt in _DATE_FORMATS:
+        try:
+            return int(datetime.strptime(str(value), fmt).timestamp())
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_metadata(metadata):
+    """
+    规范化会议元数据，生成可用于过滤的类型化字段：
+    - timestamp: 会议开始时间（秒级时间戳, int）
+    - date: 可读日期 "YYYY-MM-DD HH:MM:SS"
+    - duration: 时长（秒, float，可选）
+    - source_type: file / realtime / web_recording / web_upload
+    - participants: 以逗号包围的参会人字符串 ",张三,李四,"（向量库元数据只支持标量）
+    """
+    metadata = dict(metadata or {})
+    timestamp = parse_timestamp(metadata.get("timestamp"))
+    if timestamp is None:
+        timestamp = parse_timestamp(metadata.get("date"))
+    if timestamp is None:
+        timestamp = int(time.time())
+    metadata["timestamp"] = timestamp
+    metadata["date"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+    if metadata.get("duration") is not None:
+        metadata["duration"] = float(metadata["duration"])
+    else:
+        metadata.pop("duration", None)
+
+    if not metadata.get("source_type"):
+        source = str(metadata.get("source", ""))
+        if source.startswith("realtime"):
+            metadata["source_type"] = SOURCE_REALTIME
+        elif source == "web_recording":
+            metadata["source_type"] = SOURCE_WEB_RECORDING
+        else:
+            metadata["source_type"] = SOURCE_FILE
+
+    participants = metadata.get("participants")
+    if isinstance(participants, str):
+        participants = re.split(r"[,，、;；\s]+", participants)
+    if participants:
+        names = [p.strip() for p in participants if p and p.strip()]
+        metadata["participants"] = "," + ",".join(names) + "," if names else ""
+    else:
+        metadata.pop("participants", None)
+    return metadata
+
+
+def _as_list(value):
+    if value is None:
+        return None
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _filter_range(filters):
+    date_from = parse_timestamp(filters.get("date_from"))
+    date_to = parse_timestamp(filters.get("date_to"))
+    return date_from, date_to
+
+
+def metadata_matches(metadata, filters):
+    """
+    在 Python 侧判断元数据是否满足过滤条件（BM25 与兜底过滤使用）。
+
+    支持的过滤键: date_from, date_to, source_type, participant, meeting_id
+    """
+    if not filters:
+        return True
+    date_from, date_to = _filter_range(filters)
+    timestamp = metadata.get("timestamp")
+    if date_from is not None and (timestamp is None or timestamp < date_from):
+        return False
+    if date_to is not None and (timestamp is None or timestamp > date_to):
+        return False
+    source_types = _as_list(filters.get("source_type"))
+    if source_types and metadata.get("source_type") not in source_types:
+        return False
+    meeting_ids = _as_list(filters.get("meeting_id"))
+    if meeting_ids and metadata.get("meeting_id") not in meeting_ids:
+        return False
+    participant = filters.get("participant")
+    if participant and f",{participant}," not in (metadata.get("participants") or ""):
+        return False
+    return True
+
+
+def to_chroma_where(filters):
+    """
+    将过滤条件下推为 Chroma 的 where 子句。
+    参会人是子串匹配，Chroma 元数据过滤不支持，由调用方在结果上兜底过滤。
+    """
+    if not filters:
+        return None
+    clauses = []
+    date_from, date_to = _filter_range(filters)
+    if date_from is not None:
+        clauses.append({"timestamp": {"$gte": date_from}})
+    if date_to is not None:
+        clauses.append({"timestamp": {"$lte": date_to}})
+    source_types = _as_list(filters.get("source_type"))
+    if source_types:
+        clauses.append({"source_type": {"$in": source_types}})
+    meeting_ids = _as_list(filters.get("meeting_id"))
+    if meeting_ids:
+        clauses.append({"meeting_id": {"$in": meeting_ids}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def parse_time_hint(query, now=None):
+    """
+    从问题中识别“今天 / 昨天 / 本周 / 上周 / 本月 / 上个月 / 最近 N 天”等时间范围，
+    返回 {"date_from": ts, "date_to": ts}，未识别时返回 None。
+    截止到“现在”的范围取到当天结束，同一天内得到相同的过滤条件，检索 / 问答缓存才能命中。
+    """
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_today = today + timedelta(days=1) - timedelta(seconds=1)
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+
+    match = re.search(r"(?:最近|近|过去)\s*(\d+)\s*天", query)
+    if match:
+        start, end = today - timedelta(days=int(match.group(1))), end_of_today
+    elif "今天" in query:
+        start, end = today, end_of_today
+    elif "昨天" in query:
+        start, end = today - timedelta(days=1), today
+    elif any(word in query for word in ("本周", "这周", "这个星期", "本星期")):
+        start, end = week_start, end_of_today
+    elif any(word in query for word in ("上周", "上个星期", "上星期")):
+        start, end = week_start - timedelta(days=7), week_start
+    elif any(word in query for word in ("本月", "这个月")):
+        start, end = month_start, end_of_today
+    elif "上个月" in query or "上月" in query:
+        start, end = (month_start - timedelta(days=1)).replace(day=1), month_start
+    else:
+        return None
+    return {"date_from": int(start.timestamp()), "date_to": int(end.timestamp())}
+
+
+class MetadataIndex:
+    """
+    FAISS 的预过滤 ID 索引，过滤代价与命中子集大小成正比，而不是与库的总条数成正比：
+    - 来源类型 / 会议 ID / 参会人：倒排表（取值 -> 有序位置数组），多个条件求交集
+    - 时间范围：按时间戳排序的位置数组上二分查找；已有候选集时只检查候选的时间戳
+    """
+    _FIELDS = ("source_type", "meeting_id", "participant")
+
+    def __init__(self):
+        self._count = 0
+        self._timestamps = []
+        self._timestamp_array = None   # 惰性构建，新增后失效
+        self._time_order = None        # 按时间戳排序的位置，惰性构建
+        self._postings = {field: {} for field in self._FIELDS}
+        self._posting_arrays = {}      # (字段, 取值) -> 位置数组缓存，该取值新增位置后失效
+
+    def __len__(self):
+        return self._count
+
+    def add(self, metadatas):
+        """
+        按位置顺序追加元数据（与 FAISS 的添加顺序一致）。
+        """
+        if not metadatas:
+            return
+        for metadata in metadatas:
+            position = self._count
+            self._count += 1
+            self._timestamps.append(int(metadata.get("timestamp") or 0))
+            self._post("source_type", metadata.get("source_type"), position)
+            self._post("meeting_id", metadata.get("meeting_id"), position)
+            # participants 规范化为 ",张三,李四," 的形式
+            for name in (metadata.get("participants") or "").split(","):
+                if name:
+                    self._post("participant", name, position)
+        self._timestamp_array = None
+        self._time_order = None
+
+    def _post(self, field, value, position):
+        if value is None:
+            return
+        self._postings[field].setdefault(value, []).append(position)
+        self._posting_arrays.pop((field, value), None)
+
+    def _positions(self, field, values):
+        """
+        取值列表对应位置的并集（有序、无重复）。
+        """
+        arrays = []
+        for value in values:
+            key = (field, value)
+            array = self._posting_arrays.get(key)
+            if array is None:
+                positions = self._postings[field].get(value)
+                if not positions:
+                    continue
+                array = self._posting_arrays[key] = np.asarray(positions, dtype=np.int64)
+            arrays.append(array)
+        if not arrays:
+            return np.zeros(0, dtype=np.int64)
+        return arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+
+    def select(self, filters):
+        """
+        返回满足过滤条件的位置数组（升序）。
+        """
+        participant = filters.get("participant")
+        candidates = None
+        for field, values in (
+            ("source_type", _as_list(filters.get("source_type"))),
+            ("meeting_id", _as_list(filters.get("meeting_id"))),
+            ("participant", [participant] if participant else []),
+        ):
+            if not values:
+                continue
+            positions = self._positions(field, values)
+            candidates = positions if candidates is None else np.intersect1d(candidates, positions, assume_unique=True)
+            if not len(candidates):
+                return candidates
+
+        date_from, date_to = _filter_range(filters)
+        if date_from is None and date_to is None:
+            return np.arange(self._count, dtype=np.int64) if candidates is None else candidates
+        if self._timestamp_array is None:
+            self._timestamp_array = np.asarray(self._timestamps, dtype=np.int64)
+        timestamps = self._timestamp_array
+        if candidates is not None:
+            selected = timestamps[candidates]
+            mask = np.ones(len(candidates), dtype=bool)
+            if date_from is not None:
+                mask &= selected >= date_from
+            if date_to is not None:
+                mask &= selected <= date_to
+            return candidates[mask]
+        if self._time_order is None:
+            self._time_order = np.argsort(timestamps, kind="stable")
+        ordered = timestamps[self._time_order]
+        low = 0 if date_from is None else np.searchsorted(ordered, date_from, side="left")
+        high = len(ordered) if date_to is None else np.searchsorted(ordered, date_to, side="right")
+        return np.sort(self._time_order[low:high])
@@ -0,0 +1,61 @@
+"""
+将 output/ 目录中的历史会议纪要批量导入知识库。已入库的纪要按内容识别并跳过，可重复运行。
+
+用法:
+    python -m app.rag.reindex                # 默认读取 ./output
+    python -m app.rag.reindex output --batch-size 128
+"""
+import argparse
+import os
+import time
+from app.asr.transcript import read_segments, sidecar_path
+
+
+def iter_meetings(output_dir):
+    """
+    流式遍历 *_summary.md，附带同名 *_transcript.txt 与结构化逐字稿 *_transcript.jsonl（若存在）。
+    """
+
+    for name in sorted(os.listdir(output_dir)):
+        if not name.endswith("_summary.md"):
+            continue
+        base_name = name[:-len("_summary.md")]
+        summary_path = os.path.join(output_dir, name)
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary = f.read()
+        if not summary.strip():
+            continue
+        transcript = ""
+        transcript_path = os.path.join(output_dir, f"{base_name}_transcript.txt")
+        if os.path.exists(transcript_path):
+            with open(transcript_path, "r", encoding="utf-8") as f:
+                transcript = f.read()
+        segments = None
+        if os.path.exists(sidecar_path(transcript_path)):
+            segments = list(read_segments(sidecar_path(transcript_path)))
+        date = time.strftime("%Y-%m-%d", time.localtime(os.path.getmtime(summary_path)))
+        yield {
+            "summary": summary,
+            "transcript": transcript,
+            "segments": segments,
+            "metadata": {"source": base_name, "date": date},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导入历史会议纪要到知识库")
+    parser.add_argument("output_dir", nargs="?", default="output", help="纪要所在目录 (默认 output)")
+    parser.add_argument("--batch-size", type=int, default=None, help="每批向量化的文档数 (默认 EMBED_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.output_dir):
+        print(f"目录不存在: {args.output_dir}")
+        return
+
+    from app.rag.vector_store import MeetingKnowledgeBase
+    kb = MeetingKnowledgeBase()
+    kb.add_meetings(iter_meetings(args.output_dir), batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import copy
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import app.utils.config as config
+
+
+def format_context(docs):
+    """
+    将检索到的文档拼接为 RAG 上下文，每段标注日期与来源。
+    """
+    return "\n\n".join(
+        f"[{doc.metadata.get('date', '未知日期')} | {doc.metadata.get('source', '未知来源')}]\n{doc.page_content}"
+        for doc in docs
+    )
+
+
+class RetrievalResult:
+    """
+    一次检索的结果：文档、融合得分、各阶段耗时，以及可复用的上下文句柄。
+    生成阶段直接复用该对象（或其 handle），不再重复检索。
+
+    scores 为 RRF 融合得分，只反映排名先后，不是相关度。
+    """
+    def __init__(self, query, filters, documents, scores, timings):
+        self.handle = uuid.uuid4().hex
+        self.query = query
+        self.filters = filters
+        self.documents = documents
+        self.scores = scores
+        self.timings = timings
+        self.created_at = time.time()
+        self.from_cache = False
+
+    def __len__(self):
+        return len(self.documents)
+
+    def cache_hit(self):
+        """
+        返回标记为缓存命中的浅拷贝（共享文档与句柄），缓存中的对象本身不被修改。
+        """
+        result = copy.copy(self)
+        result.from_cache = True
+        return result
+
+    @property
+    def context(self):
+        return format_context(self.documents)
+
+    def report(self):
+        """
+        各阶段耗时的可读描述。
+        """
+        if self.from_cache:
+            return "检索命中缓存"
+        parts = [f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.timings.items()]
+        return "检索耗时: " + ", ".join(parts)
+
+
+class RetrievalCache:
+    """
+    近期检索结果的 TTL + LRU 缓存。知识库有新数据写入时（版本号变化）自动失效。
+    """
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else config.RAG_RETRIEVAL_CACHE_TTL
+        self.max_entries = max_entries or config.RAG_RETRIEVAL_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (version, result)
+        self._handles = {}              # handle -> result
+
+    @staticmethod
+    def make_key(query, k, filters, include_transcripts):
+        return json.dumps([query.strip(), k, filters or {}, include_transcripts], ensure_ascii=False, sort_keys=True)
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, result = entry
+            if entry_version != version or time.time() - result.created_at > self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key, version, result):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (version, result)
+            self._handles[result.handle] = result
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def by_handle(self, handle):
+        with self._lock:
+            result = self._handles.get(handle)
+            if result is None or time.time() - result.created_at > self.ttl:
+                return None
+            return result
+
+    def _drop(self, key):
+        _, result = self._entries.pop(key)
+        self._handles.pop(result.handle, None)
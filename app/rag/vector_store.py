@@ -2,29 +2,56 @@ import os
 os.environ['HF_ENDPOINT'] = 'https://hf-mirror.com'
 
 import shutil
+import threading
+import time
+import uuid
+from itertools import islice
 import app.utils.config as config
-from langchain_community.embeddings import FastEmbedEmbeddings, HuggingFaceEmbeddings
 from langchain_core.documents import Document
+from app.rag.chunker import TranscriptChunker, TranscriptIndexer
+from app.rag.embedding_cache import CachedEmbeddings
+from app.rag.retrieval import RetrievalCache, RetrievalResult
+from app.rag.answer_cache import SemanticAnswerCache, docs_fingerprint
+from app.rag.bm25 import BM25Index, doc_key, reciprocal_rank_fusion
+from app.rag.metadata import metadata_matches, normalize_metadata, parse_time_hint, to_chroma_where
+from app.utils.cache import text_hash
+from app.utils.plugins import PluginRegistry
 
-# 尝试导入向量库
-try:
-    import chromadb
-    from langchain_chroma import Chroma
-    HAS_CHROMA = True
-except ImportError:
-    HAS_CHROMA = False
+# 向量库与向量模型按需导入：只检测是否安装，真正初始化时才 import
+VECTOR_STORES = PluginRegistry("向量库")
+VECTOR_STORES.register("chroma", "langchain_chroma:Chroma", requires=("chromadb",))
+VECTOR_STORES.register("faiss", "app.rag.faiss_store:FaissWALStore", requires=("faiss", "langchain_community"))
+
+EMBEDDINGS = PluginRegistry("向量模型")
+EMBEDDINGS.register("fastembed", "langchain_community.embeddings:FastEmbedEmbeddings", requires=("fastembed",))
+EMBEDDINGS.register("huggingface", "langchain_community.embeddings:HuggingFaceEmbeddings", requires=("sentence_transformers",))
+
+
+def summary_doc_id(summary):
+    """
+    会议纪要文档的确定性 ID（按纪要内容哈希）：同一份纪要无论经由流水线、实时模式还是
+    app.rag.reindex 入库都得到相同的 ID，重复导入时可以识别并跳过。
+    """
+    return text_hash(summary.strip())[:32]
 
-try:
-    from langchain_community.vectorstores import FAISS
-    HAS_FAISS = True
-except ImportError:
-    HAS_FAISS = False
 
 class MeetingKnowledgeBase:
     def __init__(self, persist_dir="./data/vector_store"):
         self.persist_dir = persist_dir
         self.store_type = None # "chroma" or "faiss"
         self.vector_store = None
+        # 逐字稿分块的独立集合，通过 meeting_id 与会议纪要关联
+        self.transcript_store = None
+        # 与向量库并行维护的 BM25 倒排索引（关键词检索，RRF 融合）
+        self.bm25 = BM25Index(os.path.join(persist_dir, "bm25", "meeting_records.jsonl"))
+        self.transcript_bm25 = BM25Index(os.path.join(persist_dir, "bm25", "meeting_transcripts.jsonl"))
+        # 写入锁：批处理流水线会从多个线程同时入库
+        self._write_lock = threading.Lock()
+        # 数据版本号：每次写入 +1，用于让检索缓存失效
+        self.version = 0
+        self.retrieval_cache = RetrievalCache()
+        # 问答语义缓存：相似问题 + 相同检索文档时复用历史答案
+        self.answer_cache = SemanticAnswerCache() if config.RAG_ANSWER_CACHE else None
         
         print("📚 正在加载向量模型 (FastEmbed)")
         print(f"HF_ENDPOINT 设置为: {os.environ['HF_ENDPOINT']}")
@@ -32,17 +59,40 @@ class MeetingKnowledgeBase:
         
         # 2. 尝试初始化向量库
         self._init_vector_store()
+        # 3. 升级前已有的向量库数据补建 BM25 索引，避免关键词检索只覆盖新文档
+        self._bootstrap_bm25()
 
     def _init_embedding(self):
         """
         初始化文本向量嵌入模型，优先使用 FastEmbed；若模型不受支持则自动回退到 Sentence-Transformers。
         """
         model_name = getattr(config, "FASTEMBED_MODEL_DIR", "") or "BAAI/bge-small-zh-v1.5"
+        batch_size = config.EMBED_BATCH_SIZE
+        # EMBED_PARALLEL > 1 时启用多进程向量化（适合批量导入）
+        parallel = config.EMBED_PARALLEL if config.EMBED_PARALLEL > 1 else None
         try:
-            return FastEmbedEmbeddings(model_name=model_name)
+            FastEmbedEmbeddings = EMBEDDINGS.load("fastembed")
+            embeddings = FastEmbedEmbeddings(model_name=model_name, batch_size=batch_size, parallel=parallel)
         except Exception as e:
             print(f"⚠️ FastEmbed 不支持该模型，回退到 Sentence-Transformers: {model_name} ({e})\r\r\r")
-            return HuggingFaceEmbeddings(model_name=model_name)
+            HuggingFaceEmbeddings = EMBEDDINGS.load("huggingface")
+            embeddings = HuggingFaceEmbeddings(
+                model_name=model_name,
+                encode_kwargs={"batch_size": batch_size},
+                multi_process=parallel is not None
+            )
+        if not config.EMBED_CACHE:
+            return embeddings
+        # 按 (模型, 文本哈希) 缓存向量，重复查询与重建索引不再重复计算
+        return CachedEmbeddings(embeddings, f"{type(embeddings).__name__}:{model_name}")
+
+    def embedding_stats(self):
+        """
+        向量缓存命中统计（未启用缓存时返回 None）。
+        """
+        if isinstance(self.embedding_fn, CachedEmbeddings):
+            return self.embedding_fn.stats()
+        return None
 
     def _init_vector_store(self):
         """
@@ -53,146 +103,441 @@ class MeetingKnowledgeBase:
         """
         pref = getattr(config, "VECTOR_STORE", "auto")
         print(f"VECTOR_STORE 配置为: {pref}")
+        has_chroma = VECTOR_STORES.available("chroma")
+        has_faiss = VECTOR_STORES.available("faiss")
         if pref == "chroma":
-            if not HAS_CHROMA:
+            if not has_chroma:
                 print("❌ 未安装 ChromaDB 或 langchain-chroma")
                 return
             try:
-                print("尝试初始化 ChromaDB...")
-                chroma_dir = os.path.join(self.persist_dir, "chroma")
-                self.vector_store = Chroma(
-                    persist_directory=chroma_dir,
-                    embedding_function=self.embedding_fn,
-                    collection_name="meeting_records"
-                )
-                self.store_type = "chroma"
-                print(f"✅ ChromaDB 初始化成功: {chroma_dir}")
-                return
+                self._init_chroma()
             except Exception as e:
                 print(f"❌ ChromaDB 初始化失败: {e}")
-                return
+            return
         
         if pref == "faiss":
-            if not HAS_FAISS:
+            if not has_faiss:
                 print("❌ 未安装 FAISS")
                 return
             try:
-                print("尝试初始化 FAISS...")
-                faiss_dir = os.path.join(self.persist_dir, "faiss")
-                if os.path.exists(faiss_dir):
-                    self.vector_store = FAISS.load_local(
-                        faiss_dir, 
-                        self.embedding_fn,
-                        allow_dangerous_deserialization=True
-                    )
-                    print(f"🗄️  加载现有 FAISS 索引: {faiss_dir}")
-                else:
-                    print("🆕 FAISS 索引将会在第一次添加数据时创建")
-                    self.vector_store = None
-                self.store_type = "faiss"
-                print("✅ FAISS 模式已启用")
-                return
+                self._init_faiss()
             except Exception as e:
                 print(f"❌ FAISS 初始化失败: {e}")
-                return
+            return
         
         # auto 模式：优先 Chroma，失败则降级 FAISS
-        if HAS_CHROMA:
+        if has_chroma:
             try:
-                print("尝试初始化 ChromaDB...")
-                chroma_dir = os.path.join(self.persist_dir, "chroma")
-                self.vector_store = Chroma(
-                    persist_directory=chroma_dir,
-                    embedding_function=self.embedding_fn,
-                    collection_name="meeting_records"
-                )
-                self.store_type = "chroma"
-                print(f"✅ ChromaDB 初始化成功: {chroma_dir}")
+                self._init_chroma()
                 return
             except Exception as e:
                 print(f"⚠️ ChromaDB 初始化失败 ({e})，尝试降级到 FAISS...")
         
-        if HAS_FAISS:
+        if has_faiss:
             try:
-                print("尝试初始化 FAISS...")
-                faiss_dir = os.path.join(self.persist_dir, "faiss")
-                if os.path.exists(faiss_dir):
-                    self.vector_store = FAISS.load_local(
-                        faiss_dir, 
-                        self.embedding_fn,
-                        allow_dangerous_deserialization=True
-                    )
-                    print(f"🗄️  加载现有 FAISS 索引: {faiss_dir}")
-                else:
-                    print("🆕 FAISS 索引将会在第一次添加数据时创建")
-                    self.vector_store = None
-                self.store_type = "faiss"
-                print("✅ FAISS 模式已启用")
-                return
+                self._init_faiss()
             except Exception as e:
                 print(f"❌ FAISS 初始化失败: {e}")
-                return
+            return
         
         print("❌ 无法初始化任何向量库 (请检查 requirements.txt)")
 
-    def add_meeting(self, summary, transcript, metadata=None):
+    def _init_chroma(self):
+        print("尝试初始化 ChromaDB...")
+        chroma_dir = os.path.join(self.persist_dir, "chroma")
+        Chroma = VECTOR_STORES.load("chroma")
+        self.vector_store = Chroma(
+            persist_directory=chroma_dir,
+            embedding_function=self.embedding_fn,
+            collection_name="meeting_records"
+        )
+        self.transcript_store = Chroma(
+            persist_directory=chroma_dir,
+            embedding_function=self.embedding_fn,
+            collection_name="meeting_transcripts"
+        )
+        self.store_type = "chroma"
+        print(f"✅ ChromaDB 初始化成功: {chroma_dir}")
+
+    def _init_faiss(self):
         """
-        将会议纪要存入知识库
+        FAISS 使用 快照 + WAL 的增量持久化，新增会议只追加日志，不再全量重写索引。
         """
-        if metadata is None:
-            metadata = {}
-            
+        print("尝试初始化 FAISS...")
+        faiss_dir = os.path.join(self.persist_dir, "faiss")
+        FaissWALStore = VECTOR_STORES.load("faiss")
+        self.vector_store = FaissWALStore(faiss_dir, self.embedding_fn)
+        self.transcript_store = FaissWALStore(os.path.join(self.persist_dir, "faiss_transcripts"), self.embedding_fn)
+        if not len(self.vector_store):
+            print("🆕 FAISS 索引将会在第一次添加数据时创建")
+        self.store_type = "faiss"
+        print("✅ FAISS 模式已启用")
+
+    def _bootstrap_bm25(self, batch_size=500):
+        """
+        BM25 索引文件不存在而向量库已有数据时，从向量库读出全部文档重建索引。
+        文档键与 doc_key 一致（有 doc_id 用 doc_id，旧数据用内容哈希），保证与向量检索结果对齐。
+        """
+        for bm25, store in ((self.bm25, self.vector_store), (self.transcript_bm25, self.transcript_store)):
+            if store is None or os.path.exists(bm25.path):
+                continue
+            total = 0
+            docs = self._iter_store_documents(store, batch_size)
+            while True:
+                batch = list(islice(docs, batch_size))
+                if not batch:
+                    break
+                bm25.add([doc_key(doc) for doc in batch], [doc.page_content for doc in batch],
+                         [dict(doc.metadata) for doc in batch])
+                total += len(batch)
+            if total:
+                print(f"🔤 已从向量库重建 BM25 索引: {os.path.basename(bm25.path)} ({total} 条)")
+
+    def _iter_store_documents(self, store, batch_size):
+        if self.store_type == "chroma":
+            offset = 0
+            while True:
+                result = store.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+                if not result["ids"]:
+                    return
+                for text, metadata in zip(result["documents"], result["metadatas"]):
+                    yield Document(page_content=text, metadata=metadata or {})
+                offset += len(result["ids"])
+        else:
+            yield from store.iter_documents(batch_size)
+
+    def add_meeting(self, summary, transcript, metadata=None, index_transcript=True, segments=None):
+        """
+        将会议纪要存入知识库，逐字稿分块后存入独立集合（通过 meeting_id 关联）。
+
+        :param index_transcript: 逐字稿已在实时会议中增量入库时传 False
+        :param segments: 结构化逐字稿分段（见 app/asr/transcript.py），提供时按分段分块并保留时间戳
+        """
+        metadata = normalize_metadata(metadata)
+        doc_id = summary_doc_id(summary)
+        metadata.setdefault("meeting_id", doc_id)
+
+        if self.store_type is not None and self._existing_ids(self.vector_store, [doc_id]):
+            print("⏭️ 该会议纪要已在知识库中，跳过")
+            return
+
         doc = Document(
             page_content=summary,
-            metadata=metadata
+            metadata=dict(metadata, doc_id=doc_id)
         )
         
-        if self.store_type == "chroma":
-            self.vector_store.add_documents([doc])
+        if not self._write_documents([doc]):
+            print("❌ 向量库未初始化，无法存储")
+            return
+        elif self.store_type == "chroma":
             print("✅ [Chroma] 会议记录已存入")
-            
-        elif self.store_type == "faiss":
-            faiss_dir = os.path.join(self.persist_dir, "faiss")
-            if self.vector_store is None:
-                self.vector_store = FAISS.from_documents([doc], self.embedding_fn)
-            else:
-                self.vector_store.add_documents([doc])
-            # FAISS 需要手动保存
-            self.vector_store.save_local(faiss_dir)
-            print("✅ [FAISS] 会议记录已存入并保存")
         else:
+            print("✅ [FAISS] 会议记录已存入并保存")
+
+        if index_transcript and transcript and transcript.strip():
+            count = self.add_transcript(metadata["meeting_id"], transcript, metadata, segments)
+            print(f"✅ 逐字稿已分块入库: {count} 块")
+
+    def add_meetings(self, meetings, batch_size=None):
+        """
+        批量导入会议记录：流式读取，按批向量化并整批写入向量库。
+
+        :param meetings: 可迭代对象，元素为 {"summary": ..., "transcript": ..., "metadata": {...}}，
+                         可选 "segments"（结构化逐字稿分段）
+        :param batch_size: 每批文档数，默认 config.EMBED_BATCH_SIZE
+        :return: 导入的文档数（不含逐字稿分块）
+        """
+        if self.store_type is None:
             print("❌ 向量库未初始化，无法存储")
+            return 0
+        batch_size = batch_size or config.EMBED_BATCH_SIZE
+        iterator = iter(meetings)
+        total = 0
+        skipped = 0
+        started = time.time()
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+            # 已入库（或本批内重复）的纪要连同其逐字稿一起跳过，重复导入是幂等的
+            doc_ids = [summary_doc_id(item["summary"]) for item in batch]
+            seen = self._existing_ids(self.vector_store, doc_ids)
+            docs, chunk_docs = [], []
+            for item, doc_id in zip(batch, doc_ids):
+                if doc_id in seen:
+                    skipped += 1
+                    continue
+                seen.add(doc_id)
+                metadata = normalize_metadata(item.get("metadata"))
+                metadata.setdefault("meeting_id", doc_id)
+                docs.append(Document(page_content=item["summary"], metadata=dict(metadata, doc_id=doc_id)))
+                if item.get("transcript"):
+                    chunks = self._split_transcript(item["transcript"], item.get("segments"))
+                    chunk_docs.extend(self._chunk_documents(metadata["meeting_id"], chunks, metadata))
+            if docs:
+                self._write_documents(docs)
+            if chunk_docs:
+                self._write_documents(chunk_docs, self.transcript_store)
+            total += len(docs)
+            elapsed = time.time() - started
+            print(f"📥 已导入 {total} 条 ({total / elapsed:.1f} 条/秒)")
+        elapsed = time.time() - started
+        if skipped:
+            print(f"⏭️ 跳过已在知识库中的会议纪要: {skipped} 条")
+        if total:
+            print(f"✅ 批量导入完成: {total} 条, 耗时 {elapsed:.1f}s, {total / elapsed:.1f} 条/秒")
+        return total
+
+    def add_transcript(self, meeting_id, transcript, metadata=None, segments=None):
+        """
+        将完整逐字稿按句子分块（带重叠）后入库，返回分块数。
+        """
+        chunks = self._split_transcript(transcript, segments)
+        self.add_transcript_chunks(meeting_id, chunks, metadata)
+        return len(chunks)
+
+    def _split_transcript(self, transcript, segments=None):
+        """
+        有结构化分段时按分段分块（分块带起止时间），否则按句子切分纯文本。
+        """
+        if not segments:
+            return TranscriptChunker().chunk(transcript)
+        chunker = TranscriptChunker()
+        return chunker.feed_segments(segments) + chunker.flush()
+
+    def add_transcript_chunks(self, meeting_id, chunks, metadata=None):
+        """
+        写入已切好的逐字稿分块（实时会议增量入库也走这里）。
+        """
+        if not chunks:
+            return
+        self._write_documents(self._chunk_documents(meeting_id, chunks, metadata), self.transcript_store)
+
+    def open_transcript_indexer(self, meeting_id, metadata=None):
+        """
+        创建实时会议用的增量逐字稿索引器：feed(text) 边识别边入库，close() 写入剩余部分。
+        """
+        return TranscriptIndexer(self, meeting_id, normalize_metadata(metadata))
+
+    def _chunk_documents(self, meeting_id, chunks, metadata=None):
+        docs = []
+        for chunk in chunks:
+            chunk_metadata = {
+                key: value for key, value in (metadata or {}).items()
+                if isinstance(value, (str, int, float, bool))
+            }
+            chunk_metadata.update({
+                "meeting_id": meeting_id,
+                "chunk_index": chunk["index"],
+                # 同一会议的第 N 块 ID 固定，重复入库时跳过
+                "doc_id": f"{meeting_id}-{chunk['index']}",
+            })
+            # Chroma 不接受 None 值的元数据
+            if chunk.get("start") is not None:
+                chunk_metadata["start"] = chunk["start"]
+                chunk_metadata["end"] = chunk["end"]
+            docs.append(Document(page_content=chunk["text"], metadata=chunk_metadata))
+        return docs
+
+    def _write_documents(self, docs, store=None):
+        """
+        向量化并写入一批文档（默认写入会议纪要集合），向量库未初始化时返回 False。
+        """
+        # FaissWALStore 定义了 __len__，空的逐字稿集合为假值，不能用 or
+        store = self.vector_store if store is None else store
+        if self.store_type is None:
+            return False
+        bm25 = self.transcript_bm25 if store is self.transcript_store else self.bm25
+        # doc_id 同时写入向量库与 BM25 索引，用于融合时对齐同一文档
+        for doc in docs:
+            doc.metadata.setdefault("doc_id", uuid.uuid4().hex)
+        existing = self._existing_ids(store, [doc.metadata["doc_id"] for doc in docs])
+        if existing:
+            docs = [doc for doc in docs if doc.metadata["doc_id"] not in existing]
+            if not docs:
+                return True
+        texts = [doc.page_content for doc in docs]
+        metadatas = [dict(doc.metadata) for doc in docs]
+        ids = [metadata["doc_id"] for metadata in metadatas]
+
+        if self.store_type == "chroma":
+            with self._write_lock:
+                store.add_documents(docs, ids=ids)
+        else:
+            # 向量化在锁外进行，多个入库线程可以并行计算向量
+            vectors = self.embedding_fn.embed_documents(texts)
+            # 追加写入 WAL，达到阈值时自动压缩为快照
+            with self._write_lock:
+                store.add_embeddings(texts, vectors, metadatas, ids)
+        bm25.add(ids, texts, metadatas)
+        self.version += 1
+        return True
+
+    def _existing_ids(self, store, ids):
+        """
+        返回 ids 中已存在于向量库的部分（集合）。
+        """
+        if not ids or store is None:
+            return set()
+        if self.store_type == "chroma":
+            return set(store.get(ids=list(ids), include=[])["ids"])
+        return {doc_id for doc_id in ids if doc_id in store}
 
-    def search(self, query, k=3):
+    def search(self, query, k=3, filters=None, include_transcripts=False, chunks_per_meeting=None):
         """
-        语义搜索
+        语义搜索（向量 + BM25 混合检索）。
+
+        :param filters: 元数据过滤，支持 date_from / date_to（时间戳或日期字符串）、
+                        source_type、participant、meeting_id，过滤条件下推到向量库执行
+        :param include_transcripts: 为 True 时先检索会议纪要，再在命中会议的逐字稿分块中下钻，
+                        返回 [纪要1, 纪要1 的相关分块..., 纪要2, ...]
         """
+        return [doc for doc, _ in self._search_scored(query, k, filters, include_transcripts, chunks_per_meeting)]
+
+    def _search_scored(self, query, k, filters=None, include_transcripts=False, chunks_per_meeting=None, timings=None):
         if self.vector_store is None:
             return []
-        
-        try:
-            results = self.vector_store.similarity_search(query, k=k)
+
+        results = self._hybrid_search(self.vector_store, self.bm25, query, k, filters, timings)
+        if not include_transcripts or self.transcript_store is None:
             return results
+
+        chunks_per_meeting = chunks_per_meeting or config.RAG_TRANSCRIPT_CHUNKS
+        started = time.time()
+        expanded = []
+        for doc, score in results:
+            expanded.append((doc, score))
+            meeting_id = doc.metadata.get("meeting_id")
+            if meeting_id:
+                expanded.extend(self._hybrid_search(
+                    self.transcript_store, self.transcript_bm25, query, chunks_per_meeting,
+                    {"meeting_id": [meeting_id]}
+                ))
+        if timings is not None:
+            timings["transcripts"] = time.time() - started
+        return expanded
+
+    def search_transcripts(self, query, k=3, meeting_ids=None, filters=None):
+        """
+        在逐字稿分块中检索，可限定在指定会议内。
+        """
+        if self.transcript_store is None:
+            return []
+        filters = dict(filters or {})
+        if meeting_ids:
+            filters["meeting_id"] = list(meeting_ids)
+        return [doc for doc, _ in self._hybrid_search(self.transcript_store, self.transcript_bm25, query, k, filters)]
+
+    def _hybrid_search(self, store, bm25, query, k, filters=None, timings=None):
+        """
+        向量检索 + BM25 关键词检索，用倒数排名融合 (RRF) 合并结果，返回 [(doc, score), ...]。
+        得分为 RRF 得分（只看排名，越大越相关）；RAG_HYBRID=false 时只做向量检索。
+        """
+        hybrid = config.RAG_HYBRID and len(bm25) > 0
+        fetch_k = k * config.RAG_FUSION_CANDIDATES if hybrid else k
+        started = time.time()
+        try:
+            vector_docs = self._vector_search(store, query, fetch_k, filters)
         except Exception as e:
             print(f"搜索出错: {e}")
-            return []
+            vector_docs = []
+        vector_done = time.time()
+        if timings is not None:
+            timings["vector"] = vector_done - started
+        if not hybrid:
+            return reciprocal_rank_fusion([vector_docs], limit=k, with_scores=True)
+        filter_fn = (lambda metadata: metadata_matches(metadata, filters)) if filters else None
+        keyword_docs = bm25.search(query, k=fetch_k, filter_fn=filter_fn)
+        if timings is not None:
+            timings["bm25"] = time.time() - vector_done
+        return reciprocal_rank_fusion([vector_docs, keyword_docs], limit=k, with_scores=True)
 
-    def query_with_llm(self, query, llm):
+    def _vector_search(self, store, query, k, filters=None):
         """
-        RAG: 检索 + 生成回答
+        向量检索并下推过滤条件：Chroma 使用 where 子句，FAISS 使用预过滤 ID 索引。
         """
-        if self.vector_store is None:
-            return "知识库为空，无法回答。"
-            
-        # 1. 检索相关文档
-        docs = self.search(query)
-        if not docs:
-            return "未找到相关信息。"
-            
-        context = "\n\n".join([doc.page_content for doc in docs])
-        
-        # 2. 构造 Prompt
-        prompt = f"""
+        if not filters:
+            return store.similarity_search(query, k=k)
+        if self.store_type == "faiss":
+            return store.similarity_search_filtered(query, k=k, filters=filters)
+        where = to_chroma_where(filters)
+        if not filters.get("participant"):
+            return store.similarity_search(query, k=k, filter=where)
+        # 参会人是子串匹配，无法下推到 Chroma，多取一些候选后在结果上过滤
+        docs = store.similarity_search(query, k=k * 4, filter=where)
+        return [doc for doc in docs if metadata_matches(doc.metadata, filters)][:k]
+
+    def retrieve(self, query, k=3, filters=None, include_transcripts=None):
+        """
+        问答检索，返回 RetrievalResult（文档、得分、耗时、可复用句柄）。
+
+        - 未显式指定过滤条件时，从问题中识别“上周 / 本月”等时间范围；
+          按识别出的时间范围检索不到结果时，回退到全库检索
+        - 相同问题在 RAG_RETRIEVAL_CACHE_TTL 秒内直接复用缓存结果（有新数据写入时失效）
+        """
+        if include_transcripts is None:
+            include_transcripts = config.RAG_INCLUDE_TRANSCRIPTS
+        cache_key = RetrievalCache.make_key(query, k, filters, include_transcripts)
+        cached = self.retrieval_cache.get(cache_key, self.version)
+        if cached is not None:
+            # 缓存的结果由多个调用方共享，命中标记只加在副本上
+            return cached.cache_hit()
+
+        started = time.time()
+        timings = {}
+        hinted = filters is None
+        applied = parse_time_hint(query) if hinted else filters
+        pairs = self._search_scored(query, k, applied, include_transcripts, timings=timings)
+        if not pairs and hinted and applied:
+            applied = None
+            pairs = self._search_scored(query, k, None, include_transcripts, timings=timings)
+        timings["total"] = time.time() - started
+
+        result = RetrievalResult(
+            query,
+            applied,
+            [doc for doc, _ in pairs],
+            [score for _, score in pairs],
+            timings
+        )
+        self.retrieval_cache.put(cache_key, self.version, result)
+        return result
+
+    def get_retrieval(self, handle):
+        """
+        按句柄取回最近的检索结果（过期或不存在时返回 None）。
+        """
+        return self.retrieval_cache.by_handle(handle)
+
+    def _resolve_retrieval(self, query, filters, retrieval):
+        if isinstance(retrieval, str):
+            retrieval = self.get_retrieval(retrieval)
+        if retrieval is None:
+            retrieval = self.retrieve(query, filters=filters)
+        return retrieval
+
+    def _answer_cache_entry(self, query, llm, retrieval):
+        """
+        计算语义缓存查找所需的 (问题向量, 作用域, 文档指纹)，未启用缓存时返回 None。
+        """
+        if self.answer_cache is None:
+            return None
+        try:
+            vector = self.embedding_fn.embed_query(query)
+        except Exception as e:
+            print(f"⚠️ 问题向量化失败，跳过问答缓存: {e}")
+            return None
+        scope = SemanticAnswerCache.make_scope(llm, retrieval.filters)
+        return vector, scope, docs_fingerprint(retrieval.documents)
+
+    def answer_cache_stats(self):
+        """
+        问答缓存命中统计（未启用缓存时返回 None）。
+        """
+        return self.answer_cache.stats() if self.answer_cache is not None else None
+
+    def _build_rag_prompt(self, query, context):
+        return f"""
         基于以下历史会议记录回答问题。如果不知道，就说不知道。
         
         --- 历史记录 ---
@@ -202,6 +547,62 @@ class MeetingKnowledgeBase:
         问题: {query}
         回答:
         """
+
+    def query_with_llm(self, query, llm, filters=None, retrieval=None):
+        """
+        RAG: 检索 + 生成回答
+
+        :param retrieval: 已有的 RetrievalResult 或其 handle，传入时跳过检索
+        """
+        if self.vector_store is None:
+            return "知识库为空，无法回答。"
+            
+        # 1. 检索相关文档（纪要 + 逐字稿细节），可复用调用方已有的检索结果
+        retrieval = self._resolve_retrieval(query, filters, retrieval)
+        if not retrieval.documents:
+            return "未找到相关信息。"
+        
+        # 2. 语义缓存：相似问题且检索文档未变化时直接返回历史答案
+        cache_entry = self._answer_cache_entry(query, llm, retrieval)
+        if cache_entry is not None:
+            answer = self.answer_cache.lookup(*cache_entry)
+            if answer is not None:
+                return answer
         
-        # 3. 调用 LLM
-        return llm.invoke(prompt).content
+        # 3. 构造 Prompt
+        prompt = self._build_rag_prompt(query, retrieval.context)
+        
+        # 4. 调用 LLM
+        answer = llm.invoke(prompt).content
+        if cache_entry is not None:
+            self.answer_cache.put(query, *cache_entry, answer)
+        return answer
+
+    def query_with_llm_stream(self, query, llm, filters=None, retrieval=None):
+        """
+        RAG 流式版本：检索后逐块返回 LLM 生成的回答。
+        """
+        if self.vector_store is None:
+            yield "知识库为空，无法回答。"
+            return
+
+        retrieval = self._resolve_retrieval(query, filters, retrieval)
+        if not retrieval.documents:
+            yield "未找到相关信息。"
+            return
+
+        cache_entry = self._answer_cache_entry(query, llm, retrieval)
+        if cache_entry is not None:
+            answer = self.answer_cache.lookup(*cache_entry)
+            if answer is not None:
+                yield answer
+                return
+
+        parts = []
+        for chunk in llm.stream(self._build_rag_prompt(query, retrieval.context)):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        # 只缓存完整生成的答案（中途被打断时不会走到这里）
+        if cache_entry is not None and parts:
+            self.answer_cache.put(query, *cache_entry, "".join(parts))
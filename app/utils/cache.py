@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import app.utils.config as config
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    计算文件内容的 SHA-256（按块读取，大文件也不会占用过多内存）。
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def bytes_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(*parts):
+    """
+    将若干组成部分（哈希、模型名、参数等）组合成一个缓存键。
+    """
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    基于内容寻址的持久化结果缓存（转录文本、会议纪要等）。
+    每个条目一个 JSON 文件，按访问时间做 LRU，总大小超过上限时淘汰最旧条目。
+    淘汰只扫描 NAMESPACES 下的目录，CACHE_DIR 中的其他文件（问答缓存、向量缓存等）不受影响。
+    """
+    NAMESPACES = ("transcripts", "summaries")
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or config.CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else config.CACHE_MAX_MB * 1024 * 1024
+        self._evict_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, namespace, key):
+        return os.path.join(self.cache_dir, namespace, key[:2], f"{key}.json")
+
+    def get(self, namespace, key):
+        path = self._path(namespace, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # 更新访问时间，作为 LRU 依据
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry.get("value")
+
+    def put(self, namespace, key, value, meta=None):
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"value": value, "meta": meta or {}, "created": time.time()}
+        # 先写临时文件再原子替换，避免并发读到半个文件
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._evict()
+
+    def _evict(self):
+        if self.max_bytes <= 0:
+            return
+        with self._evict_lock:
+            entries = []
+            total = 0
+            for namespace in self.NAMESPACES:
+                for root, _, files in os.walk(os.path.join(self.cache_dir, namespace)):
+                    for name in files:
+                        if not name.endswith(".json"):
+                            continue
+                        path = os.path.join(root, name)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        entries.append((st.st_mtime, st.st_size, path))
+                        total += st.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+# 进程内共享的默认缓存
+result_cache = ResultCache()
+
+
+def transcript_cache_key(audio_hash, model_key, settings=None):
+    """
+    转录缓存键：音频内容哈希 + ASR 模型/配置 + 解码设置（beam、预切分 VAD、流式等）。
+    """
+    return make_key("transcript", audio_hash, model_key, settings or {})
+
+
+def summary_cache_key(transcript, summarizer):
+    """
+    摘要缓存键：转录文本哈希 + 提示词 + LLM 提供商/模型（及分块策略）。
+    """
+    return make_key("summary", text_hash(transcript), summarizer.signature())
+
+
+def cached_transcribe(transcriber, audio_path, model_key, verbose=True, transcribe_fn=None, streaming=False):
+    """
+    带缓存的文件转录：内容相同的音频（即使文件名不同）只识别一次。
+
+    :param transcribe_fn: 自定义转录函数 (audio_path) -> str，默认调用 transcriber.transcribe
+    :param streaming: transcribe_fn 是否按窗口流式转录（流式与整文件识别的结果分别缓存）
+    """
+    from app.asr.registry import decode_settings
+
+    settings = decode_settings(model_key[0], streaming)
+    key = transcript_cache_key(file_hash(audio_path), model_key, settings)
+    transcript = result_cache.get("transcripts", key)
+    if transcript is not None:
+        if verbose:
+            print(f"♻️ 命中转录缓存: {os.path.basename(audio_path)}")
+        return transcript
+    if transcribe_fn is not None:
+        transcript = transcribe_fn(audio_path)
+    else:
+        transcript = transcriber.transcribe(audio_path, verbose=verbose)
+    result_cache.put("transcripts", key, transcript, meta={"source": os.path.basename(audio_path)})
+    return transcript
+
+
+def cached_summarize(summarizer, transcript, verbose=True):
+    """
+    带缓存的摘要生成：相同转录 + 相同提示词/模型不重复调用 LLM。
+    """
+    key = summary_cache_key(transcript, summarizer)
+    summary = result_cache.get("summaries", key)
+    if summary is not None:
+        if verbose:
+            print("♻️ 命中摘要缓存，跳过 LLM 调用")
+        return summary
+    summary = summarizer.summarize(transcript)
+    result_cache.put("summaries", key, summary, meta={"model": summarizer.model_name})
+    return summary
+
+
+def cached_summarize_stream(summarizer, transcript, verbose=True):
+    """
+    流式版本的 cached_summarize：命中缓存时一次性返回，否则边生成边返回，结束后写入缓存。
+    """
+    key = summary_cache_key(transcript, summarizer)
+    summary = result_cache.get("summaries", key)
+    if summary is not None:
+        if verbose:
+            print("♻️ 命中摘要缓存，跳过 LLM 调用")
+        yield summary
+        return
+    parts = []
+    for piece in summarizer.summarize_stream(transcript):
+        parts.append(piece)
+        yield piece
+    result_cache.put("summaries", key, "".join(parts), meta={"model": summarizer.model_name})
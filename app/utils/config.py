@@ -45,6 +45,18 @@ DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY")
 # 智谱 AI (GLM)
 ZHIPUAI_API_KEY = os.getenv("ZHIPUAI_API_KEY")
 
+# 长会议摘要策略: auto (超长时分块 map-reduce) / stuff (一次性) / map_reduce (总是分块)
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "auto").lower()
+# 单次 LLM 调用的会议记录 token 预算（按模型上下文调整，如 qwen2:1.5b 建议 1500）
+SUMMARY_CHUNK_TOKENS = max(200, int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000")))
+SUMMARY_CHUNK_OVERLAP = max(0, int(os.getenv("SUMMARY_CHUNK_OVERLAP", "100")))
+# 分块摘要的最大并发请求数
+SUMMARY_MAX_CONCURRENCY = max(1, int(os.getenv("SUMMARY_MAX_CONCURRENCY", "4")))
+# 实时模式滚动摘要：会议进行中每累积 ROLLING_SUMMARY_TOKENS 或每隔 N 分钟在后台折叠一次，结束时只做合并
+ROLLING_SUMMARY = os.getenv("ROLLING_SUMMARY", "true").lower() == "true"
+ROLLING_SUMMARY_INTERVAL_MINUTES = max(1.0, float(os.getenv("ROLLING_SUMMARY_INTERVAL_MINUTES", "5")))
+ROLLING_SUMMARY_TOKENS = max(200, int(os.getenv("ROLLING_SUMMARY_TOKENS", "1500")))
+
 # ASR 引擎选择与 FunASR 配置
 ASR_PROVIDER = os.getenv("ASR_PROVIDER", "whisper").lower()  # whisper 或 funasr
 ASR_FUNASR_MODEL = os.getenv("ASR_FUNASR_MODEL", "paraformer-zh")
@@ -54,12 +66,111 @@ ASR_FUNASR_PUNC = os.getenv("ASR_FUNASR_PUNC", "ct-punc-zh")
 # Whisper 配置
 # 本地模型大小: tiny, base, small, medium, large
 WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+# 性能档位 (accurate / balanced / fast)，见 app/asr/profiles.py；默认 accurate 与以往的 float32 + beam 5 一致
+WHISPER_PROFILE = os.getenv("WHISPER_PROFILE", "accurate").lower()
+# 以下参数留空 / 为 0 时使用档位默认值
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "")
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "0"))
+WHISPER_BEST_OF = int(os.getenv("WHISPER_BEST_OF", "0"))
+# CTranslate2 计算线程数（0 为自动）与并发推理数（多个线程同时调用同一模型时）
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+WHISPER_NUM_WORKERS = max(1, int(os.getenv("WHISPER_NUM_WORKERS", "1")))
+
+# ASR 推理设备 (cpu / cuda)
+ASR_DEVICE = os.getenv("ASR_DEVICE", "cpu").lower()
+# 进程内最多同时缓存的 ASR 模型数（超出后按 LRU 卸载）
+ASR_MODEL_CACHE_SIZE = max(1, int(os.getenv("ASR_MODEL_CACHE_SIZE", "2")))
+# 启动时预加载 ASR 模型（Web 端在后台线程中预热）
+ASR_WARMUP = os.getenv("ASR_WARMUP", "true").lower() == "true"
+
+# 实时模式 ASR 工作线程数（语音段在后台线程池中识别，采集循环不阻塞）
+ASR_WORKERS = max(1, int(os.getenv("ASR_WORKERS", "1")))
+# 批量推理：Whisper 批大小（<= 1 关闭批量推理，默认关闭；开启后文件识别改走 BatchedInferencePipeline，
+# 分段与解码结果会有差异）、FunASR 每批音频总秒数
+ASR_BATCH_SIZE = max(1, int(os.getenv("ASR_BATCH_SIZE", "1")))
+FUNASR_BATCH_SIZE_S = int(os.getenv("FUNASR_BATCH_SIZE_S", "300"))
+# 文件模式流式转录：按窗口解码识别并逐段写盘，支持断点续跑
+ASR_STREAMING = os.getenv("ASR_STREAMING", "true").lower() == "true"
+ASR_STREAM_WINDOW_SECONDS = max(30, int(os.getenv("ASR_STREAM_WINDOW_SECONDS", "300")))
+# 结构化逐字稿中是否计算 Whisper 词级时间戳（需要额外对齐计算，FunASR 自带字级时间戳不受影响）
+ASR_WORD_TIMESTAMPS = os.getenv("ASR_WORD_TIMESTAMPS", "false").lower() == "true"
+# 实时模式下工作线程一次最多合并识别的排队语音段数
+ASR_BATCH_MAX_SEGMENTS = max(1, int(os.getenv("ASR_BATCH_MAX_SEGMENTS", "8")))
+# 实时采集环形缓冲区容量（秒）；写满时丢弃新到的音频并计数
+AUDIO_RING_SECONDS = max(1, int(os.getenv("AUDIO_RING_SECONDS", "10")))
+# 单个语音段最长时长（秒，超出后切分提交）与预分配的语音段缓冲区个数
+AUDIO_MAX_SEGMENT_SECONDS = max(5, int(os.getenv("AUDIO_MAX_SEGMENT_SECONDS", "30")))
+AUDIO_SEGMENT_POOL = max(1, int(os.getenv("AUDIO_SEGMENT_POOL", "8")))
+# 批量能量 VAD：文件模式识别前预切分语音段，实时模式裁剪语音段首尾静音
+ASR_PRE_VAD = os.getenv("ASR_PRE_VAD", "true").lower() == "true"
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "10"))        # 高于噪声底多少 dB 判为语音
+VAD_FLOOR_DB = float(os.getenv("VAD_FLOOR_DB", "-50"))         # 低于该能量 (dBFS) 一律视为静音
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "250"))
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "500"))
+VAD_PADDING_MS = int(os.getenv("VAD_PADDING_MS", "200"))
+# 实时模式中间结果：说话过程中每隔 ASR_INTERIM_INTERVAL_MS 给出临时识别结果，语音段结束后定稿
+ASR_INTERIM = os.getenv("ASR_INTERIM", "false").lower() == "true"
+ASR_INTERIM_INTERVAL_MS = max(200, int(os.getenv("ASR_INTERIM_INTERVAL_MS", "800")))
+# FunASR 后端的流式模型（增量解码），留空则与 Whisper 一样对语音段滑动窗口重识别
+ASR_INTERIM_FUNASR_MODEL = os.getenv("ASR_INTERIM_FUNASR_MODEL", "paraformer-zh-streaming")
+# 是否异步保存实时语音段到 debug/ 目录（排查 VAD/识别问题时开启）
+DEBUG_AUDIO_DUMP = os.getenv("DEBUG_AUDIO_DUMP", "false").lower() == "true"
+
+# 文件模式批处理流水线并发度
+# ASR 进程数，0 表示按 CPU 核数自动设置
+PIPELINE_ASR_PROCESSES = max(0, int(os.getenv("PIPELINE_ASR_PROCESSES", "0")))
+# LLM 摘要并发数（网络等待为主，可高于核数）
+PIPELINE_SUMMARY_WORKERS = max(1, int(os.getenv("PIPELINE_SUMMARY_WORKERS", "4")))
+# 入库（向量化 + 写索引）与邮件通知并发数
+PIPELINE_INDEX_WORKERS = max(1, int(os.getenv("PIPELINE_INDEX_WORKERS", "2")))
+# 阶段间队列容量（背压）
+PIPELINE_QUEUE_SIZE = max(1, int(os.getenv("PIPELINE_QUEUE_SIZE", "8")))
+
+# 转录 / 摘要结果缓存（按内容哈希寻址，超出上限按 LRU 淘汰）
+CACHE_DIR = os.getenv("CACHE_DIR", "data/cache")
+CACHE_MAX_MB = int(os.getenv("CACHE_MAX_MB", "512"))
 
 # 向量模型本地路径（可选，设置后优先使用本地目录，避免联网下载）
 FASTEMBED_MODEL_DIR = os.getenv("FASTEMBED_MODEL_DIR", "BAAI/bge-small-zh-v1.5").strip()
 
+# 逐字稿分块入库：每块 token 数与相邻块重叠
+TRANSCRIPT_CHUNK_TOKENS = max(50, int(os.getenv("TRANSCRIPT_CHUNK_TOKENS", "300")))
+TRANSCRIPT_CHUNK_OVERLAP = max(0, int(os.getenv("TRANSCRIPT_CHUNK_OVERLAP", "50")))
+# 问答时是否在命中会议的逐字稿中下钻，以及每个会议取多少块
+RAG_INCLUDE_TRANSCRIPTS = os.getenv("RAG_INCLUDE_TRANSCRIPTS", "true").lower() == "true"
+RAG_TRANSCRIPT_CHUNKS = max(1, int(os.getenv("RAG_TRANSCRIPT_CHUNKS", "2")))
+
+# 混合检索：向量 + BM25 关键词（人名、项目编号、版本号等精确词）倒数排名融合
+RAG_HYBRID = os.getenv("RAG_HYBRID", "true").lower() == "true"
+# 融合前每路检索取 k * RAG_FUSION_CANDIDATES 个候选
+RAG_FUSION_CANDIDATES = max(1, int(os.getenv("RAG_FUSION_CANDIDATES", "3")))
+
+# 检索结果缓存：相同问题在 TTL 秒内直接复用检索结果（新数据入库后失效）
+RAG_RETRIEVAL_CACHE_TTL = int(os.getenv("RAG_RETRIEVAL_CACHE_TTL", "300"))
+RAG_RETRIEVAL_CACHE_SIZE = max(1, int(os.getenv("RAG_RETRIEVAL_CACHE_SIZE", "128")))
+
+# 问答语义缓存：相似问题（余弦相似度 >= 阈值）且检索文档一致时直接返回历史答案
+RAG_ANSWER_CACHE = os.getenv("RAG_ANSWER_CACHE", "true").lower() == "true"
+RAG_ANSWER_CACHE_THRESHOLD = float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.92"))
+RAG_ANSWER_CACHE_TTL = int(os.getenv("RAG_ANSWER_CACHE_TTL", str(7 * 24 * 3600)))
+RAG_ANSWER_CACHE_SIZE = max(1, int(os.getenv("RAG_ANSWER_CACHE_SIZE", "1000")))
+
+# 向量化批大小与并行进程数（批量导入历史纪要时可调大）
+EMBED_BATCH_SIZE = max(1, int(os.getenv("EMBED_BATCH_SIZE", "64")))
+EMBED_PARALLEL = max(0, int(os.getenv("EMBED_PARALLEL", "0")))
+
+# 向量缓存：按 (模型, 规范化文本哈希) 缓存，内存 LRU + 磁盘内存映射
+EMBED_CACHE = os.getenv("EMBED_CACHE", "true").lower() == "true"
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "data/cache/embeddings")
+EMBED_CACHE_MEMORY = max(1, int(os.getenv("EMBED_CACHE_MEMORY", "10000")))
+
 # 向量库选择：auto/chroma/faiss
 VECTOR_STORE = os.getenv("VECTOR_STORE", "auto").lower()
+# FAISS 增量持久化：WAL 累积多少条或多少秒后压缩为新快照
+FAISS_COMPACT_EVERY = max(1, int(os.getenv("FAISS_COMPACT_EVERY", "500")))
+FAISS_COMPACT_INTERVAL = int(os.getenv("FAISS_COMPACT_INTERVAL", "3600"))
+# 过滤检索时，候选子集不超过该数量则直接在子集上精确计算（否则退回 FAISS 检索后过滤）
+FAISS_PREFILTER_MAX = max(1, int(os.getenv("FAISS_PREFILTER_MAX", "20000")))
 
 # 邮件配置
 ENABLE_EMAIL_NOTIFICATION = os.getenv("ENABLE_EMAIL_NOTIFICATION", "false").lower() == "true"
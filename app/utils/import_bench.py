@@ -0,0 +1,90 @@
+"""
+启动耗时基准：在独立的子进程中分别导入各子系统，统计导入耗时以及被连带加载的重量级依赖。
+
+用法:
+    python -m app.utils.import_bench              # 每个子系统测 3 次取中位数
+    python -m app.utils.import_bench --repeat 5 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# 子系统 -> 入口模块
+SUBSYSTEMS = {
+    "config": "app.utils.config",
+    "asr": "app.asr.registry",
+    "audio": "app.audio.recorder",
+    "llm": "app.llm.summarizer",
+    "rag": "app.rag.vector_store",
+    "pipeline": "app.pipeline.batch",
+    "cli": "main",
+}
+
+# 不应在导入阶段被加载的重量级依赖
+HEAVY_MODULES = (
+    "sounddevice", "webrtcvad", "faster_whisper", "funasr", "torch",
+    "langchain_openai", "langchain_community", "langchain_ollama",
+    "chromadb", "langchain_chroma", "faiss", "fastembed", "sentence_transformers",
+)
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "modules": len(sys.modules), "heavy": heavy}}))
+"""
+
+
+def measure(module, repeat=3):
+    """
+    在干净的子进程中导入模块 repeat 次，返回耗时中位数与加载的重量级依赖。
+    """
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=root, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()
+            return {"error": error[-1] if error else f"exit {proc.returncode}"}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "modules": runs[-1]["modules"],
+        "heavy": runs[-1]["heavy"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计各子系统的导入耗时")
+    parser.add_argument("subsystems", nargs="*", default=list(SUBSYSTEMS), help="要测量的子系统 (默认全部)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个子系统重复次数 (取中位数)")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.subsystems:
+        results[name] = measure(SUBSYSTEMS.get(name, name), args.repeat)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'子系统':<10}{'耗时(ms)':>10}{'模块数':>8}  重量级依赖")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<10}{'-':>10}{'-':>8}  ❌ {result['error']}")
+            continue
+        heavy = ", ".join(result["heavy"]) or "无"
+        print(f"{name:<10}{result['seconds'] * 1000:>10.1f}{result['modules']:>8}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import importlib
+import importlib.util
+import threading
+
+
+class PluginRegistry:
+    """
+    后端插件注册表：注册时只记录 "模块路径:属性名"，第一次使用时才导入。
+    LLM / ASR / 向量库 / 向量模型等重量级依赖都通过它按需加载，
+    只用到一个提供商时不会把其他提供商的 SDK 一并导入。
+    """
+    def __init__(self, kind):
+        self.kind = kind
+        self._targets = {}      # name -> (module, attr, requires)
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, target, requires=()):
+        """
+        :param target: "package.module:Attribute"
+        :param requires: 额外需要安装的顶层包名，用于 available() 检测
+        """
+        module, _, attr = target.partition(":")
+        self._targets[name] = (module, attr, tuple(requires))
+
+    def names(self):
+        return list(self._targets)
+
+    def available(self, name):
+        """
+        检查后端依赖是否已安装（只查找模块，不执行导入）。
+        """
+        if name not in self._targets:
+            return False
+        module, _, requires = self._targets[name]
+        for package in (module.split(".")[0],) + requires:
+            if importlib.util.find_spec(package) is None:
+                return False
+        return True
+
+    def load(self, name):
+        """
+        导入并返回后端对象，结果会被缓存。
+        """
+        if name in self._loaded:
+            return self._loaded[name]
+        if name not in self._targets:
+            raise KeyError(f"未知的{self.kind}后端: {name} (可选: {', '.join(self._targets)})")
+        with self._lock:
+            if name not in self._loaded:
+                module, attr, _ = self._targets[name]
+                obj = importlib.import_module(module)
+                self._loaded[name] = getattr(obj, attr) if attr else obj
+        return self._loaded[name]
+
+
+def lazy_exports(package, exports):
+    """
+    PEP 562 懒加载模块属性：包的 __init__ 中声明 {属性名: 子模块}，
+    访问属性时才导入对应子模块。
+
+    用法: __getattr__, __dir__ = lazy_exports(__name__, {"Foo": "app.x.foo"})
+    """
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name]), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
@@ -1,13 +1,8 @@
 import os
 import sys
 import app.utils.config as config
-if config.ASR_PROVIDER == "funasr":
-    from app.asr.funasr_client import AudioTranscriber
-else:
-    from app.asr.whisper_client import AudioTranscriber
 from app.llm.summarizer import MeetingSummarizer
 from app.utils.notifier import EmailNotifier
-from app.audio.recorder import RealtimeAssistant
 from app.rag.vector_store import MeetingKnowledgeBase
 
 def main():
@@ -53,11 +48,6 @@ def main():
 
     # 初始化工具
     try:
-        # 初始化语音识别模型 (本地运行)
-        # 尝试使用 tiny 模型以提高下载成功率
-        transcriber = AudioTranscriber(model_size="tiny")
-        print("语音识别模型初始化完成。")
-
         # 初始化摘要生成器
         summarizer = MeetingSummarizer(provider=config.LLM_PROVIDER)
         print("摘要生成器初始化完成。")
@@ -76,75 +66,27 @@ def main():
 
     # 根据模式选择执行路径
     if config.MODE == "realtime":
+        # 初始化语音识别模型 (本地运行，经由进程级模型注册表加载)
+        # 模型大小由 WHISPER_MODEL_SIZE 决定，下载困难时可设为 tiny
+        # 文件模式下模型在流水线的 ASR 子进程中加载
+        from app.asr.registry import registry
+        from app.audio.recorder import RealtimeAssistant
+        try:
+            transcriber = registry.acquire()
+            print("语音识别模型初始化完成。")
+        except Exception as e:
+            print(f"语音识别模型初始化失败: {e}")
+            return
         assistant = RealtimeAssistant(transcriber, summarizer, notifier, knowledge_base)
         assistant.run()
         return
 
     # --- 文件处理模式 ---
-    for audio_file in audio_files:
-        audio_path = os.path.join(input_dir, audio_file)
-        base_name = os.path.splitext(audio_file)[0]
-        
-        # 输出文件路径
-        output_summary_path = os.path.join(output_dir, f"{base_name}_summary.md")
-        output_transcript_path = os.path.join(output_dir, f"{base_name}_transcript.txt")
-
-        print(f"\n>>> 开始处理: {audio_file}")
-        
-        # 1. 语音转文字
-        transcript = ""
-        # 如果已经存在转录文件，可以选择跳过
-        if os.path.exists(output_transcript_path):
-            print(f"发现已存在的转录文件: {output_transcript_path}")
-            print("读取中...")
-            with open(output_transcript_path, "r", encoding="utf-8") as f:
-                transcript = f.read()
-        else:
-            try:
-                # Add ASR provider information to transcribe output for better debugging and tracking
-                transcript = transcriber.transcribe(audio_path, provider=config.ASR_PROVIDER)
-                # 保存转录文本
-
-                # LLM 模型分析优化生成的文本
-                optimized_transcript = summarizer.optimize_transcript(transcript)
-                with open(output_transcript_path, "w", encoding="utf-8") as f:
-                    f.write(optimized_transcript)
-                print(f"转录完成，已保存至 {output_transcript_path}")
-            except Exception as e:
-                print(f"文件 {audio_file} 转录失败: {e}")
-                continue
-
-        if not transcript.strip():
-            print("转录内容为空，跳过摘要生成。")
-            continue
-
-        # 2. 生成摘要
-        try:
-            summary = summarizer.summarize(transcript)
-            # 保存摘要
-            with open(output_summary_path, "w", encoding="utf-8") as f:
-                f.write(summary)
-            print(f"会议纪要生成成功，已保存至 {output_summary_path}")
-            
-            # 存入知识库
-            try:
-                knowledge_base.add_meeting(
-                    summary=summary,
-                    transcript=transcript,
-                    metadata={"source": audio_file, "date": "2024-01-01"} # 这里可以加更真实的日期
-                )
-            except Exception as e:
-                print(f"⚠️ 存入知识库失败: {e}")
-
-            # 发送邮件通知
-            if config.ENABLE_EMAIL_NOTIFICATION:
-                notifier.send_summary(
-                    subject=f"会议纪要: {base_name}",
-                    summary_content=summary,
-                    attachment_path=output_summary_path
-                )
-        except Exception as e:
-            print(f"文件 {audio_file} 摘要生成失败: {e}")
+    # ASR / 摘要 / 入库分阶段并行执行，各阶段并发度见 config.PIPELINE_*
+    from app.pipeline.batch import BatchPipeline
+    audio_paths = [os.path.join(input_dir, audio_file) for audio_file in audio_files]
+    pipeline = BatchPipeline(summarizer, knowledge_base, notifier, output_dir)
+    pipeline.run(audio_paths)
 
     print("\n所有任务处理完成。")
 
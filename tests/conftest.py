@@ -0,0 +1,48 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+
+class FakeEmbeddings:
+    """
+    确定性的假向量模型：按文本哈希生成单位向量，无需下载模型。
+    """
+    dim = 16
+
+    def __init__(self):
+        self.calls = 0
+
+    def _vector(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self._vector(text)
+
+
+@pytest.fixture
+def fake_embeddings():
+    return FakeEmbeddings()
+
+
+@pytest.fixture
+def faiss_kb(tmp_path, monkeypatch):
+    """
+    FAISS 模式的知识库，使用假向量模型与临时目录。
+    """
+    pytest.importorskip("faiss")
+    pytest.importorskip("langchain_community")
+    import app.utils.config as config
+    from app.rag.vector_store import MeetingKnowledgeBase
+
+    monkeypatch.setattr(config, "VECTOR_STORE", "faiss")
+    monkeypatch.setattr(config, "RAG_ANSWER_CACHE", False)
+    monkeypatch.setattr(MeetingKnowledgeBase, "_init_embedding", lambda self: FakeEmbeddings())
+    return MeetingKnowledgeBase(persist_dir=str(tmp_path / "vector_store"))
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+
+from app.pipeline.batch import BatchPipeline, _Stage
+
+
+def item(name):
+    return {"file": name, "audio_path": name, "base_name": name, "timings": {}}
+
+
+def test_stages_chain_and_failed_items_stop_at_their_stage():
+    visits = []
+    lock = threading.Lock()
+
+    def step(name, fail=()):
+        def run(work):
+            with lock:
+                visits.append((work["file"], name))
+            if work["file"] in fail:
+                raise RuntimeError("boom")
+            return work
+        return run
+
+    first, second, third = queue.Queue(maxsize=1), queue.Queue(maxsize=1), queue.Queue(maxsize=1)
+    stages = [
+        _Stage("asr", step("asr"), 2, first, second),
+        _Stage("summary", step("summary", fail={"b"}), 2, second, third),
+        _Stage("index", step("index"), 1, third),
+    ]
+    for stage in stages:
+        stage.start()
+    for name in "abcde":
+        first.put(item(name))
+    for stage in stages:
+        stage.close()
+
+    assert [(stage.processed, stage.failed) for stage in stages] == [(5, 0), (4, 1), (4, 0)]
+    assert sorted(name for name, stage in visits if stage == "index") == ["a", "c", "d", "e"]
+    # 每个文件按 asr -> summary -> index 的顺序经过各阶段
+    for name in "acde":
+        assert [stage for file, stage in visits if file == name] == ["asr", "summary", "index"]
+    assert [stage for file, stage in visits if file == "b"] == ["asr", "summary"]
+
+
+def test_pipeline_run_overlaps_stages_and_reports(tmp_path, capsys):
+    pipeline = BatchPipeline(None, None, None, str(tmp_path))
+    pipeline.asr_processes = 2
+    pipeline.summary_workers = 2
+    pipeline.index_workers = 1
+    pipeline.queue_size = 1
+    indexed = []
+
+    def asr(work):
+        if work["file"] == "broken.wav":
+            raise RuntimeError("解码失败")
+        time.sleep(0.01)
+        # 空逐字稿不进入摘要阶段
+        return None if work["file"] == "silent.wav" else dict(work, transcript=work["file"])
+
+    def summary(work):
+        time.sleep(0.02)
+        return dict(work, summary=f"纪要:{work['transcript']}")
+
+    def index(work):
+        indexed.append((work["file"], list(work["timings"])))
+        return work
+
+    pipeline._asr_step, pipeline._summary_step, pipeline._index_step = asr, summary, index
+    files = [f"m{i}.wav" for i in range(6)] + ["broken.wav", "silent.wav"]
+    pipeline.run([str(tmp_path / name) for name in files])
+
+    assert sorted(name for name, _ in indexed) == [f"m{i}.wav" for i in range(6)]
+    assert all(timings == ["asr", "summary"] for _, timings in indexed)
+    report = capsys.readouterr().out
+    assert "文件总数: 8, 完成: 6, 失败: 1" in report
+    assert "解码失败" in report
@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.documents import Document
+
+from app.rag.bm25 import BM25Index, doc_key, reciprocal_rank_fusion, tokenize
+
+TEXTS = [
+    "项目 Apollo 的发布排期推迟到 v2.1 版本",
+    "预算评审会议确认了第三季度的采购计划",
+    "Apollo 的测试环境需要扩容",
+    "团队建设活动定在下周五",
+]
+
+
+def build(path):
+    index = BM25Index(str(path / "bm25.jsonl"))
+    index.add([f"d{i}" for i in range(len(TEXTS))], TEXTS,
+              [{"doc_id": f"d{i}", "meeting_id": f"m{i % 2}"} for i in range(len(TEXTS))])
+    return index
+
+
+def ids(docs):
+    return [doc.metadata["doc_id"] for doc in docs]
+
+
+def test_tokenize_keeps_ascii_terms_whole():
+    tokens = tokenize("项目 Apollo 推迟到 v2.1.")
+    assert "apollo" in tokens
+    assert "v2.1" in tokens
+
+
+def test_search_ranks_exact_terms(tmp_path):
+    index = build(tmp_path)
+    assert set(ids(index.search("Apollo", k=4))) == {"d0", "d2"}
+    assert ids(index.search("v2.1 发布排期", k=1)) == ["d0"]
+    assert index.search("毫不相关的查询 zzz") == []
+
+
+def test_search_filter_fn(tmp_path):
+    index = build(tmp_path)
+    hits = index.search("Apollo", k=4, filter_fn=lambda metadata: metadata["doc_id"] != "d2")
+    assert ids(hits) == ["d0"]
+    assert index.search("Apollo", filter_fn=lambda metadata: metadata["meeting_id"] == "m1") == []
+
+
+def test_index_reloads_and_ignores_duplicate_ids(tmp_path):
+    index = build(tmp_path)
+    index.add(["d0"], ["完全不同的内容"], [{"doc_id": "d0"}])
+    assert len(index) == len(TEXTS)
+
+    reloaded = BM25Index(index.path)
+    assert len(reloaded) == len(TEXTS)
+    assert ids(reloaded.search("Apollo 测试环境", k=2)) == ids(index.search("Apollo 测试环境", k=2))
+
+
+def test_torn_last_line_is_truncated_before_appending(tmp_path):
+    index = build(tmp_path)
+    with open(index.path, "a", encoding="utf-8") as f:
+        f.write('{"id": "d9", "text": "写了一半')
+    reopened = BM25Index(index.path)
+    assert len(reopened) == len(TEXTS)
+
+    # 截断后追加的记录在再次加载时仍然可见
+    reopened.add(["d9"], ["崩溃之后新增的 Hermes 文档"], [{"doc_id": "d9", "meeting_id": "m1"}])
+    again = BM25Index(index.path)
+    assert len(again) == len(TEXTS) + 1
+    assert ids(again.search("Hermes", k=1)) == ["d9"]
+
+
+def doc(doc_id, text=None):
+    return Document(page_content=text or doc_id, metadata={"doc_id": doc_id})
+
+
+def test_reciprocal_rank_fusion_orders_by_summed_rank():
+    vector = [doc("a"), doc("b"), doc("c")]
+    keyword = [doc("c"), doc("a"), doc("d")]
+
+    fused = reciprocal_rank_fusion([vector, keyword], k=60)
+    assert ids(fused) == ["a", "c", "b", "d"]
+    assert ids(reciprocal_rank_fusion([vector, keyword], limit=2)) == ["a", "c"]
+
+    scored = reciprocal_rank_fusion([vector, keyword], with_scores=True)
+    assert scored[0][1] == pytest.approx(1 / 61 + 1 / 62)
+    assert [score for _, score in scored] == sorted((score for _, score in scored), reverse=True)
+
+
+def test_doc_key_falls_back_to_content_hash():
+    legacy = Document(page_content="旧数据", metadata={})
+    assert doc_key(legacy) == doc_key(Document(page_content="旧数据", metadata={"source": "x"}))
+    assert len(reciprocal_rank_fusion([[legacy], [Document(page_content="旧数据")]])) == 1
@@ -0,0 +1,55 @@
+import os
+import time
+
+from app.utils.cache import ResultCache
+
+
+def test_eviction_only_touches_result_namespaces(tmp_path):
+    answers = tmp_path / "answers.json"
+    answers.write_text("{}" + " " * 4000, encoding="utf-8")
+    os.utime(answers, (1, 1))
+    cache = ResultCache(cache_dir=str(tmp_path), max_bytes=3000)
+
+    for i in range(6):
+        cache.put("transcripts", f"{i:02d}" * 32, "x" * 500)
+        path = cache._path("transcripts", f"{i:02d}" * 32)
+        os.utime(path, (time.time() + i, time.time() + i))
+
+    # 问答缓存比所有条目都旧，也不会被转录缓存的淘汰删除
+    assert answers.exists()
+    assert cache.get("transcripts", "00" * 32) is None
+    assert cache.get("transcripts", "05" * 32) == "x" * 500
+
+
+def test_transcript_cache_key_follows_decode_settings(tmp_path, monkeypatch):
+    import app.utils.cache as cache
+    import app.utils.config as config
+
+    monkeypatch.setattr(cache, "result_cache", ResultCache(cache_dir=str(tmp_path / "cache")))
+    monkeypatch.setattr(config, "WHISPER_BEAM_SIZE", 0)
+    audio_path = tmp_path / "meeting.wav"
+    audio_path.write_bytes(b"fake audio")
+    key = ("whisper", "base", "float32", "cpu")
+    calls = []
+
+    def transcribe(path):
+        calls.append(path)
+        return f"第{len(calls)}次识别"
+
+    def run(streaming=False):
+        return cache.cached_transcribe(None, str(audio_path), key, verbose=False,
+                                       transcribe_fn=transcribe, streaming=streaming)
+
+    assert run() == "第1次识别"
+    assert run() == "第1次识别"
+    # 预切分 VAD 只影响流式转录
+    monkeypatch.setattr(config, "ASR_PRE_VAD", not config.ASR_PRE_VAD)
+    assert run() == "第1次识别"
+    assert run(streaming=True) == "第2次识别"
+    monkeypatch.setattr(config, "ASR_PRE_VAD", not config.ASR_PRE_VAD)
+    assert run(streaming=True) == "第3次识别"
+    monkeypatch.setattr(config, "WHISPER_BEAM_SIZE", 1)
+    assert run() == "第4次识别"
+    monkeypatch.setattr(config, "ASR_BATCH_SIZE", config.ASR_BATCH_SIZE + 1)
+    assert run() == "第5次识别"
+    assert len(calls) == 5
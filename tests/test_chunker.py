@@ -0,0 +1,50 @@
+from app.llm.text_splitter import estimate_tokens
+from app.rag.chunker import TranscriptChunker
+
+TEXT = "".join(f"第{i}项议题已经讨论完毕。" for i in range(40))
+
+
+def test_chunker_incremental_feed_matches_one_shot():
+    expected = TranscriptChunker(50, 12).chunk(TEXT)
+
+    chunker = TranscriptChunker(50, 12)
+    chunks = []
+    for i in range(0, len(TEXT), 7):
+        chunks.extend(chunker.feed(TEXT[i:i + 7]))
+    chunks.extend(chunker.flush())
+
+    assert chunks == expected
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    assert all(estimate_tokens(chunk["text"]) <= 50 for chunk in chunks)
+
+
+def test_chunker_keeps_incomplete_tail_until_flush():
+    chunker = TranscriptChunker(1000, 0)
+    assert chunker.feed("第一句。第二句还没") == []
+    assert chunker.feed("说完") == []
+    assert chunker.flush()[0]["text"] == "第一句。第二句还没说完"
+    assert chunker.flush() == []
+
+
+def test_chunker_hard_splits_unpunctuated_tail():
+    chunker = TranscriptChunker(20, 0)
+    chunks = chunker.feed("没有标点的识别结果" * 10)
+    assert chunks
+    assert all(estimate_tokens(chunk["text"]) <= 20 for chunk in chunks + chunker.flush())
+
+
+def test_chunker_segments_carry_time_range():
+    segments = [{"text": f"第{i}段发言内容。", "start": i * 2.0, "end": i * 2.0 + 1.5} for i in range(12)]
+    segments.append({"text": "  ", "start": 99.0, "end": 100.0})
+    chunker = TranscriptChunker(30, 9)
+    chunks = chunker.feed_segments(segments) + chunker.flush()
+
+    assert len(chunks) > 1
+    assert chunks[0]["start"] == 0.0
+    assert chunks[-1]["end"] == 23.5
+    for chunk in chunks:
+        first = int(chunk["text"].split("段")[0][1:])
+        assert chunk["start"] == first * 2.0
+    # 重叠：后一块从前一块的最后一个分段开始
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current["start"] < previous["end"]
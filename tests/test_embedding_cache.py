@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from app.rag.embedding_cache import CachedEmbeddings
+from tests.conftest import FakeEmbeddings
+
+
+def open_cache(path, inner=None):
+    return CachedEmbeddings(inner or FakeEmbeddings(), "fake/model:v1", cache_dir=str(path), memory_size=2)
+
+
+def cache_files(cache):
+    return cache._vectors_path, cache._keys_path
+
+
+def test_cache_hits_memory_then_disk_after_reopen(tmp_path):
+    inner = FakeEmbeddings()
+    cache = open_cache(tmp_path, inner)
+    first = cache.embed_documents(["甲", "乙", "甲"])
+    assert inner.calls == 1
+    assert first[0] == first[2]
+    # 查询与文档使用不同的键
+    cache.embed_query("甲")
+    assert inner.calls == 2
+    assert cache.embed_documents(["乙"]) == [first[1]]
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+    inner = FakeEmbeddings()
+    reopened = open_cache(tmp_path, inner)
+    assert reopened.embed_documents([" 甲 ", "乙"]) == [first[0], first[1]]
+    assert inner.calls == 0
+    assert reopened.stats()["disk_hits"] == 2
+    assert reopened.stats()["disk_entries"] == 3
+
+
+def test_recovers_from_vectors_without_keys(tmp_path):
+    cache = open_cache(tmp_path)
+    vectors = cache.embed_documents(["甲", "乙", "丙"])
+    vectors_path, keys_path = cache_files(cache)
+    # 模拟写完向量、写键之前崩溃：最后一行键丢失
+    with open(keys_path, encoding="ascii") as f:
+        lines = f.readlines()
+    with open(keys_path, "w", encoding="ascii") as f:
+        f.writelines(lines[:2])
+
+    inner = FakeEmbeddings()
+    reopened = open_cache(tmp_path, inner)
+    assert reopened.stats()["disk_entries"] == 2
+    assert os.path.getsize(vectors_path) == 2 * FakeEmbeddings.dim * 4
+    assert reopened.embed_documents(["甲", "乙", "丙"]) == vectors
+    assert inner.calls == 1
+    assert open_cache(tmp_path).embed_documents(["丙"]) == [vectors[2]]
+
+
+def test_recovers_from_torn_key_line(tmp_path):
+    cache = open_cache(tmp_path)
+    vectors = cache.embed_documents(["甲", "乙"])
+    _, keys_path = cache_files(cache)
+    with open(keys_path, "a", encoding="ascii") as f:
+        f.write("deadbeef")
+
+    reopened = open_cache(tmp_path)
+    assert reopened.stats()["disk_entries"] == 2
+    reopened.embed_documents(["丙"])
+
+    inner = FakeEmbeddings()
+    again = open_cache(tmp_path, inner)
+    assert again.embed_documents(["甲", "乙"]) == vectors
+    assert again.embed_documents(["丙"]) == FakeEmbeddings().embed_documents(["丙"])
+    assert inner.calls == 0
+
+
+def test_recovers_when_no_key_was_written(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.embed_documents(["甲"])
+    _, keys_path = cache_files(cache)
+    with open(keys_path, "w", encoding="ascii") as f:
+        f.write("dead")
+
+    reopened = open_cache(tmp_path)
+    assert reopened.stats()["disk_entries"] == 0
+    vectors = reopened.embed_documents(["乙", "丙"])
+
+    inner = FakeEmbeddings()
+    assert open_cache(tmp_path, inner).embed_documents(["乙", "丙"]) == vectors
+    assert inner.calls == 0
@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from app.rag.faiss_store import FaissWALStore
+from tests.conftest import FakeEmbeddings
+
+
+def open_store(path, **kwargs):
+    options = dict(compact_every=1000, compact_interval=0)
+    options.update(kwargs)
+    return FaissWALStore(str(path), FakeEmbeddings(), **options)
+
+
+def add(store, start, count):
+    embeddings = FakeEmbeddings()
+    texts = [f"文档 {i}" for i in range(start, start + count)]
+    return store.add_embeddings(texts, embeddings.embed_documents(texts),
+                                [{"meeting_id": f"m{i % 3}"} for i in range(start, start + count)],
+                                [f"id-{i}" for i in range(start, start + count)])
+
+
+def test_wal_replay_restores_documents(tmp_path):
+    store = open_store(tmp_path)
+    add(store, 0, 5)
+    assert not os.path.exists(tmp_path / "CURRENT")
+
+    reopened = open_store(tmp_path)
+    assert len(reopened) == 5
+    assert "id-3" in reopened
+    assert [doc.page_content for doc in reopened.iter_documents()] == [f"文档 {i}" for i in range(5)]
+    hits = reopened.similarity_search_filtered("文档 1", k=5, filters={"meeting_id": "m1"})
+    assert [doc.page_content for doc in hits] == ["文档 1", "文档 4"]
+
+
+def test_torn_wal_tail_is_truncated(tmp_path):
+    store = open_store(tmp_path)
+    add(store, 0, 3)
+    good_size = os.path.getsize(store.wal_path)
+    with open(store.wal_path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 4, "id": "id-3", "text": "写了一')
+
+    reopened = open_store(tmp_path)
+    assert len(reopened) == 3
+    assert os.path.getsize(reopened.wal_path) == good_size
+
+    # 截断后追加的记录不会与残行拼接
+    add(reopened, 3, 2)
+    assert len(open_store(tmp_path)) == 5
+    with open(reopened.wal_path, encoding="utf-8") as f:
+        assert [json.loads(line)["seq"] for line in f] == [1, 2, 3, 4, 5]
+
+
+def test_compaction_snapshots_and_empties_wal(tmp_path):
+    store = open_store(tmp_path, compact_every=4)
+    add(store, 0, 3)
+    assert not os.path.exists(tmp_path / "CURRENT")
+    add(store, 3, 2)
+
+    name = (tmp_path / "CURRENT").read_text(encoding="utf-8")
+    assert name == "snapshot-000000000005"
+    assert os.path.getsize(store.wal_path) == 0
+
+    add(store, 5, 1)
+    reopened = open_store(tmp_path)
+    assert len(reopened) == 6
+    assert {doc.page_content for doc in reopened.iter_documents(batch_size=4)} == {f"文档 {i}" for i in range(6)}
+
+    reopened.compact()
+    assert sorted(entry for entry in os.listdir(tmp_path) if entry.startswith("snapshot-")) == ["snapshot-000000000006"]
+    assert len(open_store(tmp_path)) == 6
+
+
+def test_wal_records_already_in_snapshot_are_skipped(tmp_path):
+    store = open_store(tmp_path)
+    add(store, 0, 3)
+    wal = open(store.wal_path, "rb").read()
+    store.compact()
+    # 模拟压缩后、清空 WAL 前崩溃：WAL 中的记录都已包含在快照里
+    with open(store.wal_path, "wb") as f:
+        f.write(wal)
+
+    assert len(open_store(tmp_path)) == 3
@@ -0,0 +1,105 @@
+import queue
+import threading
+
+import numpy as np
+
+from app.asr.interim import InterimTranscriber, common_prefix, transcript_event
+
+
+class ScriptedDecoder:
+    """
+    按快照长度返回预设的假设；gate 未放行时阻塞在 decode 中。
+    """
+    def __init__(self, hypotheses=None):
+        self.hypotheses = hypotheses or {}
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+        self.decoded = []
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+    def decode(self, audio):
+        self.entered.set()
+        self.gate.wait(5)
+        self.decoded.append(len(audio))
+        return self.hypotheses.get(len(audio), f"len{len(audio)}")
+
+
+def snapshot(length):
+    return np.zeros(length, dtype=np.int16)
+
+
+def make_interim(decoder):
+    events = queue.Queue()
+    return InterimTranscriber(decoder, events.put), events
+
+
+def test_common_prefix_and_events():
+    assert common_prefix("今天我们", "今天你们") == "今天"
+    assert common_prefix("", "abc") == ""
+    assert transcript_event(3, "定稿", stable="定", final=True)["stable"] == "定稿"
+
+
+def test_only_latest_snapshot_is_decoded():
+    decoder = ScriptedDecoder()
+    interim, events = make_interim(decoder)
+    for length in (100, 200, 300):
+        interim.submit(0, snapshot(length))
+    interim.start()
+
+    assert events.get(timeout=5) == transcript_event(0, "len300")
+    interim.stop()
+    assert decoder.decoded == [300]
+    assert interim.skipped == 2
+    assert interim.decoded == 1
+
+
+def test_stable_prefix_grows_and_follows_revisions():
+    hypotheses = {1: "今天", 2: "今天我们", 3: "今天我们讨论", 4: "今天我门讨论预算", 5: "今天我门讨论预算吧"}
+    interim, events = make_interim(ScriptedDecoder(hypotheses))
+    interim.start()
+    stables = []
+    for length in range(1, 6):
+        interim.submit(0, snapshot(length))
+        event = events.get(timeout=5)
+        assert event["text"] == hypotheses[length]
+        stables.append(event["stable"])
+    interim.stop()
+
+    # 第 4 次假设推翻了“我们”，已稳定部分退回到与新假设一致的前缀
+    assert stables == ["", "今天", "今天我们", "今天我", "今天我门讨论预算"]
+
+
+def test_late_result_after_end_is_dropped():
+    decoder = ScriptedDecoder()
+    decoder.gate.clear()
+    interim, events = make_interim(decoder)
+    interim.start()
+
+    interim.submit(0, snapshot(100))
+    assert decoder.entered.wait(5)
+    interim.end(0)
+    decoder.gate.set()
+
+    interim.submit(1, snapshot(200))
+    assert events.get(timeout=5) == transcript_event(1, "len200")
+    interim.stop()
+    assert decoder.decoded == [100, 200]
+    assert events.empty()
+    # 新语音段开始时重置解码器状态
+    assert decoder.resets == 2
+
+
+def test_end_discards_pending_snapshot():
+    decoder = ScriptedDecoder()
+    interim, events = make_interim(decoder)
+    interim.submit(0, snapshot(100))
+    interim.end(0)
+    interim.start()
+    interim.stop()
+
+    assert decoder.decoded == []
+    assert events.empty()
@@ -0,0 +1,115 @@
+def make_meeting(i):
+    return {
+        "summary": f"第 {i} 次会议纪要：讨论了项目 {i} 的排期。",
+        "transcript": f"大家好。今天讨论项目 {i}。排期需要调整。下周再同步一次。",
+        "metadata": {"source": f"meeting_{i}.wav", "timestamp": 1700000000 + i * 86400},
+    }
+
+
+def test_add_meeting_routes_transcript_chunks_to_transcript_store(faiss_kb):
+    for i in range(5):
+        meeting = make_meeting(i)
+        faiss_kb.add_meeting(meeting["summary"], meeting["transcript"], meeting["metadata"])
+
+    assert len(faiss_kb.vector_store) == 5
+    assert len(faiss_kb.bm25) == 5
+    assert len(faiss_kb.transcript_store) == 5
+    assert len(faiss_kb.transcript_bm25) == 5
+
+
+def test_add_meetings_routes_transcript_chunks_to_transcript_store(faiss_kb):
+    assert faiss_kb.add_meetings(make_meeting(i) for i in range(5)) == 5
+
+    assert len(faiss_kb.vector_store) == 5
+    assert len(faiss_kb.bm25) == 5
+    assert len(faiss_kb.transcript_store) == 5
+    assert len(faiss_kb.transcript_bm25) == 5
+    hits = faiss_kb.search("项目 3 排期", k=5)
+    assert all("chunk_index" not in doc.metadata for doc in hits)
+
+
+def write_output(directory, count):
+    for i in range(count):
+        meeting = make_meeting(i)
+        (directory / f"meeting_{i}_summary.md").write_text(meeting["summary"], encoding="utf-8")
+        (directory / f"meeting_{i}_transcript.txt").write_text(meeting["transcript"], encoding="utf-8")
+
+
+def store_counts(kb):
+    return len(kb.vector_store), len(kb.bm25), len(kb.transcript_store), len(kb.transcript_bm25)
+
+
+def test_reindex_is_idempotent(faiss_kb, tmp_path):
+    from app.rag.reindex import iter_meetings
+
+    output = tmp_path / "output"
+    output.mkdir()
+    write_output(output, 3)
+
+    assert faiss_kb.add_meetings(iter_meetings(str(output))) == 3
+    assert store_counts(faiss_kb) == (3, 3, 3, 3)
+    version = faiss_kb.version
+
+    assert faiss_kb.add_meetings(iter_meetings(str(output))) == 0
+    assert store_counts(faiss_kb) == (3, 3, 3, 3)
+    assert faiss_kb.version == version
+
+
+def test_reindex_skips_meetings_ingested_by_pipeline(faiss_kb, tmp_path):
+    from app.rag.reindex import iter_meetings
+
+    meeting = make_meeting(0)
+    faiss_kb.add_meeting(meeting["summary"], meeting["transcript"], {"source": "meeting_0.wav", "source_type": "file"})
+    faiss_kb.add_meeting(meeting["summary"], meeting["transcript"], {"source": "meeting_0.wav", "source_type": "file"})
+    assert store_counts(faiss_kb) == (1, 1, 1, 1)
+
+    output = tmp_path / "output"
+    output.mkdir()
+    write_output(output, 2)
+    assert faiss_kb.add_meetings(iter_meetings(str(output))) == 1
+    assert store_counts(faiss_kb) == (2, 2, 2, 2)
+
+
+def test_reindex_is_idempotent_across_restarts(faiss_kb, tmp_path):
+    from app.rag.reindex import iter_meetings
+    from app.rag.vector_store import MeetingKnowledgeBase
+
+    output = tmp_path / "output"
+    output.mkdir()
+    write_output(output, 3)
+    faiss_kb.add_meetings(iter_meetings(str(output)))
+    faiss_kb.vector_store.compact()
+
+    reopened = MeetingKnowledgeBase(persist_dir=faiss_kb.persist_dir)
+    assert reopened.add_meetings(iter_meetings(str(output))) == 0
+    assert store_counts(reopened) == (3, 3, 3, 3)
+
+
+def test_bm25_is_rebuilt_from_existing_vector_store(faiss_kb):
+    import os
+    from app.rag.vector_store import MeetingKnowledgeBase
+
+    faiss_kb.add_meetings(make_meeting(i) for i in range(4))
+    # 模拟升级前的数据：只有向量库，没有 BM25 索引文件
+    os.remove(faiss_kb.bm25.path)
+    os.remove(faiss_kb.transcript_bm25.path)
+
+    reopened = MeetingKnowledgeBase(persist_dir=faiss_kb.persist_dir)
+    assert store_counts(reopened) == (4, 4, 4, 4)
+    assert os.path.exists(reopened.bm25.path)
+    hits = reopened.bm25.search("项目 2", k=1)
+    assert hits[0].metadata["doc_id"] == faiss_kb.bm25.search("项目 2", k=1)[0].metadata["doc_id"]
+
+
+def test_cached_retrieval_is_not_mutated_for_other_callers(faiss_kb):
+    faiss_kb.add_meetings(make_meeting(i) for i in range(3))
+
+    first = faiss_kb.retrieve("项目 1 排期", k=2)
+    second = faiss_kb.retrieve("项目 1 排期", k=2)
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.handle == first.handle
+    assert second.documents == first.documents
+    assert not faiss_kb.get_retrieval(first.handle).from_cache
+    assert first.report().startswith("检索耗时")
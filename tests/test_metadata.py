@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.rag.metadata import MetadataIndex, metadata_matches, normalize_metadata, parse_time_hint
+
+
+def make_metadatas(count):
+    rng = np.random.default_rng(0)
+    names = ["张三", "李四", "王五", "赵六"]
+    metadatas = []
+    for i in range(count):
+        participants = [name for name in names if rng.random() < 0.4]
+        metadatas.append(normalize_metadata({
+            "timestamp": 1700000000 + int(rng.integers(0, 90)) * 86400,
+            "source_type": ["file", "realtime"][i % 2],
+            "meeting_id": f"m{i % 25}",
+            "participants": participants,
+        }))
+    return metadatas
+
+
+FILTERS = [
+    {},
+    {"source_type": "file"},
+    {"source_type": ["file", "realtime"]},
+    {"meeting_id": "m3"},
+    {"meeting_id": ["m3", "m7", "missing"]},
+    {"participant": "李四"},
+    {"participant": "不存在"},
+    {"date_from": 1700000000 + 30 * 86400},
+    {"date_to": 1700000000 + 10 * 86400},
+    {"date_from": 1700000000 + 20 * 86400, "date_to": 1700000000 + 40 * 86400, "source_type": "realtime"},
+    {"meeting_id": "m4", "participant": "张三", "date_from": 1700000000 + 5 * 86400},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_select_matches_metadata_matches(filters):
+    metadatas = make_metadatas(300)
+    index = MetadataIndex()
+    # 分两次追加，覆盖缓存失效
+    index.add(metadatas[:120])
+    index.select(filters)
+    index.add(metadatas[120:])
+
+    expected = [i for i, metadata in enumerate(metadatas) if metadata_matches(metadata, filters)]
+    assert index.select(filters).tolist() == expected
+
+
+def test_parse_time_hint_ranges():
+    now = datetime(2024, 5, 15, 14, 30)
+    today = datetime(2024, 5, 15)
+    hint = parse_time_hint("昨天的会议讨论了什么", now)
+    assert hint == {"date_from": int(datetime(2024, 5, 14).timestamp()), "date_to": int(today.timestamp())}
+    assert parse_time_hint("项目进度如何", now) is None
+
+
+@pytest.mark.parametrize("query", ["今天开了什么会", "本周的会议", "本月的决议", "最近3天的待办"])
+def test_parse_time_hint_is_stable_within_a_day(query):
+    morning = parse_time_hint(query, datetime(2024, 5, 15, 9, 0, 1))
+    evening = parse_time_hint(query, datetime(2024, 5, 15, 21, 59, 58))
+    assert morning == evening
+    assert morning["date_to"] == int(datetime(2024, 5, 15, 23, 59, 59).timestamp())
+
+
+def test_answer_cache_scope_is_stable_for_time_hints():
+    from app.rag.answer_cache import SemanticAnswerCache
+
+    class FakeLLM:
+        model_name = "fake"
+
+    first = SemanticAnswerCache.make_scope(FakeLLM(), parse_time_hint("今天的会议", datetime(2024, 5, 15, 9, 0)))
+    second = SemanticAnswerCache.make_scope(FakeLLM(), parse_time_hint("今天的会议", datetime(2024, 5, 15, 9, 0, 7)))
+    assert first == second
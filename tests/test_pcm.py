@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from app.asr.pcm import TARGET_SAMPLE_RATE, prepare_audio, resample_linear, to_float32
+
+
+def test_mono_int16_and_bytes_are_scaled():
+    pcm = np.array([0, 16384, -32768], dtype=np.int16)
+    assert to_float32(pcm).tolist() == [0.0, 0.5, -1.0]
+    assert to_float32(pcm.tobytes()).tolist() == [0.0, 0.5, -1.0]
+
+
+def test_stereo_int16_is_scaled_then_downmixed():
+    stereo = np.array([[16384, 0], [-32768, -32768], [8192, -8192]], dtype=np.int16)
+    mono = to_float32(stereo)
+    assert mono.dtype == np.float32
+    assert mono.tolist() == [0.25, -1.0, 0.0]
+
+
+def test_float32_input_is_not_copied():
+    audio = np.linspace(-1, 1, 10, dtype=np.float32)
+    assert to_float32(audio) is audio
+    stereo = np.stack([audio, -audio], axis=1)
+    assert np.allclose(to_float32(stereo), 0.0)
+    assert to_float32(stereo[:, :1]).tolist() == pytest.approx(audio.tolist())
+
+
+def test_prepare_audio_resamples_to_target_rate():
+    audio = np.zeros((48000, 2), dtype=np.int16)
+    prepared = prepare_audio(audio, 48000)
+    assert prepared.dtype == np.float32
+    assert len(prepared) == TARGET_SAMPLE_RATE
+    assert resample_linear(prepared, TARGET_SAMPLE_RATE) is prepared
@@ -0,0 +1,24 @@
+import app.utils.config as config
+from app.asr.profiles import WHISPER_PROFILES, resolve_whisper_profile
+
+
+def test_default_profile_keeps_previous_accuracy_settings(monkeypatch):
+    monkeypatch.setattr(config, "WHISPER_PROFILE", "accurate")
+    monkeypatch.setattr(config, "WHISPER_COMPUTE_TYPE", "")
+    monkeypatch.setattr(config, "WHISPER_BEAM_SIZE", 0)
+    monkeypatch.setattr(config, "WHISPER_BEST_OF", 0)
+
+    profile = resolve_whisper_profile()
+    assert (profile["compute_type"], profile["beam_size"], profile["best_of"]) == ("float32", 5, 5)
+    assert resolve_whisper_profile("unknown")["name"] == "accurate"
+
+
+def test_explicit_overrides_win_over_profile(monkeypatch):
+    monkeypatch.setattr(config, "WHISPER_COMPUTE_TYPE", "int8")
+    monkeypatch.setattr(config, "WHISPER_BEAM_SIZE", 2)
+    monkeypatch.setattr(config, "WHISPER_BEST_OF", 0)
+
+    profile = resolve_whisper_profile("balanced")
+    assert profile["compute_type"] == "int8"
+    assert profile["beam_size"] == 2
+    assert profile["best_of"] == WHISPER_PROFILES["balanced"]["best_of"]
@@ -0,0 +1,101 @@
+import random
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+SR = 16000
+
+
+class FakeTranscriber:
+    """
+    按语音段内容返回文本；每批随机耗时，使多个工作线程的结果乱序到达。
+    """
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def transcribe_batch(self, audios, sample_rate=SR, verbose=False):
+        with self._lock:
+            self.batches.append(len(audios))
+        time.sleep(random.uniform(0, 0.02))
+        return [f" 第{int(audio[0])}段 " if audio[0] >= 0 else "" for audio in audios]
+
+
+@pytest.fixture
+def assistant(monkeypatch):
+    fake_vad = types.ModuleType("webrtcvad")
+    fake_vad.Vad = lambda mode: None
+    monkeypatch.setitem(sys.modules, "webrtcvad", fake_vad)
+    from app.audio.recorder import RealtimeAssistant
+
+    assistant = RealtimeAssistant(FakeTranscriber(), None, None)
+    assistant.interim_enabled = False
+    assistant.debug_sink = None
+    assistant.trim_silence = False
+    return assistant
+
+
+def segment(value, seconds=0.5):
+    return np.full(int(seconds * SR), value, dtype=np.int16)
+
+
+def test_results_committed_in_segment_order(assistant):
+    events = []
+    assistant.add_listener(events.append)
+
+    assistant._commit_result(2, "第三句", {"lag": 0.1, "audio_seconds": 1.0, "asr_seconds": 0.1})
+    assert assistant.full_transcript == []
+    assistant._commit_result(1, "", {"lag": 0.1, "audio_seconds": 1.0, "asr_seconds": 0.1})
+    assert assistant.full_transcript == []
+    assistant._commit_result(0, "第一句", {"lag": 0.1, "audio_seconds": 1.0, "asr_seconds": 0.1})
+
+    # 空结果占位但不写入逐字稿
+    assert assistant.full_transcript == ["第一句", "第三句"]
+    assert [(event["seq"], event["text"], event["final"]) for event in events] == \
+        [(0, "第一句", True), (1, "", True), (2, "第三句", True)]
+    assert assistant._pending_results == {}
+
+
+def test_worker_pool_drains_queue_in_order(assistant):
+    assistant.asr_workers = 3
+    assistant.batch_max_segments = 2
+    assistant._start_workers()
+    for i in range(20):
+        assistant._submit_speech(segment(-1 if i == 7 else i))
+    assistant._stop_workers()
+
+    expected = [f"第{i}段" for i in range(20) if i != 7]
+    assert assistant.full_transcript == expected
+    assert all(size <= 2 for size in assistant.transcriber.batches)
+    assert sum(assistant.transcriber.batches) == 20
+
+    metrics = assistant.get_metrics()
+    assert metrics["submitted"] == 20
+    assert metrics["completed"] == 20
+    assert metrics["queue_depth"] == 0
+    assert sorted(m["seq"] for m in metrics["segments"]) == list(range(20))
+    assert all(m["audio_seconds"] == 0.5 for m in metrics["segments"])
+    assert metrics["max_lag"] >= metrics["avg_lag"] > 0
+
+
+def test_empty_segment_is_not_queued(assistant):
+    assistant._submit_speech(np.zeros(0, dtype=np.int16))
+    assert assistant.get_metrics()["submitted"] == 0
+    assert assistant.segment_queue.qsize() == 0
+
+
+def test_metrics_aggregate_lag_and_rtf(assistant):
+    assert assistant.get_metrics()["completed"] == 0
+    assistant._commit_result(0, "a", {"lag": 0.2, "audio_seconds": 2.0, "asr_seconds": 0.5})
+    assistant._commit_result(1, "b", {"lag": 0.6, "audio_seconds": 3.0, "asr_seconds": 0.5})
+
+    metrics = assistant.get_metrics()
+    assert metrics["completed"] == 2
+    assert metrics["avg_lag"] == pytest.approx(0.4)
+    assert metrics["max_lag"] == pytest.approx(0.6)
+    assert metrics["rtf"] == pytest.approx(0.2)
+    assert metrics["capture"] is None
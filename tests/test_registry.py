@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+import app.asr.registry as registry_module
+from app.asr.registry import ModelRegistry
+
+
+class FakeLoader:
+    def __init__(self, delay=0.0):
+        self.loads = []
+        self.fail = set()
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, key):
+        time.sleep(self.delay)
+        with self._lock:
+            self.loads.append(key[1])
+        if key[1] in self.fail:
+            raise RuntimeError(f"加载失败: {key[1]}")
+        return object()
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    loader = FakeLoader()
+    monkeypatch.setattr(registry_module, "_load_transcriber", loader)
+    return loader
+
+
+def acquire(registry, model):
+    return registry.acquire("whisper", model, "int8", "cpu")
+
+
+def loaded(registry):
+    return {entry["key"][1]: entry["refs"] for entry in registry.stats() if entry["loaded"]}
+
+
+def test_shared_instance_and_reference_counting(loader):
+    registry = ModelRegistry(max_models=2)
+    first = acquire(registry, "base")
+    second = acquire(registry, "base")
+
+    assert first is second
+    assert loader.loads == ["base"]
+    assert loaded(registry) == {"base": 2}
+    registry.release(first)
+    assert loaded(registry) == {"base": 1}
+    registry.release(second)
+    registry.release(second)
+    assert loaded(registry) == {"base": 0}
+
+
+def test_lru_eviction_over_limit(loader):
+    registry = ModelRegistry(max_models=2)
+    for model in ("tiny", "base"):
+        registry.release(acquire(registry, model))
+    # 再次使用 tiny，base 成为最久未使用
+    registry.release(acquire(registry, "tiny"))
+    registry.release(acquire(registry, "small"))
+
+    assert loaded(registry) == {"tiny": 0, "small": 0}
+    registry.release(acquire(registry, "base"))
+    assert loader.loads == ["tiny", "base", "small", "base"]
+
+
+def test_models_in_use_are_not_evicted(loader):
+    registry = ModelRegistry(max_models=1)
+    held = acquire(registry, "tiny")
+    with registry.use("whisper", "base", "int8", "cpu"):
+        assert loaded(registry) == {"tiny": 1, "base": 1}
+    # base 归还后超出上限，但 tiny 仍被引用，淘汰 base
+    assert loaded(registry) == {"tiny": 1}
+    registry.release(held)
+    assert loaded(registry) == {"tiny": 0}
+
+
+def test_failed_load_releases_slot_and_reraises(loader):
+    registry = ModelRegistry(max_models=2)
+    loader.fail.add("large")
+    with pytest.raises(RuntimeError, match="加载失败"):
+        acquire(registry, "large")
+    assert registry.stats() == []
+
+    loader.fail.clear()
+    transcriber = acquire(registry, "large")
+    assert loaded(registry) == {"large": 1}
+    assert loader.loads == ["large", "large"]
+    registry.release(transcriber)
+
+
+def test_concurrent_acquire_loads_once(monkeypatch):
+    loader = FakeLoader(delay=0.05)
+    monkeypatch.setattr(registry_module, "_load_transcriber", loader)
+    registry = ModelRegistry(max_models=2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(acquire(registry, "base"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.loads == ["base"]
+    assert len({id(result) for result in results}) == 1
+    assert loaded(registry) == {"base": 8}
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from app.audio.resampler import FrameAssembler, StreamingResampler, to_int16
+
+
+def test_frame_assembler_pending_tail_survives_source_overwrite():
+    assembler = FrameAssembler(4)
+    source = np.arange(6, dtype=np.int16)
+
+    frames = assembler.push(source)
+    assert [frame.tolist() for frame in frames] == [[0, 1, 2, 3]]
+
+    # 模拟环形缓冲区被生产者覆盖
+    source[:] = -1
+    frames = assembler.push(np.array([6, 7], dtype=np.int16))
+    assert [frame.tolist() for frame in frames] == [[4, 5, 6, 7]]
+
+
+@pytest.mark.parametrize("src_rate", [8000, 22050, 44100, 48000])
+def test_blockwise_output_matches_one_shot(src_rate):
+    rng = np.random.default_rng(1)
+    audio = (rng.standard_normal(src_rate * 2) * 3000).astype(np.int16)
+
+    one_shot = StreamingResampler(src_rate).process(audio)
+    resampler = StreamingResampler(src_rate)
+    sizes = rng.integers(1, src_rate // 20, size=200)
+    blocks, position = [], 0
+    for size in sizes:
+        blocks.append(resampler.process(audio[position:position + size]))
+        position += size
+    blocks.append(resampler.process(audio[position:]))
+
+    assert np.allclose(np.concatenate(blocks), one_shot, atol=1e-5)
+    assert abs(len(one_shot) - len(audio) * 16000 / src_rate) <= 1
+
+
+def test_resampler_preserves_in_band_tone():
+    src_rate = 48000
+    t = np.arange(src_rate) / src_rate
+    out = StreamingResampler(src_rate).process((0.5 * np.sin(2 * np.pi * 1000 * t)).astype(np.float32))
+    spectrum = np.abs(np.fft.rfft(out[1000:15000]))
+    peak = np.fft.rfftfreq(14000, 1 / 16000)[np.argmax(spectrum)]
+    assert peak == pytest.approx(1000, abs=5)
+    assert np.max(np.abs(out[1000:15000])) == pytest.approx(0.5, abs=0.05)
+
+
+def test_bypass_and_int16_conversion():
+    resampler = StreamingResampler(16000)
+    block = np.array([0, 16384, -32768], dtype=np.int16)
+    assert resampler.bypass
+    assert resampler.process(block).tolist() == [0.0, 0.5, -1.0]
+    assert to_int16(np.array([0.0, 0.5, -1.0, 2.0], dtype=np.float32)).tolist() == [0, 16384, -32768, 32767]
@@ -0,0 +1,92 @@
+import threading
+
+import numpy as np
+
+from app.audio.ring_buffer import RingBuffer, SegmentBuilder, SegmentPool
+
+
+def read_all(ring):
+    views = ring.peek()
+    data = np.concatenate(views) if views else np.zeros(0, dtype=np.int16)
+    ring.consume(len(data))
+    return data
+
+
+def test_ring_buffer_wraparound_returns_two_views_in_order():
+    ring = RingBuffer(8)
+    ring.write(np.arange(6, dtype=np.int16))
+    ring.consume(4)
+    assert ring.write(np.arange(6, 12, dtype=np.int16)) == 6
+
+    views = ring.peek()
+    assert len(views) == 2
+    assert np.concatenate(views).tolist() == list(range(4, 12))
+    # peek 返回视图，不复制
+    assert all(view.base is ring._buffer for view in views)
+    assert ring.peek(3)[0].tolist() == [4, 5, 6]
+
+
+def test_ring_buffer_drops_when_full_and_counts():
+    ring = RingBuffer(5)
+    assert ring.write(np.arange(4, dtype=np.int16)) == 4
+    assert ring.write(np.arange(4, 8, dtype=np.int16)) == 1
+    assert read_all(ring).tolist() == [0, 1, 2, 3, 4]
+
+    stats = ring.stats()
+    assert stats["dropped"] == 3
+    assert stats["overflows"] == 1
+    assert stats["peak_fill_ratio"] == 1.0
+    assert stats["fill"] == 0
+
+
+def test_ring_buffer_spsc_preserves_stream():
+    ring = RingBuffer(64)
+    source = np.arange(20000, dtype=np.int16)
+    received = []
+
+    def produce():
+        position = 0
+        while position < len(source):
+            position += ring.write(source[position:position + 37])
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while sum(len(chunk) for chunk in received) < len(source):
+        received.append(read_all(ring).copy())
+    producer.join()
+    assert np.concatenate(received).tolist() == source.tolist()
+
+
+def test_segment_builder_preroll_order_and_finish():
+    pool = SegmentPool(2, max_samples=12)
+    builder = SegmentBuilder(pool, frame_size=2, preroll_frames=3)
+    for value in range(5):
+        builder.add_preroll(np.full(2, value, dtype=np.int16))
+
+    builder.start()
+    assert builder.frames == 3
+    assert builder.append(np.full(2, 9, dtype=np.int16))
+    audio, buffer = builder.finish()
+
+    assert audio.tolist() == [2, 2, 3, 3, 4, 4, 9, 9]
+    assert audio.base is buffer
+    assert not builder.active
+    pool.release(buffer)
+    assert pool.stats() == {"size": 2, "free": 2, "misses": 0}
+
+
+def test_segment_builder_reports_full_buffer_and_pool_misses():
+    pool = SegmentPool(1, max_samples=4)
+    builder = SegmentBuilder(pool, frame_size=2, preroll_frames=2)
+    builder.start(with_preroll=False)
+    assert builder.append(np.ones(2, dtype=np.int16))
+    assert builder.append(np.ones(2, dtype=np.int16))
+    assert not builder.append(np.ones(2, dtype=np.int16))
+    _, first = builder.finish()
+
+    # 池已空：临时分配并计数
+    builder.start(with_preroll=False)
+    builder.discard()
+    assert pool.stats()["misses"] == 1
+    pool.release(first)
+    assert pool.stats()["free"] == 1
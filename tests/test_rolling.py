@@ -0,0 +1,123 @@
+import json
+import threading
+from types import SimpleNamespace
+
+from app.llm.rolling import RollingSummarizer
+
+
+class FakeLLM:
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.entered = threading.Event()
+        self.fail = False
+        self.prompts = []
+
+    def batch(self, prompts, config=None):
+        self.entered.set()
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("LLM 不可用")
+        self.prompts.extend(prompts)
+        return [SimpleNamespace(content=f"要点({len(prompt)})") for prompt in prompts]
+
+    def invoke(self, prompt):
+        return SimpleNamespace(content="压缩要点")
+
+    def stream(self, prompt):
+        yield SimpleNamespace(content=prompt)
+
+
+class FakeSummarizer:
+    chunk_tokens = 1000
+    chunk_overlap = 0
+    max_concurrency = 1
+    map_prompt = SimpleNamespace(format=lambda text, index, total: f"MAP{index}:{text}")
+    reduce_prompt = SimpleNamespace(format=lambda text: f"REDUCE:{text}")
+
+    def __init__(self):
+        self.llm = FakeLLM()
+
+    @staticmethod
+    def _join_partials(partials):
+        return "\n\n".join(partials)
+
+    def reduce_prompt_for(self, partials):
+        return self.reduce_prompt.format(text=self._join_partials(partials))
+
+    def summarize_stream(self, text):
+        yield f"SUMMARY:{text}"
+
+
+def read_checkpoint(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_rolling(tmp_path, summarizer=None):
+    return RollingSummarizer(summarizer or FakeSummarizer(), str(tmp_path / "summary.ckpt.json"),
+                             interval_minutes=1000, max_tokens=20)
+
+
+def test_checkpoint_during_fold_keeps_text_being_folded(tmp_path):
+    summarizer = FakeSummarizer()
+    summarizer.llm.release.clear()
+    rolling = make_rolling(tmp_path, summarizer)
+
+    rolling.feed("甲" * 25)
+    assert summarizer.llm.entered.wait(5)
+    rolling.feed("第二段。")
+
+    state = read_checkpoint(rolling.checkpoint_path)
+    assert state["folding"] == "甲" * 25
+    assert state["pending"] == "第二段。"
+    # 折叠进行中崩溃：恢复后两部分文本都在
+    restored = RollingSummarizer.load(FakeSummarizer(), rolling.checkpoint_path)
+    assert restored.pending == ["甲" * 25, "第二段。"]
+    assert restored.partials == []
+
+    summarizer.llm.release.set()
+    rolling.wait()
+    state = read_checkpoint(rolling.checkpoint_path)
+    assert state["partials"] == ["要点(30)"]
+    assert state["folding"] == ""
+    assert state["pending"] == "第二段。"
+    assert rolling.folds == 1
+
+
+def test_failed_fold_restores_pending(tmp_path):
+    summarizer = FakeSummarizer()
+    summarizer.llm.fail = True
+    rolling = make_rolling(tmp_path, summarizer)
+
+    rolling.feed("乙" * 25)
+    rolling.wait()
+    assert rolling.pending == ["乙" * 25]
+    assert rolling.folding == []
+    assert rolling.partials == []
+
+    summarizer.llm.fail = False
+    rolling.feed("丙" * 5)
+    rolling.wait()
+    assert rolling.partials == ["要点(36)"]
+    assert summarizer.llm.prompts == ["MAP1:" + "乙" * 25 + "\n" + "丙" * 5]
+    assert rolling.pending == []
+
+
+def test_resume_from_checkpoint_and_summarize(tmp_path):
+    rolling = make_rolling(tmp_path)
+    rolling.feed("丁" * 25)
+    rolling.wait()
+    rolling.feed("结尾。")
+
+    restored = RollingSummarizer.load(FakeSummarizer(), rolling.checkpoint_path)
+    assert restored.partials == ["要点(30)"]
+    assert restored.folds == 1
+    summary = "".join(restored.summarize_stream())
+    assert summary == "REDUCE:要点(30)\n\n要点(8)"
+
+
+def test_short_meeting_uses_plain_summary(tmp_path):
+    rolling = make_rolling(tmp_path)
+    rolling.feed("短会。")
+    assert "".join(rolling.summarize_stream()) == "SUMMARY:短会。"
@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+
+import app.asr.stream as stream
+from app.asr.stream import stream_transcribe, transcribe_window
+from app.asr.transcript import make_segment, read_segments
+from app.audio.vad import VADSegmenter
+
+SR = 16000
+
+
+def tone(seconds, amplitude=0.2):
+    return (amplitude * np.sin(np.arange(int(seconds * SR)) / 3)).astype(np.float32)
+
+
+def speech_window():
+    """
+    20 秒窗口：2-5s 与 10-12s 有语音，其余为静音。
+    """
+    audio = np.zeros(20 * SR, dtype=np.float32)
+    audio[2 * SR:5 * SR] = tone(3)
+    audio[10 * SR:12 * SR] = tone(2, 0.1)
+    return audio
+
+
+class FakeTranscriber:
+    def __init__(self):
+        self.batches = []
+        self.segment_calls = []
+
+    def transcribe_batch(self, segments, sample_rate=SR, verbose=False):
+        self.batches.append([len(segment) for segment in segments])
+        return [f" 第{i}段 " for i in range(len(segments))]
+
+    def transcribe_segments(self, audio, verbose=False, word_timestamps=None):
+        self.segment_calls.append((len(audio), word_timestamps))
+        duration = len(audio) / SR
+        return [make_segment(0.5, duration - 0.5, f"len{len(audio)}")]
+
+
+def segmenter():
+    return VADSegmenter(SR, margin_db=10, floor_db=-50, min_speech_ms=250, min_silence_ms=500,
+                        padding_ms=200, max_segment_seconds=30)
+
+
+def test_window_spans_go_through_one_batch_call():
+    transcriber = FakeTranscriber()
+    audio = speech_window()
+    spans = segmenter().segment(audio)
+
+    segments = transcribe_window(transcriber, audio, segmenter(), word_timestamps=False)
+
+    assert len(spans) == 2
+    assert transcriber.batches == [[end - start for start, end in spans]]
+    assert [segment["text"] for segment in segments] == ["第0段", "第1段"]
+    for segment, (start, end) in zip(segments, spans):
+        assert segment["start"] == pytest.approx(start / SR, abs=0.01)
+        assert segment["end"] == pytest.approx(end / SR, abs=0.01)
+    assert segments[0]["start"] == pytest.approx(2 - 0.2, abs=0.05)
+    assert segments[1]["end"] == pytest.approx(12 + 0.2, abs=0.05)
+
+
+def test_window_with_word_timestamps_shifts_per_span_segments():
+    transcriber = FakeTranscriber()
+    audio = speech_window()
+    spans = segmenter().segment(audio)
+
+    segments = transcribe_window(transcriber, audio, segmenter(), word_timestamps=True)
+
+    assert transcriber.batches == []
+    assert [call[0] for call in transcriber.segment_calls] == [end - start for start, end in spans]
+    for segment, (start, _) in zip(segments, spans):
+        assert segment["start"] == pytest.approx(start / SR + 0.5, abs=0.01)
+
+
+def test_silent_window_never_reaches_asr():
+    transcriber = FakeTranscriber()
+    assert transcribe_window(transcriber, np.zeros(10 * SR, dtype=np.float32), segmenter(), False) == []
+    assert transcriber.batches == []
+
+
+def test_stream_transcribe_offsets_segments_by_window_start(tmp_path, monkeypatch):
+    audio_path = tmp_path / "meeting.wav"
+    audio_path.write_bytes(b"fake audio")
+    transcript_path = str(tmp_path / "meeting_transcript.txt")
+    windows = [(0.0, speech_window()), (20.0, speech_window())]
+    monkeypatch.setattr(stream, "iter_audio_windows", lambda path, window_seconds, start: iter(windows))
+
+    segments = list(stream_transcribe(FakeTranscriber(), str(audio_path), transcript_path,
+                                      verbose=False, word_timestamps=False, pre_vad=True))
+
+    assert [segment["start"] for segment in segments] == pytest.approx([1.8, 9.8, 21.8, 29.8], abs=0.05)
+    with open(transcript_path, encoding="utf-8") as f:
+        assert f.read().splitlines() == ["第0段", "第1段", "第0段", "第1段"]
+    assert [segment["start"] for segment in read_segments(stream.sidecar_path(transcript_path))] == \
+        [segment["start"] for segment in segments]
+
+
+def test_checkpoint_round_trip_and_identity(tmp_path):
+    audio_path = tmp_path / "meeting.wav"
+    audio_path.write_bytes(b"fake audio")
+    path = str(tmp_path / "meeting_transcript.txt.ckpt")
+
+    checkpoint = stream.TranscriptionCheckpoint(path, str(audio_path), ("whisper", "small"))
+    assert not checkpoint.load()
+    checkpoint.save(40.0, 120, 480)
+
+    restored = stream.TranscriptionCheckpoint(path, str(audio_path), ("whisper", "small"))
+    assert restored.load()
+    assert (restored.offset, restored.transcript_bytes, restored.segments_bytes) == (40.0, 120, 480)
+    # 模型或音频文件变化后不续跑
+    assert not stream.TranscriptionCheckpoint(path, str(audio_path), ("whisper", "large")).load()
+    audio_path.write_bytes(b"another recording")
+    assert not stream.TranscriptionCheckpoint(path, str(audio_path), ("whisper", "small")).load()
+
+    checkpoint.clear()
+    assert not (tmp_path / "meeting_transcript.txt.ckpt").exists()
+
+
+def test_stream_transcribe_resumes_from_checkpoint(tmp_path, monkeypatch):
+    audio_path = tmp_path / "meeting.wav"
+    audio_path.write_bytes(b"fake audio")
+    transcript_path = str(tmp_path / "meeting_transcript.txt")
+    windows = [(0.0, speech_window()), (20.0, speech_window()), (40.0, speech_window())]
+    requested = []
+
+    def crash_after_first_window(path, window_seconds, start):
+        requested.append(start)
+        yield windows[0]
+        raise KeyboardInterrupt
+
+    def remaining_windows(path, window_seconds, start):
+        requested.append(start)
+        return iter(window for window in windows if window[0] >= start)
+
+    monkeypatch.setattr(stream, "iter_audio_windows", crash_after_first_window)
+    with pytest.raises(KeyboardInterrupt):
+        for _ in stream_transcribe(FakeTranscriber(), str(audio_path), transcript_path, model_key=("fake",),
+                                   verbose=False, word_timestamps=False, pre_vad=True):
+            pass
+    # 模拟断点之后写了一半的内容
+    with open(transcript_path, "a", encoding="utf-8") as f:
+        f.write("写了一半")
+    with open(stream.sidecar_path(transcript_path), "a", encoding="utf-8") as f:
+        f.write('{"start": 21.')
+
+    monkeypatch.setattr(stream, "iter_audio_windows", remaining_windows)
+    resumed = list(stream_transcribe(FakeTranscriber(), str(audio_path), transcript_path, model_key=("fake",),
+                                     verbose=False, word_timestamps=False, pre_vad=True))
+
+    assert requested == [0.0, 20.0]
+    assert [segment["start"] for segment in resumed] == pytest.approx([21.8, 29.8, 41.8, 49.8], abs=0.05)
+    with open(transcript_path, encoding="utf-8") as f:
+        assert f.read().splitlines() == ["第0段", "第1段"] * 3
+    assert [segment["start"] for segment in read_segments(stream.sidecar_path(transcript_path))] == \
+        pytest.approx([1.8, 9.8, 21.8, 29.8, 41.8, 49.8], abs=0.05)
+    assert not (tmp_path / "meeting_transcript.txt.ckpt").exists()
@@ -0,0 +1,37 @@
+from app.llm.text_splitter import estimate_tokens, hard_split, split_by_tokens, split_sentences
+
+TEXT = "".join(f"第{i}项议题已经讨论完毕。" for i in range(40))
+
+
+def test_estimate_tokens_mixed_text():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("会议纪要") == 4
+    assert estimate_tokens("release v2.1") == 3
+    assert estimate_tokens("项目 alpha") == 2 + 2
+
+
+def test_split_sentences_keeps_punctuation():
+    assert split_sentences("大家好。今天开会！\n议题一？ ok; ") == ["大家好。", "今天开会！", "议题一？", "ok;"]
+
+
+def test_hard_split_respects_budget():
+    pieces = hard_split("没有标点的超长识别结果" * 10, 16)
+    assert "".join(pieces) == "没有标点的超长识别结果" * 10
+    assert all(estimate_tokens(piece) <= 16 for piece in pieces)
+
+
+def test_split_by_tokens_bounds_and_overlap():
+    chunks = split_by_tokens(TEXT, max_tokens=50, overlap_tokens=12)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = split_sentences(previous)[-1]
+        assert current.startswith(last_sentence)
+    # 去掉重叠后拼接回原文
+    assert set(split_sentences(TEXT)) == {s for chunk in chunks for s in split_sentences(chunk)}
+
+
+def test_split_by_tokens_without_overlap_reassembles_text():
+    chunks = split_by_tokens(TEXT, max_tokens=50)
+    assert "".join(chunks) == TEXT
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from app.audio.vad import VADSegmenter, frame_energy_db
+
+SR = 16000
+
+
+def segmenter(**kwargs):
+    options = dict(margin_db=10, floor_db=-50, min_speech_ms=250, min_silence_ms=500,
+                   padding_ms=200, max_segment_seconds=30)
+    options.update(kwargs)
+    return VADSegmenter(SR, **options)
+
+
+def with_tones(seconds, spans, amplitude=0.2, noise=0.001):
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(seconds * SR) * noise).astype(np.float32)
+    for start, end in spans:
+        i, j = int(start * SR), int(end * SR)
+        audio[i:j] += amplitude * np.sin(np.arange(j - i) / 3)
+    return audio
+
+
+def as_seconds(spans):
+    return [(round(start / SR, 2), round(end / SR, 2)) for start, end in spans]
+
+
+def test_frame_energy_matches_for_int16_and_float32():
+    audio = with_tones(1, [(0, 1)])
+    frames = audio[:480 * 10].reshape(10, 480)
+    int_frames = (frames * 32767).astype(np.int16)
+    assert np.allclose(frame_energy_db(frames), frame_energy_db(int_frames), atol=0.1)
+
+
+def test_segments_merge_short_gaps_pad_and_drop_blips():
+    audio = with_tones(40, [(5, 9), (9.3, 12), (20, 25), (30, 30.1)])
+    spans = as_seconds(segmenter().segment(audio))
+
+    # 5-9 与 9.3-12 之间 300ms 停顿被合并；30s 处 100ms 的短脉冲被丢弃；两端各补 200ms
+    assert len(spans) == 2
+    assert spans[0] == pytest.approx((4.8, 12.2), abs=0.05)
+    assert spans[1] == pytest.approx((19.8, 25.2), abs=0.05)
+
+
+def test_long_speech_is_split_under_max_segment():
+    audio = with_tones(70, [(1, 66)])
+    spans = segmenter(max_segment_seconds=20).segment(audio)
+
+    assert len(spans) == 4
+    assert all(end - start <= 20 * SR for start, end in spans)
+    # 切分后的各段首尾相接，不丢样本
+    assert all(spans[i][1] == spans[i + 1][0] for i in range(len(spans) - 1))
+
+
+def test_continuous_speech_is_not_rejected_by_raised_noise_floor():
+    audio = with_tones(10, [(0, 10)], noise=0.0)
+    audio *= (1 + 0.5 * np.sin(np.arange(len(audio)) / 5000)).astype(np.float32)
+    assert segmenter().segment(audio) == [(0, len(audio))]
+
+
+def test_silence_and_empty_input():
+    assert segmenter().segment(np.zeros(5 * SR, dtype=np.float32)) == []
+    assert segmenter().segment(np.zeros(0, dtype=np.float32)) == []
+    assert len(segmenter().trim(np.zeros(SR, dtype=np.int16))) == 0
+
+
+def test_trim_returns_view_without_edge_silence():
+    audio = (with_tones(6, [(2, 4)]) * 32767).astype(np.int16)
+    trimmed = segmenter().trim(audio)
+    assert trimmed.base is audio
+    assert len(trimmed) / SR == pytest.approx(2.4, abs=0.1)
+
+
+def test_silent_frames_gate():
+    vad = segmenter()
+    frames = np.stack([np.zeros(480, dtype=np.int16), (np.ones(480) * 3000).astype(np.int16)])
+    assert vad.silent_frames(frames).tolist() == [True, False]
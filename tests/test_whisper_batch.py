@@ -0,0 +1,88 @@
+import importlib
+import sys
+import types
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+SR = 16000
+
+
+class FakeBatchedPipeline:
+    """
+    模拟 faster-whisper 的 BatchedInferencePipeline：按样本下标切片 clip，
+    返回以秒为单位、拼接音频上绝对时间的分段。
+    """
+    def __init__(self, model=None):
+        self.calls = []
+
+    def transcribe(self, audio, clip_timestamps=None, **kwargs):
+        self.calls.append(clip_timestamps)
+        segments = []
+        for index, clip in enumerate(clip_timestamps):
+            piece = audio[clip["start"]:clip["end"]]
+            start = clip["start"] / SR
+            end = clip["end"] / SR
+            # 每个 clip 输出两个分段，第二个从 clip 中点开始
+            middle = (start + end) / 2
+            segments.append(SimpleNamespace(start=start, end=middle, text=f"c{index}a{len(piece)}"))
+            segments.append(SimpleNamespace(start=middle, end=end, text=f"c{index}b"))
+        return iter(segments), None
+
+
+class FakeWhisperModel:
+    def __init__(self, model_size, **kwargs):
+        self.model_size = model_size
+
+
+@pytest.fixture
+def whisper_client(monkeypatch):
+    fake = types.ModuleType("faster_whisper")
+    fake.WhisperModel = FakeWhisperModel
+    fake.BatchedInferencePipeline = FakeBatchedPipeline
+    monkeypatch.setitem(sys.modules, "faster_whisper", fake)
+    monkeypatch.delitem(sys.modules, "app.asr.whisper_client", raising=False)
+    module = importlib.import_module("app.asr.whisper_client")
+    yield module
+    sys.modules.pop("app.asr.whisper_client", None)
+
+
+def make_transcriber(module):
+    transcriber = module.AudioTranscriber.__new__(module.AudioTranscriber)
+    transcriber.batched = FakeBatchedPipeline()
+    transcriber.batch_size = 8
+    transcriber.profile = {"beam_size": 1, "best_of": 1}
+    transcriber._transcribe = lambda audio, verbose: f"long{len(audio)}"
+    return transcriber
+
+
+def test_batch_uses_integer_sample_clips(whisper_client):
+    transcriber = make_transcriber(whisper_client)
+    audios = [np.zeros(n, dtype=np.float32) for n in (8000, 16000, 4000)]
+
+    texts = transcriber._transcribe_batch(audios)
+
+    clips = transcriber.batched.calls[0]
+    assert clips == [{"start": 0, "end": 8000}, {"start": 8000, "end": 24000}, {"start": 24000, "end": 28000}]
+    assert all(isinstance(clip["start"], int) and isinstance(clip["end"], int) for clip in clips)
+    assert texts == ["c0a8000c0b", "c1a16000c1b", "c2a4000c2b"]
+
+
+def test_batch_transcribes_long_segments_separately(whisper_client):
+    transcriber = make_transcriber(whisper_client)
+    long_audio = np.zeros((whisper_client.MAX_CLIP_SECONDS + 1) * SR, dtype=np.float32)
+    audios = [np.zeros(4000, dtype=np.float32), long_audio, np.zeros(2000, dtype=np.float32)]
+
+    texts = transcriber._transcribe_batch(audios)
+
+    assert transcriber.batched.calls[0] == [{"start": 0, "end": 4000}, {"start": 4000, "end": 6000}]
+    assert texts == ["c0a4000c0b", f"long{len(long_audio)}", "c1a2000c1b"]
+
+
+def test_batched_pipeline_is_opt_in(whisper_client, monkeypatch):
+    import app.utils.config as config
+
+    monkeypatch.setattr(config, "ASR_BATCH_SIZE", 1)
+    assert whisper_client.AudioTranscriber().batched is None
+    assert isinstance(whisper_client.AudioTranscriber(batch_size=4).batched, FakeBatchedPipeline)
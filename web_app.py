@@ -4,10 +4,11 @@ import sys
 from app.rag.vector_store import MeetingKnowledgeBase
 from app.llm.summarizer import MeetingSummarizer
 import app.utils.config as config
-if config.ASR_PROVIDER == "funasr":
-    from app.asr.funasr_client import AudioTranscriber
-else:
-    from app.asr.whisper_client import AudioTranscriber
+from app.asr.registry import registry, model_key
+from app.utils.cache import cached_summarize_stream, cached_transcribe
+from app.llm.streaming import TimedStream
+from app.rag.metadata import parse_time_hint
+from app.rag.retrieval import RetrievalResult
 
 # 设置页面配置
 st.set_page_config(page_title="DeepMeeting 智能会议助手", page_icon="🎙️", layout="wide")
@@ -42,19 +43,42 @@ def get_knowledge_base():
                 兼容搜索接口，返回空结果。
                 """
                 return []
+            def retrieve(self, query, *args, **kwargs):
+                """
+                兼容检索接口，返回空结果。
+                """
+                return RetrievalResult(query, None, [], [], {})
             def query_with_llm(self, *args, **kwargs):
                 """
                 兼容 RAG 查询接口，返回提示信息。
                 """
                 return "知识库初始化失败，无法回答。"
+            def query_with_llm_stream(self, *args, **kwargs):
+                """
+                兼容流式 RAG 查询接口，返回提示信息。
+                """
+                yield "知识库初始化失败，无法回答。"
         return EmptyKB()
 
 @st.cache_resource
 def get_summarizer():
     return MeetingSummarizer(provider=config.LLM_PROVIDER)
 
+@st.cache_resource
+def warmup_asr():
+    """
+    进程启动时在后台预热 ASR 模型，模型由进程级注册表在各会话间共享。
+    """
+    if not config.ASR_WARMUP:
+        return None
+    import threading
+    thread = threading.Thread(target=registry.warmup, name="asr-warmup", daemon=True)
+    thread.start()
+    return thread
+
 kb = get_knowledge_base()
 summarizer = get_summarizer()
+warmup_asr()
 
 import time
 from streamlit_mic_recorder import mic_recorder
@@ -66,6 +90,19 @@ from app.utils.notifier import EmailNotifier
 st.sidebar.header("功能导航")
 page = st.sidebar.radio("选择功能", ["🎙️ 在线会议室", "智能问答 (RAG)", "会议记录归档", "上传新会议"])
 
+embedding_stats = kb.embedding_stats() if hasattr(kb, "embedding_stats") else None
+if embedding_stats:
+    st.sidebar.caption(
+        f"向量缓存命中率 {embedding_stats['hit_rate']:.0%} "
+        f"(内存 {embedding_stats['memory_hits']} / 磁盘 {embedding_stats['disk_hits']} / 未命中 {embedding_stats['misses']})"
+    )
+answer_stats = kb.answer_cache_stats() if hasattr(kb, "answer_cache_stats") else None
+if answer_stats:
+    st.sidebar.caption(
+        f"问答缓存 {answer_stats['entries']} 条，命中率 {answer_stats['hit_rate']:.0%} "
+        f"(命中 {answer_stats['hits']} / 未命中 {answer_stats['misses']})"
+    )
+
 if page == "🎙️ 在线会议室":
     st.header("🎙️ 实时智能会议室 (Web版)")
     st.info("点击下方按钮开始录音，录音结束后自动生成纪要。此模式支持手机/电脑浏览器。")
@@ -96,9 +133,8 @@ if page == "🎙️ 在线会议室":
                 st.info(f"音频已保存: {temp_wav}")
                 
                 # 3. 语音转文字 (ASR)
-                transcriber = AudioTranscriber(model_size=config.WHISPER_MODEL_SIZE)
-                with st.spinner("🎧 正在进行语音识别..."):
-                    transcript = transcriber.transcribe(temp_wav)
+                with st.spinner("🎧 正在进行语音识别..."), registry.use() as transcriber:
+                    transcript = cached_transcribe(transcriber, temp_wav, model_key())
                 
                 if not transcript.strip():
                     st.error("❌ 识别结果为空，请确保麦克风权限已打开且说话清晰。")
@@ -107,19 +143,23 @@ if page == "🎙️ 在线会议室":
                     with st.expander("查看逐字稿", expanded=True):
                         st.text_area("Transcript", transcript, height=200)
                     
-                    # 4. 智能摘要 (LLM)
-                    with st.spinner("🧠 正在生成会议纪要..."):
-                        summary = summarizer.summarize(transcript)
-                    
+                    # 4. 智能摘要 (LLM)，流式渲染
                     st.markdown("### 📝 会议纪要")
-                    st.markdown(summary)
+                    stream = TimedStream(cached_summarize_stream(summarizer, transcript))
+                    summary = st.write_stream(stream)
+                    st.caption(f"⏱️ {stream.report()}")
                     
                     # 5. 存入知识库
                     with st.spinner("💾 正在归档..."):
                         kb.add_meeting(
                             summary=summary,
                             transcript=transcript,
-                            metadata={"source": "web_recording", "date": timestamp}
+                            metadata={
+                                "source": "web_recording",
+                                "source_type": "web_recording",
+                                "date": timestamp,
+                                "duration": len(audio['bytes']) / (audio.get('sample_rate', 44100) * audio.get('sample_width', 2)),
+                            }
                         )
                     st.balloons()
                     st.success("🎉 已成功归档至企业知识库！")
@@ -140,24 +180,46 @@ if page == "智能问答 (RAG)":
     st.info("基于历史会议记录，回答你的问题。")
     
     query = st.text_input("请输入你的问题：", placeholder="例如：上周关于产品发布的决策是什么？")
+
+    # 检索范围过滤（下推到向量库执行）；不设置时自动识别问题中的“上周 / 本月”等时间范围
+    with st.expander("🔎 筛选条件"):
+        date_range = st.date_input("会议日期范围", value=())
+        source_types = st.multiselect(
+            "来源",
+            ["file", "realtime", "web_recording", "web_upload"],
+            format_func=lambda x: {"file": "录音文件", "realtime": "实时会议", "web_recording": "在线会议室", "web_upload": "网页上传"}[x]
+        )
+        participant = st.text_input("参会人")
+    filters = {}
+    if len(date_range) == 2:
+        filters["date_from"] = date_range[0].strftime("%Y-%m-%d")
+        filters["date_to"] = f"{date_range[1].strftime('%Y-%m-%d')} 23:59:59"
+    if source_types:
+        filters["source_type"] = source_types
+    if participant.strip():
+        filters["participant"] = participant.strip()
+    filters = filters or None
+    if filters is None and query and parse_time_hint(query):
+        st.caption("🗓️ 已根据问题中的时间描述限定检索范围")
     
     if query:
-        with st.spinner("正在检索并生成答案..."):
-            # 1. 检索相关文档
-            docs = kb.search(query, k=3)
+        with st.spinner("正在检索..."):
+            # 1. 检索相关文档（纪要 + 逐字稿片段），结果直接交给生成阶段复用
+            retrieval = kb.retrieve(query, k=3, filters=filters)
             
             # 2. 显示检索到的片段
             with st.expander("查看参考的会议片段"):
-                for i, doc in enumerate(docs):
-                    st.markdown(f"**片段 {i+1}** (来源: {doc.metadata.get('source', '未知')})")
+                for i, (doc, score) in enumerate(zip(retrieval.documents, retrieval.scores)):
+                    kind = "逐字稿" if "chunk_index" in doc.metadata else "纪要"
+                    st.markdown(f"**片段 {i+1}** [{kind}] (来源: {doc.metadata.get('source', '未知')}, 排名得分: {score:.4f})")
                     st.text(doc.page_content[:200] + "...")
             
-            # 3. LLM 生成回答
-            # 这里我们需要直接调用 summarizer 内部的 llm
-            answer = kb.query_with_llm(query, summarizer.llm)
-            
-            st.success("🤖 AI 回答：")
-            st.markdown(answer)
+        # 3. LLM 生成回答 (流式输出)
+        # 这里我们需要直接调用 summarizer 内部的 llm
+        st.success("🤖 AI 回答：")
+        stream = TimedStream(kb.query_with_llm_stream(query, summarizer.llm, retrieval=retrieval))
+        answer = st.write_stream(stream)
+        st.caption(f"⏱️ {retrieval.report()} | 生成: {stream.report()}")
 
 elif page == "会议记录归档":
     st.header("📂 历史会议记录")
@@ -181,6 +243,8 @@ elif page == "上传新会议":
         # 显示文件信息
         file_details = {"文件名": uploaded_file.name, "文件大小": f"{uploaded_file.size / 1024 / 1024:.2f} MB"}
         st.write(file_details)
+        meeting_date = st.date_input("会议日期")
+        participants = st.text_input("参会人 (可选，逗号分隔)", placeholder="张三, 李四")
         
         # 处理按钮
         if st.button("🚀 开始AI分析"):
@@ -194,9 +258,8 @@ elif page == "上传新会议":
                 st.success(f"文件已保存至: {save_path}")
                 
                 # 2. 语音转文字 (ASR)
-                transcriber = AudioTranscriber(model_size=config.WHISPER_MODEL_SIZE)
-                with st.spinner("🎧 正在进行语音识别 (Whisper)... 这可能需要几分钟"):
-                    transcript = transcriber.transcribe(save_path)
+                with st.spinner("🎧 正在进行语音识别... 这可能需要几分钟"), registry.use() as transcriber:
+                    transcript = cached_transcribe(transcriber, save_path, model_key())
                 
                 if not transcript.strip():
                     st.error("❌ 转录失败或内容为空")
@@ -205,20 +268,23 @@ elif page == "上传新会议":
                     with st.expander("查看逐字稿"):
                         st.text_area("Transcript", transcript, height=200)
                     
-                    # 3. 智能摘要 (LLM)
-                    with st.spinner("🧠 正在生成会议纪要 (LLM)..."):
-                        summary = summarizer.summarize(transcript)
-                    
-                    st.success("✅ 会议纪要生成完毕！")
+                    # 3. 智能摘要 (LLM)，流式渲染
                     st.markdown("### 📝 会议纪要")
-                    st.markdown(summary)
+                    stream = TimedStream(cached_summarize_stream(summarizer, transcript))
+                    summary = st.write_stream(stream)
+                    st.success(f"✅ 会议纪要生成完毕！({stream.report()})")
                     
                     # 4. 存入知识库 (RAG)
                     with st.spinner("💾 正在存入企业知识库..."):
                         kb.add_meeting(
                             summary=summary,
                             transcript=transcript,
-                            metadata={"source": uploaded_file.name, "date": "Web Upload"}
+                            metadata={
+                                "source": uploaded_file.name,
+                                "source_type": "web_upload",
+                                "date": meeting_date.strftime("%Y-%m-%d"),
+                                "participants": participants,
+                            }
                         )
                     st.success("🎉 已归档至知识库，现在你可以通过‘智能问答’检索此会议了！")
                     